@@ -4,6 +4,8 @@ import useRecorder from "../../shared/hooks/useRecorder";
 import { useSession } from "../session/SessionContext";
 import { startSession } from "../../shared/api/startSession";
 import { uploadOne } from "../../shared/api/uploadOne";
+import { uploadChunk, finishChunks } from "../../shared/api/uploadChunk";
+import { LIVE_UPLOAD, LIVE_TIMESLICE_MS } from "../../shared/config/api.config";
 import { finishSession } from "../../shared/api/finishSession";
 import TopBar from "../../shared/components/TopBar";
 import white_cat from "../../assets/white_cat.png";
@@ -25,6 +27,8 @@ export default function InterviewPage() {
   const videoRef = useRef(null);
   const timerRef = useRef(null);
   const lastBlobRef = useRef(null);
+  // Live upload of the answer being recorded: { seq, chain, failed }
+  const liveRef = useRef(null);
   const [stream, setStream] = useState(null);
 
   const recorder = useRecorder();
@@ -116,12 +120,31 @@ export default function InterviewPage() {
     }
     lastBlobRef.current = blob;
 
-    const response = await uploadOne({
-      token,
-      folder,
-      questionIndex: index + 1,
-      blob,
-    });
+    // Live upload: the chunks are already on the server, close the answer;
+    // if a chunk was lost, upload the whole recording as usual
+    let response = null;
+    const live = liveRef.current;
+    liveRef.current = null;
+    if (live) {
+      await live.chain;
+      if (!live.failed) {
+        response = await finishChunks({
+          token,
+          folder,
+          questionIndex: index + 1,
+          chunks: live.seq,
+          blob,
+        });
+      }
+    }
+    if (!response || !response.ok) {
+      response = await uploadOne({
+        token,
+        folder,
+        questionIndex: index + 1,
+        blob,
+      });
+    }
 
     if (!response.ok) {
       setUploadState('error');
@@ -147,7 +170,22 @@ export default function InterviewPage() {
     setUploadState("idle");
     setMessage("");
     resetTimer();
-    await recorder.start(stream);
+    if (LIVE_UPLOAD) {
+      const live = { seq: 0, chain: Promise.resolve(), failed: false };
+      liveRef.current = live;
+      // Chunks are sent one after another, in order; after a failure the rest are skipped
+      const onChunk = (chunk) => {
+        const seq = live.seq++;
+        live.chain = live.chain.then(async () => {
+          if (live.failed) return;
+          const res = await uploadChunk({ token, folder, questionIndex: index + 1, seq, blob: chunk });
+          if (!res.ok) live.failed = true;
+        });
+      };
+      await recorder.start(stream, { timeslice: LIVE_TIMESLICE_MS, onChunk });
+    } else {
+      await recorder.start(stream);
+    }
     clearTimer();
     timerRef.current = setInterval(() => {
       setTimeLeft((prev) => {
@@ -159,7 +197,7 @@ export default function InterviewPage() {
         return prev - 1;
       });
     }, 1000);
-  }, [stream, recorder, clearTimer, resetTimer, stopAndUpload]);
+  }, [stream, recorder, clearTimer, resetTimer, stopAndUpload, token, folder, index]);
 
   const toggleRecording = useCallback(() => {
     if (status === "recording") {
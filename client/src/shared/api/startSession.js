@@ -11,11 +11,18 @@ export async function startSession(token, userName) {
     const data = await res.json().catch(() => ({}));
 
     if (!res.ok) {
+      let guidance = 'Check server logs.';
+      if (res.status === 401) guidance = 'Invalid token. Please request a valid token.';
+      else if (res.status === 429) {
+        // Transcription backlog is full; the server says when to come back
+        const minutes = Math.max(1, Math.ceil(Number(res.headers.get('Retry-After') || 60) / 60));
+        guidance = `The server is busy. Please try again in about ${minutes} minute${minutes === 1 ? '' : 's'}.`;
+      }
       return {
         ok: false,
         code: res.status,
-        error: data.error || 'Failed to start session',
-        guidance: res.status === 401 ? 'Invalid token. Please request a valid token.' : 'Check server logs.'
+        error: data.error || data.detail || 'Failed to start session',
+        guidance
       };
     }
 
@@ -0,0 +1,66 @@
+import { API_BASE_URL } from '../config/api.config';
+import { sha256Hex } from './uploadOne';
+
+async function postChunkForm(fields, chunk) {
+  const form = new FormData();
+  Object.entries(fields).forEach(([key, value]) => {
+    if (value !== null && value !== undefined) form.append(key, String(value));
+  });
+  if (chunk) form.append('chunk', chunk, 'chunk.webm');
+
+  const res = await fetch(`${API_BASE_URL}/api/upload-chunk`, {
+    method: 'POST',
+    body: form,
+  });
+  const data = await res.json().catch(() => ({}));
+  return { res, data };
+}
+
+function failure(res, data, fallback) {
+  let guidance = 'See server logs for details.';
+  if (res.status === 401) guidance = 'Invalid or expired token. Please re-login or request a new token.';
+  else if (res.status === 409) guidance = 'Some chunks were lost; the whole answer will be uploaded instead.';
+  else if (res.status === 413) guidance = 'Server storage is almost full. Wait a moment before retrying.';
+  else if (res.status === 429) guidance = 'Too many requests. Wait a moment before retrying.';
+  return {
+    ok: false,
+    code: res.status,
+    error: data.error || data.detail || fallback,
+    guidance,
+  };
+}
+
+// Live upload: one timesliced chunk of the answer being recorded (seq 0 starts a new take)
+export async function uploadChunk({ token, folder, questionIndex, seq, blob }) {
+  try {
+    const { res, data } = await postChunkForm({ token, folder, questionIndex, seq }, blob);
+    if (!res.ok) return failure(res, data, 'Chunk upload failed');
+    return { ok: true, ...data };
+  } catch (err) {
+    console.error('uploadChunk error:', err);
+    return {
+      ok: false,
+      code: 0,
+      error: err.message || 'Network error',
+      guidance: 'Network error or server unreachable. The whole answer will be uploaded instead.'
+    };
+  }
+}
+
+// Live upload: close the answer after `chunks` chunks; blob is the whole recording (for the checksum)
+export async function finishChunks({ token, folder, questionIndex, chunks, blob }) {
+  try {
+    const sha256 = await sha256Hex(blob).catch(() => null);
+    const { res, data } = await postChunkForm({ token, folder, questionIndex, seq: chunks, final: true, sha256 });
+    if (!res.ok) return failure(res, data, 'Upload failed');
+    return { ok: true, ...data };
+  } catch (err) {
+    console.error('finishChunks error:', err);
+    return {
+      ok: false,
+      code: 0,
+      error: err.message || 'Network error',
+      guidance: 'Network error or server unreachable. Check your connection and ensure the backend is running.'
+    };
+  }
+}
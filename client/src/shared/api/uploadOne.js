@@ -1,5 +1,13 @@
 import { API_BASE_URL } from '../config/api.config';
 
+// SHA-256 of the blob as hex; null where WebCrypto is unavailable (non-secure context)
+export async function sha256Hex(blob) {
+  const subtle = globalThis.crypto?.subtle;
+  if (!subtle) return null;
+  const digest = await subtle.digest('SHA-256', await blob.arrayBuffer());
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('');
+}
+
 export async function uploadOne({ token, folder, questionIndex, blob }) {
   try {
     const form = new FormData();
@@ -31,6 +39,17 @@ export async function uploadOne({ token, folder, questionIndex, blob }) {
       };
     }
 
+    // Integrity check: the server returns the digest of what it stored
+    const localDigest = data.sha256 ? await sha256Hex(blob).catch(() => null) : null;
+    if (localDigest && localDigest !== data.sha256) {
+      return {
+        ok: false,
+        code: 0,
+        error: 'Upload corrupted (checksum mismatch)',
+        guidance: 'Please retry the upload.',
+      };
+    }
+
     return { ok: true, ...data };
   } catch (err) {
     console.error('uploadOne error:', err);
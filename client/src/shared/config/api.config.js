@@ -30,3 +30,8 @@ const getApiBaseUrl = () => {
 export const API_BASE_URL = getApiBaseUrl();
 
 console.log(`🌐 API Base URL: ${API_BASE_URL}`);
+
+// Live upload: send each answer in timesliced chunks while it is recorded, so the
+// server transcribes it as it is spoken (VITE_LIVE_UPLOAD=true in client/.env)
+export const LIVE_UPLOAD = import.meta.env.VITE_LIVE_UPLOAD === 'true';
+export const LIVE_TIMESLICE_MS = Number(import.meta.env.VITE_LIVE_TIMESLICE_MS) || 2000;
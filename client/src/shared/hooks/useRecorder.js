@@ -6,15 +6,21 @@ export default function useRecorder() {
   const [recording, setRecording] = useState(false)
   const [stream, setStream] = useState(null)
 
-  async function start(streamInstance) {
+  // timeslice (ms): emit a chunk every `timeslice` ms to onChunk(blob) while recording
+  async function start(streamInstance, { timeslice, onChunk } = {}) {
     if (!streamInstance) return
     chunksRef.current = []
     setStream(streamInstance)
     const options = { mimeType: 'video/webm;codecs=vp8,opus' }
     const mr = new MediaRecorder(streamInstance, options)
     mediaRecorderRef.current = mr
-    mr.ondataavailable = e => { if (e.data && e.data.size) chunksRef.current.push(e.data) }
-    mr.start()
+    mr.ondataavailable = e => {
+      if (!e.data || !e.data.size) return
+      chunksRef.current.push(e.data)
+      if (onChunk) onChunk(e.data)
+    }
+    if (timeslice) mr.start(timeslice)
+    else mr.start()
     setRecording(true)
   }
 
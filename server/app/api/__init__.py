@@ -6,6 +6,7 @@ from . import upload_one
 from . import session_finish
 from . import get_transcripts
 from . import transcription_status
+from . import admin_profiles
 
 __all__ = [
     'verify_token',
@@ -14,4 +15,5 @@ __all__ = [
     'session_finish',
     'get_transcripts',
     'transcription_status',
+    'admin_profiles',
 ]
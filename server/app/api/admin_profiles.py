@@ -0,0 +1,74 @@
+import hmac
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from app.core import config
+from app.core.profiling import get_sample_rate, set_sample_rate, list_profiles, get_profile_path
+
+router = APIRouter()
+
+
+class ProfilingRequest(BaseModel):
+    token: str
+    sampleRate: float
+
+
+def _check_admin(token: str):
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not hmac.compare_digest(token.encode('utf-8'), config.ADMIN_TOKEN.encode('utf-8')):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+@router.get('/admin/profiling')
+def get_profiling(token: str):
+    """Current profiling settings"""
+    _check_admin(token)
+    return {
+        "ok": True,
+        "sampleRate": get_sample_rate(),
+        "directory": config.PROFILE_DIR
+    }
+
+
+@router.post('/admin/profiling')
+def update_profiling(req: ProfilingRequest):
+    """
+    Switch profiling on/off at runtime.
+
+    Body: {"token": "...", "sampleRate": 0.05}  (0 disables profiling)
+    """
+    _check_admin(req.token)
+    rate = set_sample_rate(req.sampleRate)
+    print(f"🔬 Profiling sample rate set to {rate}")
+    return {"ok": True, "sampleRate": rate}
+
+
+@router.get('/admin/profiles')
+def get_profiles(token: str):
+    """
+    List captured profiles.
+
+    Returns:
+        {
+            "ok": true,
+            "profiles": [
+                {"name": "..._GET__api_transcripts_812ms.folded", "kind": "stacks", "size": 2048, "createdAt": "..."},
+                {"name": "..._transcribe_Q1_53210ms.prof", "kind": "cprofile", ...}
+            ]
+        }
+    """
+    _check_admin(token)
+    profiles = list_profiles()
+    return {"ok": True, "profiles": profiles, "totalProfiles": len(profiles)}
+
+
+@router.get('/admin/profiles/{name}')
+def download_profile(name: str, token: str):
+    """Download a single profile file"""
+    _check_admin(token)
+    path = get_profile_path(name)
+    if not path:
+        raise HTTPException(status_code=404, detail=f"Profile '{name}' not found")
+    media_type = "text/plain" if name.endswith('.folded') else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
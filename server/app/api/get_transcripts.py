@@ -1,17 +1,82 @@
-from fastapi import APIRouter, HTTPException, Response
-from fastapi.responses import FileResponse
-from app.storage.file_manager import BASE
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
+from email.utils import formatdate
+from typing import List, Optional
+from app.core import config
+from app.storage.file_manager import BASE, session_path, iter_session_paths, check_folder_name
+from app.storage import meta_cache
+from app.storage.segment_store import load_segments
+from app.services.task_queue import queue
+from app.services import live_transcription
 import os
 import json
 import csv
+import asyncio
+import zlib
 import tempfile
 
 router = APIRouter()
 
+
+def _load_session_meta(folder: str):
+    """
+    Parsed meta.json of a session (cached, see meta_cache) as (meta, etag, mtime).
+    The folder name is validated (no path outside uploads/). Blocking: locating
+    the session stats the layouts.
+    """
+    check_folder_name(folder)
+    return meta_cache.load(os.path.join(session_path(folder), 'meta.json'))
+
+
+async def _read_meta(folder_name: str):
+    """_load_session_meta off the event loop; 404 if the session does not exist"""
+    try:
+        return await asyncio.to_thread(_load_session_meta, folder_name)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=500, detail="Invalid JSON in meta.json")
+    except (FileNotFoundError, ValueError):
+        raise HTTPException(status_code=404, detail=f"Session '{folder_name}' not found")
+
+
+def _etag_with(etag: str, extra) -> str:
+    """Fold response data that is not in meta.json (e.g. partial transcripts) into the ETag"""
+    if not extra:
+        return etag
+    digest = zlib.crc32(json.dumps(extra, sort_keys=True, default=str).encode('utf-8'))
+    return f'{etag[:-1]}-{digest:08x}"'
+
+
+def _cache_headers(etag: str, mtime: float) -> dict:
+    # no-cache: clients may store the response but must revalidate (cheap 304)
+    return {"ETag": etag, "Last-Modified": formatdate(mtime, usegmt=True), "Cache-Control": "no-cache"}
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+async def _partial_transcripts(folder_name: str) -> dict:
+    """Partial text of questions that are still being transcribed"""
+    progress = await queue.get_progress(folder_name)
+    if not progress:
+        return {}
+    return {
+        q_idx: {"text": task["partial_transcript"], "partial": True, "segmentsCount": task["segments_count"]}
+        for q_idx, task in progress["tasks"].items()
+        if task["status"] == "processing" and task["partial_transcript"]
+    }
+
+
 @router.get('/transcripts/{folder_name}')
-def get_transcripts(folder_name: str):
+async def get_transcripts(folder_name: str, request: Request, response: Response):
     """
     Get all transcripts for a session.
+    Carries ETag / Last-Modified; If-None-Match with the current ETag returns 304.
 
     Args:
         folder_name: Session folder name (e.g. "05_12_2025_00_18_Anhh")
@@ -24,19 +89,23 @@ def get_transcripts(folder_name: str):
             "transcripts": {
                 "1": {...},
                 "2": {...}
+            },
+            "partialTranscripts": {
+                "3": {"text": "...", "partial": true, "segmentsCount": 4}
             }
         }
     """
-    meta_path = os.path.join(BASE, folder_name, 'meta.json')
-    
-    if not os.path.exists(meta_path):
-        raise HTTPException(status_code=404, detail=f"Session '{folder_name}' not found")
+    meta, etag, mtime = await _read_meta(folder_name)
     
     try:
-        with open(meta_path, 'r', encoding='utf-8') as f:
-            meta = json.load(f)
-        
         transcripts = meta.get('transcripts', {})
+        partial = await _partial_transcripts(folder_name)
+        partial = {k: v for k, v in partial.items() if k not in transcripts}
+        
+        etag = _etag_with(etag, partial)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=_cache_headers(etag, mtime))
+        response.headers.update(_cache_headers(etag, mtime))
         
         return {
             "ok": True,
@@ -47,137 +116,118 @@ def get_transcripts(folder_name: str):
             "questionsCount": meta.get('questionsCount', 0),
             "receivedQuestions": meta.get('receivedQuestions', []),
             "transcripts": transcripts,
-            "transcriptsCount": len(transcripts)
+            "transcriptsCount": len(transcripts),
+            "partialTranscripts": partial
         }
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="Invalid JSON in meta.json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading metadata: {str(e)}")
 
 
-@router.get('/transcripts/{folder_name}/{question_index}')
-def get_transcript(folder_name: str, question_index: int):
-    """
-    Get the transcript for a specific question.
+class BatchSession(BaseModel):
+    folder: str
+    questions: Optional[List[int]] = None  # Default: every question
 
-    Args:
-        folder_name: Session folder name
-        question_index: Question index (1, 2, 3, ...)
 
-    Returns:
-        {
-            "ok": true,
-            "folder": "...",
-            "questionIndex": 1,
-            "transcript": {
-                "text": "...",
-                "confidence": 0.95,
-                "createdAt": "..."
-            }
-        }
-    """
-    meta_path = os.path.join(BASE, folder_name, 'meta.json')
-    
-    if not os.path.exists(meta_path):
-        raise HTTPException(status_code=404, detail=f"Session '{folder_name}' not found")
-    
-    try:
-        with open(meta_path, 'r', encoding='utf-8') as f:
-            meta = json.load(f)
-        
-        transcripts = meta.get('transcripts', {})
-        transcript = transcripts.get(str(question_index))
-        
-        if not transcript:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Transcript for question {question_index} not found in session '{folder_name}'"
-            )
-        
-        return {
-            "ok": True,
-            "folder": folder_name,
-            "userName": meta.get('userName', 'Unknown'),
-            "questionIndex": question_index,
-            "transcript": transcript
+class BatchRequest(BaseModel):
+    sessions: List[BatchSession]
+    fields: Optional[List[str]] = None  # Transcript fields to return, e.g. ["text"]; default: all
+    excludeFields: Optional[List[str]] = None  # e.g. ["text", "versions"] for a status overview
+    partial: bool = True  # Include text of questions still being transcribed
+    format: str = "json"  # "json" or "ndjson" (one line per session, as soon as it is read)
+
+
+def _project(entry: dict, fields: Optional[List[str]], exclude: Optional[List[str]]) -> dict:
+    if fields is not None:
+        entry = {k: v for k, v in entry.items() if k in fields}
+    if exclude:
+        entry = {k: v for k, v in entry.items() if k not in exclude}
+    return entry
+
+
+async def _batch_session(item: BatchSession, req: BatchRequest, semaphore: asyncio.Semaphore) -> dict:
+    """One session of a batch read; errors are reported per session"""
+    async with semaphore:
+        try:
+            meta, etag, _ = await asyncio.to_thread(_load_session_meta, item.folder)
+        except FileNotFoundError:
+            return {"ok": False, "folder": item.folder, "error": "Session not found"}
+        except json.JSONDecodeError:
+            return {"ok": False, "folder": item.folder, "error": "Invalid JSON in meta.json"}
+        except (OSError, ValueError) as e:
+            return {"ok": False, "folder": item.folder, "error": str(e)}
+
+    wanted = {str(q) for q in item.questions} if item.questions is not None else None
+    transcripts = {
+        q: _project(entry, req.fields, req.excludeFields)
+        for q, entry in meta.get('transcripts', {}).items()
+        if wanted is None or q in wanted
+    }
+    result = {
+        "ok": True,
+        "folder": item.folder,
+        "etag": etag,
+        "userName": meta.get('userName', 'Unknown'),
+        "questionsCount": meta.get('questionsCount', 0),
+        "transcripts": transcripts,
+        "transcriptsCount": len(transcripts)
+    }
+    if req.partial:
+        partial = await _partial_transcripts(item.folder)
+        result["partialTranscripts"] = {
+            q: _project(entry, req.fields, req.excludeFields) for q, entry in partial.items()
+            if q not in transcripts and (wanted is None or q in wanted)
         }
-    except HTTPException:
-        raise
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="Invalid JSON in meta.json")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading metadata: {str(e)}")
+    return result
 
 
-@router.get('/transcripts')
-def list_all_sessions():
+@router.post('/transcripts/batch')
+async def get_transcripts_batch(req: BatchRequest):
     """
-    List all sessions that have transcripts.
+    Transcripts of many sessions in one request (e.g. a reviewer dashboard).
+    Sessions are read concurrently (BATCH_READ_CONCURRENCY) through the metadata cache.
+
+    Body:
+        {
+            "sessions": [{"folder": "...", "questions": [1, 2]}, {"folder": "..."}],
+            "fields": ["text"],
+            "format": "json" | "ndjson"
+        }
 
     Returns:
         {
             "ok": true,
             "sessions": [
-                {
-                    "folder": "...",
-                    "userName": "...",
-                    "transcriptsCount": 5,
-                    "uploadedAt": "..."
-                }
-            ]
+                {"ok": true, "folder": "...", "etag": "...", "userName": "...", "transcripts": {"1": {"text": "..."}}, ...},
+                {"ok": false, "folder": "...", "error": "Session not found"}
+            ],
+            "count": 2
         }
+        or, with "format": "ndjson", one session object per line in completion order
     """
-    if not os.path.exists(BASE):
-        return {
-            "ok": True,
-            "sessions": []
-        }
-    
-    sessions = []
-    
-    try:
-        for folder_name in os.listdir(BASE):
-            folder_path = os.path.join(BASE, folder_name)
-            if not os.path.isdir(folder_path):
-                continue
-            
-            meta_path = os.path.join(folder_path, 'meta.json')
-            if not os.path.exists(meta_path):
-                continue
-            
-            try:
-                with open(meta_path, 'r', encoding='utf-8') as f:
-                    meta = json.load(f)
-                
-                transcripts = meta.get('transcripts', {})
-                if transcripts:  # Only include sessions that have transcripts
-                    sessions.append({
-                        "folder": folder_name,
-                        "userName": meta.get('userName', 'Unknown'),
-                        "transcriptsCount": len(transcripts),
-                        "questionsCount": meta.get('questionsCount', 0),
-                        "uploadedAt": meta.get('uploadedAt'),
-                        "finishedAt": meta.get('finishedAt')
-                    })
-            except:
-                continue  # Skip if unreadable
-        
-        # Sort by uploadedAt (newest first)
-        sessions.sort(key=lambda x: x.get('uploadedAt', ''), reverse=True)
-        
-        return {
-            "ok": True,
-            "sessions": sessions,
-            "totalSessions": len(sessions)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error listing sessions: {str(e)}")
+    if req.format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="Format must be 'json' or 'ndjson'")
+    if len(req.sessions) > config.BATCH_TRANSCRIPTS_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {config.BATCH_TRANSCRIPTS_MAX} sessions per batch")
+
+    semaphore = asyncio.Semaphore(max(1, config.BATCH_READ_CONCURRENCY))
+    reads = [_batch_session(item, req, semaphore) for item in req.sessions]
+
+    if req.format == "ndjson":
+        async def lines():
+            for read in asyncio.as_completed(reads):
+                yield json.dumps(await read, ensure_ascii=False) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
 
+    sessions = await asyncio.gather(*reads)
+    return {"ok": True, "sessions": sessions, "count": len(sessions)}
 
+
+# Declared before /transcripts/{folder_name}/{question_index}, which would match "export"
 @router.get('/transcripts/{folder_name}/export')
-def export_transcripts(folder_name: str, format: str = "txt"):
+def export_transcripts(folder_name: str, request: Request, format: str = "txt"):
     """
     Export transcripts to a file and return it for download.
+    Carries ETag / Last-Modified; If-None-Match with the current ETag returns 304.
 
     Args:
         folder_name: Session folder name
@@ -186,7 +236,7 @@ def export_transcripts(folder_name: str, format: str = "txt"):
     Returns:
         File download response
     """
-    meta_path = os.path.join(BASE, folder_name, 'meta.json')
+    meta_path = os.path.join(session_path(folder_name), 'meta.json')
     
     if not os.path.exists(meta_path):
         raise HTTPException(status_code=404, detail=f"Session '{folder_name}' not found")
@@ -195,8 +245,7 @@ def export_transcripts(folder_name: str, format: str = "txt"):
         raise HTTPException(status_code=400, detail="Format must be 'txt', 'csv', or 'json'")
     
     try:
-        with open(meta_path, 'r', encoding='utf-8') as f:
-            meta = json.load(f)
+        meta, etag, mtime = meta_cache.load(meta_path)
         
         transcripts = meta.get('transcripts', {})
         userName = meta.get('userName', folder_name)
@@ -204,6 +253,10 @@ def export_transcripts(folder_name: str, format: str = "txt"):
         if not transcripts:
             raise HTTPException(status_code=404, detail=f"No transcripts found in session '{folder_name}'")
         
+        etag = _etag_with(etag, format)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=_cache_headers(etag, mtime))
+        
         # Tạo temporary file
         temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=f'.{format}', encoding='utf-8')
         temp_path = temp_file.name
@@ -271,7 +324,7 @@ def export_transcripts(folder_name: str, format: str = "txt"):
                 temp_path,
                 media_type=media_type,
                 filename=filename,
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
+                headers={"Content-Disposition": f"attachment; filename={filename}", **_cache_headers(etag, mtime)}
             )
 
         except Exception as e:
@@ -287,3 +340,172 @@ def export_transcripts(folder_name: str, format: str = "txt"):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error exporting transcripts: {str(e)}")
 
+
+@router.get('/transcripts/{folder_name}/{question_index}')
+async def get_transcript(folder_name: str, question_index: int, request: Request, response: Response):
+    """
+    Get the transcript for a specific question.
+    While the question is still being transcribed (or, for a live upload, still
+    being recorded), returns the text decoded so far with `"partial": true`. Carries ETag / Last-Modified like /transcripts/{folder}.
+
+    Args:
+        folder_name: Session folder name
+        question_index: Question index (1, 2, 3, ...)
+
+    Returns:
+        {
+            "ok": true,
+            "folder": "...",
+            "questionIndex": 1,
+            "transcript": {
+                "text": "...",
+                "confidence": 0.95,
+                "createdAt": "..."
+            }
+        }
+    """
+    meta, etag, mtime = await _read_meta(folder_name)
+    
+    try:
+        transcripts = meta.get('transcripts', {})
+        transcript = transcripts.get(str(question_index))
+        
+        if not transcript:
+            # Still being transcribed, or still being recorded (live upload)
+            transcript = await queue.get_partial_transcript(folder_name, question_index) \
+                or live_transcription.partial_transcript(folder_name, question_index)
+            etag = _etag_with(etag, transcript)
+        
+        if not transcript:
+            raise HTTPException(
+                status_code=404, 
+                detail=f"Transcript for question {question_index} not found in session '{folder_name}'"
+            )
+        
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=_cache_headers(etag, mtime))
+        response.headers.update(_cache_headers(etag, mtime))
+        
+        return {
+            "ok": True,
+            "folder": folder_name,
+            "userName": meta.get('userName', 'Unknown'),
+            "questionIndex": question_index,
+            "transcript": transcript
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading metadata: {str(e)}")
+
+
+@router.get('/transcripts/{folder_name}/{question_index}/segments')
+async def get_transcript_segments(
+    folder_name: str,
+    question_index: int,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+):
+    """
+    Get timestamped segments of one answer, optionally only those overlapping
+    [start, end] (seconds), so reviewers can jump to a timestamp.
+
+    Returns:
+        {
+            "ok": true,
+            "folder": "...",
+            "questionIndex": 1,
+            "partial": false,
+            "segments": [
+                {"start": 12.4, "end": 17.9, "text": "...", "avg_logprob": -0.21, "no_speech_prob": 0.01}
+            ]
+        }
+    """
+    await _read_meta(folder_name)  # 404 for an unknown session
+    
+    if start is not None and end is not None and end < start:
+        raise HTTPException(status_code=400, detail="'end' must not be before 'start'")
+    
+    partial = False
+    segments = await asyncio.to_thread(load_segments, folder_name, question_index, start, end)
+    if segments is None:
+        in_progress = await queue.get_partial_transcript(folder_name, question_index)
+        if not in_progress:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Segments for question {question_index} not found in session '{folder_name}'"
+            )
+        partial = True
+        segments = [
+            seg for seg in in_progress['segments']
+            if (start is None or seg['end'] > start) and (end is None or seg['start'] < end)
+        ]
+    
+    return {
+        "ok": True,
+        "folder": folder_name,
+        "questionIndex": question_index,
+        "partial": partial,
+        "segments": segments,
+        "segmentsCount": len(segments)
+    }
+
+
+@router.get('/transcripts')
+def list_all_sessions():
+    """
+    List all sessions that have transcripts.
+
+    Returns:
+        {
+            "ok": true,
+            "sessions": [
+                {
+                    "folder": "...",
+                    "userName": "...",
+                    "transcriptsCount": 5,
+                    "uploadedAt": "..."
+                }
+            ]
+        }
+    """
+    if not os.path.exists(BASE):
+        return {
+            "ok": True,
+            "sessions": []
+        }
+    
+    sessions = []
+    
+    try:
+        for folder_name, folder_path in iter_session_paths():
+            meta_path = os.path.join(folder_path, 'meta.json')
+            if not os.path.exists(meta_path):
+                continue
+            
+            try:
+                meta, _, _ = meta_cache.load(meta_path, cache=False)  # Keep the hot entries
+                
+                transcripts = meta.get('transcripts', {})
+                if transcripts:  # Only include sessions that have transcripts
+                    sessions.append({
+                        "folder": folder_name,
+                        "userName": meta.get('userName', 'Unknown'),
+                        "transcriptsCount": len(transcripts),
+                        "questionsCount": meta.get('questionsCount', 0),
+                        "uploadedAt": meta.get('uploadedAt'),
+                        "finishedAt": meta.get('finishedAt')
+                    })
+            except:
+                continue  # Skip if unreadable
+        
+        # Sort by uploadedAt (newest first)
+        sessions.sort(key=lambda x: x.get('uploadedAt', ''), reverse=True)
+        
+        return {
+            "ok": True,
+            "sessions": sessions,
+            "totalSessions": len(sessions)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing sessions: {str(e)}")
@@ -0,0 +1,119 @@
+from fastapi import APIRouter, HTTPException, Request, Response, Query
+from fastapi.responses import FileResponse
+from typing import Dict, List
+from app.storage.file_manager import session_path
+from app.storage.blob_backend import is_remote_backend, get_backend
+from app.services.compaction import extract_audio
+import os
+import asyncio
+
+router = APIRouter()
+
+# (suffix, media type) per rendition
+RENDITIONS = {
+    'video': ('webm', 'video/webm'),
+    'audio': ('opus', 'audio/ogg; codecs=opus'),
+}
+
+# One on-demand audio extraction per answer at a time: path -> [lock, requests using it]
+# (removed when the last request is done, so the dict does not grow with the archive)
+_extract_locks: Dict[str, List] = {}
+
+
+async def _local_media(folder_name: str, name: str) -> str:
+    """Path of a session file, fetched from the blob backend if it is only stored there"""
+    path = os.path.join(session_path(folder_name), name)
+    if not os.path.exists(path) and is_remote_backend():
+        await asyncio.to_thread(get_backend().get_file, f"{folder_name}/{name}", path)
+    return path
+
+
+async def _audio_rendition(folder_name: str, question_index: int) -> str:
+    """Q{n}.opus, extracted from Q{n}.webm on first request if compaction has not made it yet"""
+    audio_path = await _local_media(folder_name, f"Q{question_index}.opus")
+    if os.path.exists(audio_path):
+        return audio_path
+
+    entry = _extract_locks.setdefault(audio_path, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            if not os.path.exists(audio_path):
+                video_path = await _local_media(folder_name, f"Q{question_index}.webm")
+                if not os.path.exists(video_path):
+                    raise HTTPException(status_code=404, detail=f"No recording for question {question_index} in session '{folder_name}'")
+                try:
+                    extracted = await asyncio.to_thread(extract_audio, video_path, audio_path)
+                except RuntimeError as e:
+                    raise HTTPException(status_code=503, detail=f"Audio rendition unavailable: {e}")
+                if not extracted:
+                    raise HTTPException(
+                        status_code=503, detail="The answer was replaced while its audio was extracted",
+                        headers={"Retry-After": "1"}
+                    )
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _extract_locks[audio_path]
+    return audio_path
+
+
+@router.api_route('/media/{folder_name}/{question_index}', methods=['GET', 'HEAD'])
+async def get_answer_media(
+    folder_name: str,
+    question_index: int,
+    request: Request,
+    rendition: str = Query("auto", pattern="^(auto|video|audio)$")
+):
+    """
+    Play back a recorded answer.
+
+    rendition: "video" (Q{n}.webm), "audio" (Q{n}.opus, the compacted Opus
+    rendition; extracted on first request if needed) or "auto" (video, else the
+    audio left after the retention tiers of compaction.py).
+
+    Supports HTTP Range / If-Range (seeking without re-downloading), ETag /
+    Last-Modified and If-None-Match (304). Range handling is Starlette's
+    FileResponse, hence starlette>=0.40 in requirements.txt (older versions
+    ignore Range and send the whole file with 200). The file is streamed in small chunks,
+    or handed to the server as a path (zero-copy) when it supports the ASGI
+    pathsend extension.
+    """
+    meta_path = os.path.join(session_path(folder_name), 'meta.json')
+    if not os.path.exists(meta_path):
+        raise HTTPException(status_code=404, detail=f"Session '{folder_name}' not found")
+
+    if rendition == 'audio':
+        path = await _audio_rendition(folder_name, question_index)
+        kind = 'audio'
+    else:
+        path = await _local_media(folder_name, f"Q{question_index}.webm")
+        kind = 'video'
+        if rendition == 'auto' and not os.path.exists(path):
+            path = await _local_media(folder_name, f"Q{question_index}.opus")
+            kind = 'audio'
+
+    try:
+        stat = await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No {rendition if rendition != 'auto' else 'media'} for question {question_index} in session '{folder_name}'")
+
+    suffix, media_type = RENDITIONS[kind]
+    response = FileResponse(
+        path,
+        media_type=media_type,
+        filename=f"{folder_name}_Q{question_index}.{suffix}",
+        content_disposition_type="inline",
+        stat_result=stat,
+        # Revalidate (cheap 304); a retake changes the ETag
+        headers={"Cache-Control": "no-cache"}
+    )
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        if '*' in candidates or response.headers['etag'] in candidates:
+            return Response(status_code=304, headers={
+                key: response.headers[key] for key in ('etag', 'last-modified', 'cache-control')
+            })
+    return response
@@ -1,14 +1,17 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from typing import List, Optional
+from app.core import config
 from app.storage.metadata_manager import finalize_metadata
+from app.storage.blob_backend import is_remote_backend, push_session
 from app.services.transcription_manager import (
     is_transcription_available,
-    get_transcription_engine,
-    transcribe_batch_videos
+    get_transcription_engine
 )
 from app.services.task_queue import queue, TaskStatus
-from app.storage.file_manager import BASE, update_metadata
-import os
+from app.services.transcription_jobs import transcribed_questions, recorded_questions_count
+from app.services.session_transcription import start_session_task
+from app.services import job_store
 import asyncio
 
 router = APIRouter()
@@ -17,56 +20,38 @@ class FinishRequest(BaseModel):
     token: str
     folder: str
     questionsCount: int
+    model: Optional[str] = None  # Whisper model variant, e.g. "medium" or "medium-int8"
 
 
-async def _transcribe_in_background(folder: str, questions_count: int):
-    """Background transcription task"""
-    try:
-        # Create transcription job
-        await queue.create_job(folder, questions_count)
-        await queue.start_job(folder)
-        
-        from app.storage.file_manager import BASE
-        folder_path = os.path.join(BASE, folder)
-        
-        # Collect video files
-        video_files = []
-        for i in range(1, questions_count + 1):
-            video_file = os.path.join(folder_path, f"Q{i}.webm")
-            video_files.append((i, video_file))
-        
-        print(f"🔄 Starting transcription for {questions_count} videos in {folder}")
-        
-        # Transcribe all videos with progress callback
-        async def on_progress(question_index, success, transcript, error):
-            if success:
-                await queue.update_task(
-                    folder, question_index, TaskStatus.SUCCESS,
-                    transcript=transcript, confidence=0.95
-                )
-                # Update metadata immediately
-                update_metadata(folder, question_index, transcript=transcript, confidence=0.95)
-            else:
-                await queue.update_task(
-                    folder, question_index, TaskStatus.FAILED,
-                    error=error
-                )
-        
-        await transcribe_batch_videos(
-            video_files,
-            language="en",
-            translate_to_english=False,
-            model_size="medium",
-            on_progress=on_progress
-        )
-        
-        # Mark job as complete
-        await queue.complete_job(folder)
-        print(f"✅ Transcription completed for {folder}")
+class RetryRequest(BaseModel):
+    token: str
+    folder: str
+    questionIndices: Optional[List[int]] = None  # Default: every failed question
+    model: Optional[str] = None
+
+
+async def _retry_failed(folder: str, questions_count: Optional[int], model_size: str, indices: Optional[List[int]] = None) -> dict:
+    """Re-run only the failed questions of a session (never the successful ones)"""
+    if config.TRANSCRIPTION_MODE == "worker":
+        retrying = await asyncio.to_thread(job_store.retry_failed, folder, indices)
+        if retrying is None:
+            raise HTTPException(status_code=409, detail=f"Transcription of '{folder}' is still running or was never queued")
+        return {"ok": True, "transcribing": bool(retrying), "retrying": retrying, "queued": True, "engine": "worker", "model": model_size}
+    
+    if await queue.get_job(folder) is None:
+        # Job state lost (restart / crash): rebuild it from the transcripts on disk
+        if not questions_count:
+            raise HTTPException(status_code=404, detail=f"No transcription job found for folder '{folder}'")
+        transcribed = await asyncio.to_thread(transcribed_questions, folder)
+        await queue.restore_job(folder, questions_count, transcribed)
     
-    except Exception as e:
-        print(f"⚠️  Transcription background task failed: {e}")
-        await queue.complete_job(folder)
+    retrying = await queue.retry_tasks(folder, indices)
+    if retrying is None:
+        raise HTTPException(status_code=409, detail=f"Transcription of '{folder}' is still running")
+    if retrying:
+        job = await queue.get_job(folder)
+        start_session_task(folder, job.questions_count, model_size, retrying)
+    return {"ok": True, "transcribing": bool(retrying), "retrying": retrying, "engine": get_transcription_engine(), "model": model_size}
 
 
 @router.post('/session/finish')
@@ -76,19 +61,75 @@ async def session_finish(req: FinishRequest):
         raise HTTPException(status_code=401, detail="Invalid token")
     
     # Finalize metadata
-    finalize_metadata(req.folder, req.questionsCount)
+    await asyncio.to_thread(finalize_metadata, req.folder, req.questionsCount)
+    model_size = req.model or config.WHISPER_MODEL
+    
+    # Remote blob backend: upload the finished session (workers on other nodes pull it from there)
+    if is_remote_backend():
+        await asyncio.to_thread(push_session, req.folder)
+    
+    # Worker mode: only enqueue; `python -m app.worker` processes transcribe
+    if config.TRANSCRIPTION_MODE == "worker":
+        job = await asyncio.to_thread(job_store.enqueue_job, req.folder, req.questionsCount, config.TRANSCRIBE_LANGUAGE, model_size)
+        if job['status'] == 'failed':
+            # Finish called again: never redo successful questions
+            return await _retry_failed(req.folder, req.questionsCount, model_size)
+        return {
+            "ok": True,
+            "transcribing": True,
+            "queued": True,
+            "engine": "worker",
+            "model": model_size
+        }
     
     # Start transcription in background (non-blocking)
     if is_transcription_available():
-        asyncio.create_task(_transcribe_in_background(req.folder, req.questionsCount))
+        job = await queue.get_job(req.folder)
+        if job is not None:
+            # Finish called again: never redo successful questions
+            if job.status == TaskStatus.PROCESSING:
+                return {"ok": True, "transcribing": True, "engine": get_transcription_engine(), "model": model_size}
+            return await _retry_failed(req.folder, req.questionsCount, model_size)
+        
+        start_session_task(req.folder, req.questionsCount, model_size)
         return {
             "ok": True,
             "transcribing": True,
-            "engine": get_transcription_engine()
+            "engine": get_transcription_engine(),
+            "model": model_size
         }
     else:
         return {
             "ok": True,
             "transcribing": False,
             "message": "No transcription engine available"
-        }
\ No newline at end of file
+        }
+
+
+@router.post('/session/retry')
+async def session_retry(req: RetryRequest):
+    """
+    Re-run transcription of failed questions only
+    
+    Returns:
+        {
+            "ok": true,
+            "transcribing": true,
+            "retrying": [2, 4],
+            "engine": "...",
+            "model": "medium"
+        }
+    """
+    if req.token != "12345":
+        raise HTTPException(status_code=401, detail="Invalid token")
+    
+    if config.TRANSCRIPTION_MODE != "worker" and not is_transcription_available():
+        return {
+            "ok": True,
+            "transcribing": False,
+            "message": "No transcription engine available"
+        }
+    
+    meta_count = await asyncio.to_thread(recorded_questions_count, req.folder)
+    return await _retry_failed(req.folder, meta_count, req.model or config.WHISPER_MODEL, req.questionIndices)
+
@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.core.time_utils import make_folder_name, sanitize_name
 from app.storage.file_manager import ensure_session_folder
+from app.services.admission import session_retry_after
+import asyncio
 
 router = APIRouter()
 
@@ -10,11 +12,19 @@ class StartRequest(BaseModel):
     userName: str
 
 @router.post('/session/start')
-def session_start(req: StartRequest):
+async def session_start(req: StartRequest):
     if req.token != "12345":
         raise HTTPException(status_code=401, detail="Invalid token")
+    # Admission control: do not start interviews the transcription backlog cannot absorb
+    retry_after = await session_retry_after()
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="The server is busy transcribing other interviews; please try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
     # Server is the source of truth for sanitization; return sanitized name to client
     sanitized = sanitize_name(req.userName)
     folder = make_folder_name(req.userName)
-    ensure_session_folder(folder)
+    await asyncio.to_thread(ensure_session_folder, folder)
     return {"ok": True, "folder": folder, "sanitizedUserName": sanitized}
\ No newline at end of file
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from app.services.task_queue import queue
+from app.services import job_store
+import asyncio
 
 router = APIRouter()
 
@@ -21,16 +23,20 @@ async def get_transcription_status(folder_name: str):
         "tasks": {
             "1": {"status": "success", "transcript": "...", "confidence": 0.95, "error": ""},
             "2": {"status": "processing", ...},
-            "3": {"status": "failed", "error": "File not found", ...},
+            "3": {"status": "failed", "error": "File not found", "attempts": 1, "last_error": "File not found", ...},
         },
         "timestamps": {
             "created_at": "2025-12-05T00:18:00",
             "started_at": "2025-12-05T00:20:00",
-            "completed_at": "2025-12-05T00:25:00"
+            "completed_at": "2025-12-05T00:25:00",
+            "retry_at": "2025-12-05T00:25:30"  # next automatic retry of failed questions, if scheduled
         }
     }
     """
     progress = await queue.get_progress(folder_name)
+    if progress is None:
+        # Jobs handled by standalone workers live in the durable job store
+        progress = await asyncio.to_thread(job_store.get_progress, folder_name)
     
     if progress is None:
         raise HTTPException(
@@ -52,5 +58,6 @@ async def get_transcription_status(folder_name: str):
             "created_at": progress["created_at"],
             "started_at": progress["started_at"],
             "completed_at": progress["completed_at"],
+            "retry_at": progress.get("retry_at"),
         }
     }
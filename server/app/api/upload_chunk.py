@@ -0,0 +1,98 @@
+from fastapi import APIRouter, File, Form, UploadFile, HTTPException
+from typing import Optional
+from app.storage.file_manager import append_question_chunk, finish_question_chunks, update_metadata
+from app.services.session_transcription import supersede_question
+from app.services.transcription_jobs import save_transcription_result
+from app.services.task_queue import queue
+from app.services import admission, live_transcription
+import asyncio
+
+router = APIRouter()
+
+
+@router.post('/upload-chunk')
+async def upload_chunk(
+    token: str = Form(...),
+    folder: str = Form(...),
+    questionIndex: int = Form(...),
+    seq: int = Form(...),
+    final: bool = Form(False),
+    sha256: Optional[str] = Form(None),
+    chunk: Optional[UploadFile] = File(None)
+):
+    """
+    Live upload of an answer while it is recorded (MediaRecorder timeslices)
+
+    Chunks are numbered from 0 (0 starts a new take) and appended to the answer;
+    re-sending a chunk is a no-op. They are transcribed as they arrive (see
+    live_transcription.py). The request with `final=true` (`seq` = number of
+    chunks, optional `sha256` of the whole recording, no chunk) stores the answer
+    as `Q{n}.webm` like /upload-one and saves the live transcript. 409 means chunks
+    are missing or the digest does not match: the client then falls back to
+    /upload-one with the whole blob. Each request holds one of the token's
+    upload slots (429 + Retry-After at TOKEN_MAX_CONCURRENT_UPLOADS, like
+    /upload-one).
+
+    Returns:
+        {"ok": true, "seq": 5, "size": 123456}                  # next expected chunk
+        {"ok": true, "final": true, "savedAs": "Q1.webm", "sha256": "...", "size": 123456,
+         "unchanged": false, "transcription": "live" | null | "pending" | "queued" | ...}
+    """
+    if token != "12345":
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if not admission.acquire_upload_slot(token):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many uploads in progress for this token",
+            headers={"Retry-After": str(admission.UPLOAD_RETRY_AFTER_SECONDS)}
+        )
+    try:
+        return await _store_chunk(folder, questionIndex, seq, final, sha256, chunk)
+    finally:
+        admission.release_upload_slot(token)
+
+
+async def _store_chunk(folder: str, questionIndex: int, seq: int, final: bool,
+                       sha256: Optional[str], chunk: Optional[UploadFile]):
+    if not final:
+        if chunk is None:
+            raise HTTPException(status_code=400, detail="Missing chunk")
+        data = await chunk.read()
+        try:
+            state = await asyncio.to_thread(append_question_chunk, folder, questionIndex, seq, data)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if state["appended"]:
+            await live_transcription.feed_chunk(folder, questionIndex, seq, data)
+        return {"ok": True, "seq": state["seq"], "size": state["size"]}
+
+    try:
+        saved = await asyncio.to_thread(finish_question_chunks, folder, questionIndex, seq, sha256)
+    except (FileNotFoundError, ValueError) as e:
+        live_transcription.discard(folder, questionIndex)
+        raise HTTPException(status_code=409, detail=str(e))
+
+    result = await live_transcription.finish_answer(folder, questionIndex)
+    transcription = None
+    if not saved["unchanged"]:
+        await asyncio.to_thread(
+            update_metadata, folder, questionIndex,
+            checksum={"sha256": saved["sha256"], "size": saved["size"]}
+        )
+        if result and result['success'] and await queue.get_job(folder) is None:
+            # Transcribed while recording: session/finish skips this answer
+            await asyncio.to_thread(save_transcription_result, folder, questionIndex, result)
+            transcription = "live"
+        else:
+            # Retake of an answer that is being (or was) transcribed
+            transcription = await supersede_question(folder, questionIndex)
+
+    return {
+        "ok": True,
+        "final": True,
+        "savedAs": f"Q{questionIndex}.webm",
+        **saved,
+        "transcription": transcription
+    }
@@ -1,22 +1,198 @@
-from fastapi import APIRouter, File, Form, UploadFile, HTTPException
-from app.storage.file_manager import save_question_file, update_metadata
+from fastapi import APIRouter, HTTPException, Request
+from typing import AsyncIterator, Dict, Tuple
+from app.storage.file_manager import QuestionUpload, UPLOAD_CHUNK_SIZE, update_metadata
+from app.services.session_transcription import supersede_question
+from app.services import admission
+import asyncio
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
 
 router = APIRouter()
 
+# multipart/form-data fields of upload-one (the client sends them before `video`)
+FORM_FIELDS = ('token', 'folder', 'questionIndex')
+# Text fields are small; anything bigger is not a real client
+MAX_FIELD_BYTES = 4096
 
-@router.post('/upload-one')
-async def upload_one(token: str = Form(...), folder: str = Form(...), questionIndex: str = Form(...), video: UploadFile = File(...)):
-    """Upload single question video"""
-    if token != "12345":
+
+async def _iter_form(request: Request) -> AsyncIterator[Tuple[str, str, object]]:
+    """
+    Parse a multipart/form-data body as it arrives (nothing is spooled)
+
+    Yields ('field', name, text) for text fields, ('data', name, bytes) for each
+    piece of a file part and ('end', name, None) once the file part is complete.
+    """
+    content_type, params = parse_options_header(request.headers.get('content-type', ''))
+    if content_type != b'multipart/form-data' or b'boundary' not in params:
+        raise HTTPException(status_code=422, detail="Expected a multipart/form-data body")
+
+    events = []
+    part = {}
+
+    def on_part_begin():
+        part.clear()
+        part.update(headers={}, header=b'', value=b'', data=bytearray())
+
+    def on_header_field(data, start, end):
+        part['header'] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part['value'] += data[start:end]
+
+    def on_header_end():
+        part['headers'][part['header'].lower()] = part['value']
+        part['header'], part['value'] = b'', b''
+
+    def on_headers_finished():
+        _, options = parse_options_header(part['headers'].get(b'content-disposition', b''))
+        part['name'] = options.get(b'name', b'').decode('utf-8', errors='replace')
+        part['is_file'] = b'filename' in options
+
+    def on_part_data(data, start, end):
+        if part['is_file']:
+            events.append(('data', part['name'], data[start:end]))
+        else:
+            part['data'] += data[start:end]
+            if len(part['data']) > MAX_FIELD_BYTES:
+                raise HTTPException(status_code=422, detail=f"Field '{part['name']}' is too large")
+
+    def on_part_end():
+        if part['is_file']:
+            events.append(('end', part['name'], None))
+        else:
+            events.append(('field', part['name'], part['data'].decode('utf-8', errors='replace')))
+
+    parser = MultipartParser(params[b'boundary'], {
+        'on_part_begin': on_part_begin,
+        'on_header_field': on_header_field,
+        'on_header_value': on_header_value,
+        'on_header_end': on_header_end,
+        'on_headers_finished': on_headers_finished,
+        'on_part_data': on_part_data,
+        'on_part_end': on_part_end,
+    })
+    async for chunk in request.stream():
+        parser.write(chunk)
+        for event in events:
+            yield event
+        events.clear()
+    parser.finalize()
+    for event in events:
+        yield event
+
+
+def _write_checked(upload: QuestionUpload, data: bytes):
+    """Append to the answer unless the disk reserve is reached (chunked bodies have no Content-Length)"""
+    reason = admission.disk_rejection(0)
+    if reason:
+        raise HTTPException(status_code=413, detail=reason, headers={"Retry-After": str(admission.UPLOAD_RETRY_AFTER_SECONDS)})
+    upload.write(data)
+
+
+def _form_target(fields: Dict[str, str]) -> Tuple[str, str, int]:
+    """(token, folder, question index) of the fields sent before the video"""
+    missing = [name for name in FORM_FIELDS if name not in fields]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing form field(s) before the video: {', '.join(missing)}")
+    if fields['token'] != "12345":
         raise HTTPException(status_code=401, detail="Invalid token")
-    
-    contents = await video.read()
-    save_question_file(folder, int(questionIndex), contents)
-    
-    # Update metadata
-    update_metadata(folder, int(questionIndex))
-    
+    try:
+        return fields['token'], fields['folder'], int(fields['questionIndex'])
+    except ValueError:
+        raise HTTPException(status_code=422, detail="questionIndex must be an integer")
+
+
+@router.post('/upload-one')
+async def upload_one(request: Request):
+    """
+    Upload single question video
+
+    multipart/form-data fields: token, folder, questionIndex, then video (file).
+
+    The body is parsed as it arrives and the video is hashed and written straight
+    into the answer's temp file, in UPLOAD_CHUNK_SIZE writes off the event loop;
+    it is never spooled or held in memory. Re-sending identical content
+    (client retry) leaves the stored answer and its transcript untouched. A new
+    take of an answer that is being (or was) transcribed supersedes the old take:
+    its transcription is cancelled or ignored and only the newest take is
+    transcribed.
+
+    Rejected with 413 when the upload would eat into the disk reserve (usually
+    before the body is read, see admission.py, else while it is written) and with
+    429 + Retry-After when the token already has TOKEN_MAX_CONCURRENT_UPLOADS
+    uploads in flight.
+
+    Returns:
+        {
+            "ok": true,
+            "savedAs": "Q1.webm",
+            "sha256": "9f86d0...",
+            "size": 123456,
+            "unchanged": false,
+            "transcription": null | "pending" | "cancelling" | "queued" | "start"
+        }
+    """
+    fields: Dict[str, str] = {}
+    token = upload = saved = None
+    pending = bytearray()
+    try:
+        async for kind, name, value in _iter_form(request):
+            if kind == 'field':
+                fields[name] = value
+                continue
+            if name != 'video' or saved is not None:
+                continue
+            if upload is None:
+                token, folder, index = _form_target(fields)
+                if not admission.acquire_upload_slot(token):
+                    token = None
+                    raise HTTPException(
+                        status_code=429,
+                        detail="Too many uploads in progress for this token",
+                        headers={"Retry-After": str(admission.UPLOAD_RETRY_AFTER_SECONDS)}
+                    )
+                try:
+                    upload = await asyncio.to_thread(QuestionUpload, folder, index)
+                except FileNotFoundError as e:
+                    raise HTTPException(status_code=404, detail=str(e))
+            if kind == 'data':
+                pending += value
+                if len(pending) >= UPLOAD_CHUNK_SIZE:
+                    await asyncio.to_thread(_write_checked, upload, bytes(pending))
+                    pending.clear()
+            else:
+                if pending:
+                    await asyncio.to_thread(_write_checked, upload, bytes(pending))
+                    pending.clear()
+                saved = await asyncio.to_thread(upload.finish)
+    except BaseException:
+        if upload is not None and saved is None:
+            upload.abort()  # Close + unlink; also runs when the client went away (cancelled)
+        raise
+    finally:
+        if token is not None:
+            admission.release_upload_slot(token)
+
+    if saved is None:
+        _form_target(fields)  # 422 / 401 for a request without a video
+        raise HTTPException(status_code=422, detail="Missing video file")
+
+    # Update metadata (only when the stored file changed)
+    transcription = None
+    if not saved["unchanged"]:
+        await asyncio.to_thread(
+            update_metadata, folder, index,
+            checksum={"sha256": saved["sha256"], "size": saved["size"]}
+        )
+        # Retake: drop transcription work for the previous take
+        transcription = await supersede_question(folder, index)
+
     return {
         "ok": True,
-        "savedAs": f"Q{questionIndex}.webm"
-    }
\ No newline at end of file
+        "savedAs": f"Q{index}.webm",
+        **saved,
+        "transcription": transcription
+    }
@@ -0,0 +1,167 @@
+"""
+Runtime configuration read from environment variables (and `.env` if python-dotenv is installed).
+"""
+
+import os
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def env_str(name: str, default: str) -> str:
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Admin endpoints (/api/admin/...): disabled unless ADMIN_TOKEN is set
+ADMIN_TOKEN = env_str("ADMIN_TOKEN", "")
+
+# Profiling: fraction of requests / transcriptions to profile (0 = disabled)
+PROFILE_SAMPLE_RATE = env_float("PROFILE_SAMPLE_RATE", 0.0)
+PROFILE_DIR = env_str("PROFILE_DIR", os.path.join(SERVER_DIR, 'profiles'))
+PROFILE_INTERVAL_MS = env_float("PROFILE_INTERVAL_MS", 5.0)
+
+# Transcription engine: "whisper_local" (openai-whisper, fp32) or "faster_whisper"
+# (CTranslate2, int8). The other registered engines are used as fallbacks.
+# "stub" sleeps instead of transcribing (load testing, see scripts/load_test.py).
+TRANSCRIPTION_ENGINE = env_str("TRANSCRIPTION_ENGINE", "whisper_local")
+FASTER_WHISPER_COMPUTE_TYPE = env_str("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+FASTER_WHISPER_CPU_THREADS = env_int("FASTER_WHISPER_CPU_THREADS", 0)  # 0 = library default
+
+# TRANSCRIPTION_ENGINE=stub (load testing): seconds per answer and share of failed answers
+STUB_TRANSCRIBE_SECONDS = env_float("STUB_TRANSCRIBE_SECONDS", 2.0)
+STUB_FAILURE_RATE = env_float("STUB_FAILURE_RATE", 0.0)
+
+# Default Whisper model for session transcription ("<size>-int8" = quantized CPU variant)
+WHISPER_MODEL = env_str("WHISPER_MODEL", "medium")
+# Where quantized model copies are cached (same root openai-whisper downloads into)
+WHISPER_CACHE_DIR = env_str(
+    "WHISPER_CACHE_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "whisper")
+)
+
+# Long-clip mode: answers longer than LONG_CLIP_SECONDS (0 = disabled) are split at
+# silence into windows of at most LONG_CLIP_WINDOW_SECONDS and transcribed in parallel
+LONG_CLIP_SECONDS = env_float("LONG_CLIP_SECONDS", 0.0)
+LONG_CLIP_WINDOW_SECONDS = env_float("LONG_CLIP_WINDOW_SECONDS", 30.0)
+LONG_CLIP_OVERLAP_SECONDS = env_float("LONG_CLIP_OVERLAP_SECONDS", 1.0)
+# Worker processes for parallel transcription (0 = half the cores); each loads its own model
+TRANSCRIBE_WORKERS = env_int("TRANSCRIBE_WORKERS", 0)
+
+# "inline": transcribe in the API process; "worker": the API only enqueues jobs into
+# the durable job store and `python -m app.worker` processes transcribe them
+TRANSCRIPTION_MODE = env_str("TRANSCRIPTION_MODE", "inline")
+JOB_DB_PATH = env_str("JOB_DB_PATH", "")  # Default: uploads/.transcription_jobs.sqlite3
+# SQLite journal of the job store. WAL needs shared memory between processes and
+# breaks on network volumes (NFS/SMB), so only set WAL when JOB_DB_PATH is on local disk
+JOB_DB_JOURNAL_MODE = env_str("JOB_DB_JOURNAL_MODE", "DELETE").upper()
+WORKER_LEASE_SECONDS = env_float("WORKER_LEASE_SECONDS", 120.0)
+WORKER_POLL_SECONDS = env_float("WORKER_POLL_SECONDS", 2.0)
+
+# Session storage: directory layout under uploads/ ("flat", "hashed" or "date") and an
+# optional blob backend ("local" or "s3"; s3 also works with MinIO via S3_ENDPOINT_URL).
+# Sharding is opt-in: set STORAGE_LAYOUT and run scripts/migrate_storage_layout.py
+STORAGE_LAYOUT = env_str("STORAGE_LAYOUT", "flat")
+STORAGE_BACKEND = env_str("STORAGE_BACKEND", "local")
+S3_BUCKET = env_str("S3_BUCKET", "")
+S3_PREFIX = env_str("S3_PREFIX", "uploads")
+S3_ENDPOINT_URL = env_str("S3_ENDPOINT_URL", "")
+S3_REGION = env_str("S3_REGION", "us-east-1")
+
+# Post-transcription compaction of answer videos: "off", "audio" (add a low-bitrate
+# Opus rendition Q{n}.opus) or "downscale" (re-encode Q{n}.webm at COMPACT_VIDEO_HEIGHT)
+COMPACTION_MODE = env_str("COMPACTION_MODE", "off")
+COMPACT_AUDIO_BITRATE = env_str("COMPACT_AUDIO_BITRATE", "24k")
+COMPACT_VIDEO_HEIGHT = env_int("COMPACT_VIDEO_HEIGHT", 360)
+# Retention tiers by session age in days (0 = keep forever): full video, then audio
+# only, then transcript only. Only transcribed answers are ever reduced.
+RETENTION_VIDEO_DAYS = env_int("RETENTION_VIDEO_DAYS", 0)
+RETENTION_AUDIO_DAYS = env_int("RETENTION_AUDIO_DAYS", 0)
+
+# Failed questions are retried automatically with exponential backoff
+# (RETRY_BACKOFF_SECONDS * 2^(attempt-1), capped); attempts include the first run,
+# so 1 disables automatic retries. POST /api/session/retry retries on demand.
+RETRY_MAX_ATTEMPTS = env_int("RETRY_MAX_ATTEMPTS", 3)
+RETRY_BACKOFF_SECONDS = env_float("RETRY_BACKOFF_SECONDS", 30.0)
+RETRY_BACKOFF_MAX_SECONDS = env_float("RETRY_BACKOFF_MAX_SECONDS", 600.0)
+
+# Decoded 16 kHz PCM of each answer, reused by retries / upgrades / long-clip windows
+# (see app/services/audio_cache.py); 0 bytes disables it. Default dir: uploads/.audio_cache
+AUDIO_CACHE_MAX_BYTES = env_int("AUDIO_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024)
+AUDIO_CACHE_DIR = env_str("AUDIO_CACHE_DIR", "")
+
+# Parsed meta.json cache of the transcript read endpoints (0 entries = disabled)
+META_CACHE_ENTRIES = env_int("META_CACHE_ENTRIES", 1024)
+META_CACHE_MAX_BYTES = env_int("META_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+
+# POST /api/transcripts/batch: max sessions per request, concurrent meta.json reads
+BATCH_TRANSCRIPTS_MAX = env_int("BATCH_TRANSCRIPTS_MAX", 200)
+BATCH_READ_CONCURRENCY = env_int("BATCH_READ_CONCURRENCY", 16)
+
+# Spoken language: a code ("en", "vi", ...) used as is, "auto" to detect it once per
+# session (on the first answer with LANGUAGE_DETECT_MIN_SPEECH_SECONDS of speech and
+# LANGUAGE_DETECT_MIN_PROBABILITY; stored in meta.json), or "clip" to detect per answer
+TRANSCRIBE_LANGUAGE = env_str("TRANSCRIBE_LANGUAGE", "en")
+LANGUAGE_DETECT_MIN_PROBABILITY = env_float("LANGUAGE_DETECT_MIN_PROBABILITY", 0.8)
+LANGUAGE_DETECT_MIN_SPEECH_SECONDS = env_float("LANGUAGE_DETECT_MIN_SPEECH_SECONDS", 5.0)
+
+# Adaptive model choice: when the estimated wait for a transcript exceeds
+# TRANSCRIBE_SLO_SECONDS (0 = disabled), passes fall back along MODEL_FALLBACKS
+# (largest first). Answers transcribed with a fallback are re-transcribed with the
+# requested model when the node is idle (MODEL_UPGRADE_IDLE).
+TRANSCRIBE_SLO_SECONDS = env_float("TRANSCRIBE_SLO_SECONDS", 0.0)
+MODEL_FALLBACKS = env_str("MODEL_FALLBACKS", "small,base")
+MODEL_UPGRADE_IDLE = env_bool("MODEL_UPGRADE_IDLE", True)
+MODEL_UPGRADE_POLL_SECONDS = env_float("MODEL_UPGRADE_POLL_SECONDS", 30.0)
+# Previous transcript versions kept per answer in meta.json
+TRANSCRIPT_VERSIONS_KEPT = env_int("TRANSCRIPT_VERSIONS_KEPT", 5)
+
+# Admission control (opt-in, 0 disables each check). New sessions get 429 + Retry-After
+# while the estimated transcription backlog exceeds ADMISSION_MAX_BACKLOG_SECONDS
+# (ADMISSION_ANSWER_SECONDS per answer until durations have been observed).
+# Uploads get 413 when free disk would drop below UPLOAD_DISK_RESERVE_BYTES, and
+# 429 above TOKEN_MAX_CONCURRENT_UPLOADS in flight for the same token.
+ADMISSION_MAX_BACKLOG_SECONDS = env_float("ADMISSION_MAX_BACKLOG_SECONDS", 0.0)
+ADMISSION_ANSWER_SECONDS = env_float("ADMISSION_ANSWER_SECONDS", 60.0)
+UPLOAD_DISK_RESERVE_BYTES = env_int("UPLOAD_DISK_RESERVE_BYTES", 0)
+TOKEN_MAX_CONCURRENT_UPLOADS = env_int("TOKEN_MAX_CONCURRENT_UPLOADS", 0)
+
+# Graceful shutdown (inline mode): seconds answers being transcribed get to finish
+# before they are aborted; unfinished sessions are resumed by the next process
+SHUTDOWN_GRACE_SECONDS = env_float("SHUTDOWN_GRACE_SECONDS", 30.0)
+
+# Live answers (client VITE_LIVE_UPLOAD): timesliced chunks are appended while the
+# answer is recorded (POST /api/upload-chunk). In inline mode, with an engine that
+# has transcribe_audio, they are decoded as they arrive and transcribed in rolling
+# windows of about LIVE_WINDOW_SECONDS, so the transcript is ready right after stop
+LIVE_TRANSCRIPTION = env_bool("LIVE_TRANSCRIPTION", True)
+LIVE_WINDOW_SECONDS = env_float("LIVE_WINDOW_SECONDS", 20.0)
+# Live decoders (ffmpeg + PCM buffer) of answers that got no chunk for this long
+# (tab closed mid-answer) are dropped; the answer falls back to upload-one
+LIVE_IDLE_TIMEOUT_SECONDS = env_float("LIVE_IDLE_TIMEOUT_SECONDS", 120.0)
@@ -0,0 +1,253 @@
+"""
+Opt-in profiling hooks
+
+- ProfilingMiddleware: samples a fraction of HTTP requests with a stack sampler.
+  One sampler thread serves all requests being profiled, and each stack is
+  counted only for the request it belongs to: the event-loop thread while that
+  request's task is running, threads doing work it handed to the loop's default
+  executor (asyncio.to_thread), and threads running its endpoint when the
+  endpoint is sync (FastAPI threadpool, e.g. list_all_sessions). Other requests,
+  background tasks and transcription threads are left out.
+  Output is collapsed-stack text (`.folded`), readable by flamegraph.pl / speedscope.
+- run_profiled: runs a callable under cProfile when sampled (`.prof`, readable by
+  pstats / snakeviz). Used around each transcription inside its worker thread.
+
+The sample rate comes from PROFILE_SAMPLE_RATE and can be changed at runtime via
+/api/admin/profiling. With a rate of 0 the only cost is one float comparison.
+"""
+
+import asyncio
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core import config
+
+_state = {'sample_rate': min(1.0, max(0.0, config.PROFILE_SAMPLE_RATE))}
+
+# Leaf frames in these files mean the thread is idle (waiting on a lock, queue or selector)
+_IDLE_FILES = ('threading.py', 'selectors.py', 'queue.py')
+
+
+def get_sample_rate() -> float:
+    return _state['sample_rate']
+
+
+def set_sample_rate(rate: float) -> float:
+    """Change the sample rate at runtime (clamped to 0..1)"""
+    _state['sample_rate'] = min(1.0, max(0.0, float(rate)))
+    return _state['sample_rate']
+
+
+def should_sample() -> bool:
+    rate = _state['sample_rate']
+    return rate > 0 and random.random() < rate
+
+
+def _profile_path(label: str, ext: str) -> str:
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    safe_label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_')[:80]
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    return os.path.join(config.PROFILE_DIR, f"{stamp}_{safe_label}.{ext}")
+
+
+class RequestProfile:
+    """Stack counts of one sampled request and what identifies its threads"""
+
+    def __init__(self, scope, frame):
+        self.scope = scope
+        # The middleware's coroutine frame: on the loop thread's stack exactly
+        # while this request's task is running
+        self.frame = frame
+        self.loop_thread = threading.get_ident()
+        self.task = asyncio.current_task()
+        # Executor threads currently running work submitted by this request
+        self.threads = set()
+        self.counts: Counter = Counter()
+
+    def owns(self, ident: int, frames: list) -> bool:
+        if ident == self.loop_thread:
+            return any(frame is self.frame for frame in frames)
+        if ident in self.threads:
+            return True
+        # Sync endpoint in the threadpool (scope["endpoint"] is set once routed)
+        code = getattr(self.scope.get('endpoint'), '__code__', None)
+        return code is not None and any(frame.f_code is code for frame in frames)
+
+    def run_tagged(self, func, *args, **kwargs):
+        ident = threading.get_ident()
+        self.threads.add(ident)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.threads.discard(ident)
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar('request_profile', default=None)
+
+
+class TaggingExecutor(ThreadPoolExecutor):
+    """Default executor of the event loop: marks threads running work for a profiled request"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        profile = _current_profile.get()
+        # Only work submitted by the request's own task, not by tasks it spawned
+        if profile is not None and threading.get_ident() == profile.loop_thread \
+                and asyncio.current_task() is profile.task:
+            return super().submit(profile.run_tagged, fn, *args, **kwargs)
+        return super().submit(fn, *args, **kwargs)
+
+
+def install_executor(loop: asyncio.AbstractEventLoop):
+    """Use TaggingExecutor as the loop's default executor (call before the loop uses one)"""
+    loop.set_default_executor(TaggingExecutor(thread_name_prefix='asyncio'))
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of all other threads at a fixed interval while
+    requests are registered, counting each stack for the one request that owns it
+    (stacks claimed by none or by several requests are skipped).
+    The thread is started by the first add() and exits once nothing is registered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles: List[RequestProfile] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, args=(config.PROFILE_INTERVAL_MS / 1000.0,),
+                                                name='stack-sampler', daemon=True)
+                self._thread.start()
+
+    def remove(self, profile: RequestProfile):
+        """Unregister; profile.counts is final once this returns"""
+        with self._lock:
+            self._profiles.remove(profile)
+
+    def _run(self, interval: float):
+        own_ident = threading.get_ident()
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_ident:
+                        continue
+                    if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                        continue
+                    frames = []
+                    while frame is not None:
+                        frames.append(frame)
+                        frame = frame.f_back
+                    owners = [p for p in self._profiles if p.owns(ident, frames)]
+                    if len(owners) != 1:
+                        continue
+                    stack = ';'.join(
+                        f"{f.f_code.co_name} ({os.path.basename(f.f_code.co_filename)}:{f.f_lineno})"
+                        for f in reversed(frames)
+                    )
+                    owners[0].counts[stack] += 1
+
+
+_sampler = StackSampler()
+
+
+def _write_folded(counts: Counter, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in counts.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles a sampled fraction of HTTP requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope, sys._getframe())
+        token = _current_profile.set(profile)
+        _sampler.add(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _sampler.remove(profile)
+            _current_profile.reset(token)
+            elapsed_ms = int((time.perf_counter() - started) * 1000)
+            # Skip requests that finished before the first sample
+            if profile.counts:
+                label = f"{scope.get('method', '')}_{scope.get('path', '')}_{elapsed_ms}ms"
+                try:
+                    await asyncio.to_thread(_write_folded, profile.counts, _profile_path(label, 'folded'))
+                except Exception as e:
+                    print(f"⚠️  Could not write request profile: {e}")
+
+
+def run_profiled(label: str, func, *args, **kwargs):
+    """Call `func`, profiling it with cProfile if this call is sampled"""
+    if not should_sample():
+        return func(*args, **kwargs)
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        try:
+            profiler.dump_stats(_profile_path(f"{label}_{elapsed_ms}ms", 'prof'))
+        except Exception as e:
+            print(f"⚠️  Could not write profile for {label}: {e}")
+
+
+def list_profiles() -> List[Dict]:
+    """List captured profiles (newest first)"""
+    if not os.path.isdir(config.PROFILE_DIR):
+        return []
+
+    profiles = []
+    for name in os.listdir(config.PROFILE_DIR):
+        if not name.endswith(('.prof', '.folded')):
+            continue
+        path = os.path.join(config.PROFILE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        profiles.append({
+            'name': name,
+            'kind': 'cprofile' if name.endswith('.prof') else 'stacks',
+            'size': stat.st_size,
+            'createdAt': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        })
+    profiles.sort(key=lambda p: p['name'], reverse=True)
+    return profiles
+
+
+def get_profile_path(name: str) -> Optional[str]:
+    """Resolve a profile name to its path (None if missing or not a plain file name)"""
+    if os.path.basename(name) != name or not name.endswith(('.prof', '.folded')):
+        return None
+    path = os.path.join(config.PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
@@ -1,8 +1,49 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import verify_token, session_start, upload_one, session_finish, get_transcripts, transcription_status
+from app.api import verify_token, session_start, upload_one, session_finish, get_transcripts, transcription_status, admin_profiles, media, upload_chunk
+from app.core import config
+from app.core.profiling import ProfilingMiddleware, install_executor
+from app.services.admission import UploadAdmissionMiddleware
+from app.services.session_transcription import idle_upgrade_loop, drain_sessions, resume_interrupted
+from app.services.worker_pool import shutdown_pool
+from app.services import live_transcription
 
-app = FastAPI(title="Video Interview API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # asyncio.to_thread work of profiled requests is attributed to them
+    install_executor(asyncio.get_running_loop())
+    inline = config.TRANSCRIPTION_MODE != "worker"
+    # Inline mode: sessions interrupted by the previous shutdown / deploy
+    if inline:
+        await resume_interrupted()
+    # Inline mode: upgrade fallback-model transcripts when idle (workers do it themselves)
+    upgrader = None
+    if config.MODEL_UPGRADE_IDLE and inline:
+        upgrader = asyncio.create_task(idle_upgrade_loop())
+    # Live answers abandoned mid-recording (tab closed) release their ffmpeg decoder
+    reaper = asyncio.create_task(live_transcription.reap_idle_loop()) if live_transcription.enabled() else None
+    yield
+    if upgrader:
+        # A cancelled upgrade hands its claim back to the job store
+        upgrader.cancel()
+        await asyncio.gather(upgrader, return_exceptions=True)
+    if reaper:
+        reaper.cancel()
+    live_transcription.discard_all()
+    # Shutdown / reload: finish or save running transcriptions instead of losing them
+    if inline:
+        await drain_sessions(config.SHUTDOWN_GRACE_SECONDS)
+    # Long-clip windows still queued on the pool belong to saved / aborted answers
+    shutdown_pool(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Video Interview API", lifespan=lifespan)
+
+# Inside CORS so browsers can read the early 413
+app.add_middleware(UploadAdmissionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,11 +57,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "Content-Range", "Accept-Ranges", "ETag"],
 )
+app.add_middleware(ProfilingMiddleware)
 
 app.include_router(verify_token.router, prefix="/api")
 app.include_router(session_start.router, prefix="/api")
 app.include_router(upload_one.router, prefix="/api")
+app.include_router(upload_chunk.router, prefix="/api")
 app.include_router(session_finish.router, prefix="/api")
 app.include_router(get_transcripts.router, prefix="/api")
-app.include_router(transcription_status.router, prefix="/api")
\ No newline at end of file
+app.include_router(transcription_status.router, prefix="/api")
+app.include_router(admin_profiles.router, prefix="/api")
+app.include_router(media.router, prefix="/api")
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+Admission control: refuse work the node cannot absorb, early and cheaply
+
+- New sessions: 429 + Retry-After while the estimated transcription backlog
+  (answers queued x seconds per answer / parallelism, see model_policy) exceeds
+  ADMISSION_MAX_BACKLOG_SECONDS.
+- Uploads (whole answers and live chunks): 413 when free disk on the uploads volume would drop below
+  UPLOAD_DISK_RESERVE_BYTES. UploadAdmissionMiddleware checks Content-Length
+  before the body is read; upload-one checks the actual size again (chunked
+  requests have no Content-Length).
+- Uploads per token: 429 above TOKEN_MAX_CONCURRENT_UPLOADS in flight.
+"""
+
+import math
+import shutil
+import asyncio
+from typing import Dict, Optional
+
+from starlette.responses import JSONResponse
+
+from app.core import config
+from app.storage import file_manager
+from app.services import job_store
+from app.services.task_queue import queue
+from app.services.model_policy import answer_seconds
+
+UPLOAD_PATHS = ('/api/upload-one', '/api/upload-chunk')
+# Retry-After of a rejected upload (slot or disk space may free up soon)
+UPLOAD_RETRY_AFTER_SECONDS = 5
+# Sessions are not told to come back later than this
+MAX_RETRY_AFTER_SECONDS = 3600
+
+_uploads_in_flight: Dict[str, int] = {}
+
+
+async def estimated_backlog_seconds() -> float:
+    """Seconds of transcription work queued ahead of a new session"""
+    if config.TRANSCRIPTION_MODE == "worker":
+        answers, workers = await asyncio.to_thread(job_store.backlog)
+    else:
+        answers, workers = await queue.backlog(), 1
+    per_answer = answer_seconds(config.WHISPER_MODEL) or config.ADMISSION_ANSWER_SECONDS
+    return answers * per_answer / max(1, workers)
+
+
+async def session_retry_after() -> Optional[int]:
+    """Seconds a new session should wait, or None if it is admitted"""
+    if config.ADMISSION_MAX_BACKLOG_SECONDS <= 0:
+        return None
+    backlog = await estimated_backlog_seconds()
+    if backlog <= config.ADMISSION_MAX_BACKLOG_SECONDS:
+        return None
+    print(f"🚦 Rejecting new session: ~{backlog:.0f}s of transcription queued "
+          f"(limit {config.ADMISSION_MAX_BACKLOG_SECONDS:.0f}s)")
+    return min(MAX_RETRY_AFTER_SECONDS, math.ceil(backlog - config.ADMISSION_MAX_BACKLOG_SECONDS))
+
+
+def disk_rejection(upload_bytes: int) -> Optional[str]:
+    """Why an upload of `upload_bytes` does not fit on the uploads volume (None if it does)"""
+    if config.UPLOAD_DISK_RESERVE_BYTES <= 0:
+        return None
+    try:
+        free = shutil.disk_usage(file_manager.BASE).free
+    except FileNotFoundError:
+        return None  # No uploads yet; the first session creates the folder
+    if free - upload_bytes >= config.UPLOAD_DISK_RESERVE_BYTES:
+        return None
+    print(f"🚦 Rejecting upload of {upload_bytes} bytes: {free} bytes free, "
+          f"reserve {config.UPLOAD_DISK_RESERVE_BYTES}")
+    return "Server storage is almost full; the upload was not accepted"
+
+
+def acquire_upload_slot(token: str) -> bool:
+    """Count an upload in flight for `token`; False if the token is at its limit"""
+    in_flight = _uploads_in_flight.get(token, 0)
+    if config.TOKEN_MAX_CONCURRENT_UPLOADS > 0 and in_flight >= config.TOKEN_MAX_CONCURRENT_UPLOADS:
+        return False
+    _uploads_in_flight[token] = in_flight + 1
+    return True
+
+
+def release_upload_slot(token: str):
+    in_flight = _uploads_in_flight.get(token, 0) - 1
+    if in_flight > 0:
+        _uploads_in_flight[token] = in_flight
+    else:
+        _uploads_in_flight.pop(token, None)
+
+
+class UploadAdmissionMiddleware:
+    """ASGI middleware that rejects oversized uploads from Content-Length, before the body is read"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope.get('method') != 'POST' or scope.get('path') not in UPLOAD_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope.get('headers') or []).get(b'content-length')
+        reason = None
+        if length and length.isdigit():
+            reason = await asyncio.to_thread(disk_rejection, int(length))
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            {"detail": reason},
+            status_code=413,
+            headers={"Retry-After": str(UPLOAD_RETRY_AFTER_SECONDS), "Connection": "close"}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,54 @@
+"""
+Audio decoding helpers (ffmpeg -> 16 kHz mono float32, the format Whisper expects)
+"""
+
+import subprocess
+from typing import Optional
+
+SAMPLE_RATE = 16000
+
+
+def decode_audio(path: str, sample_rate: int = SAMPLE_RATE):
+    """
+    Decode the audio track of a media file to a mono float32 numpy array in [-1, 1].
+
+    Raises RuntimeError if ffmpeg is missing or fails.
+    """
+    import numpy as np
+
+    cmd = [
+        'ffmpeg',
+        '-nostdin',
+        '-i', path,
+        '-vn',  # No video
+        '-f', 's16le',  # Raw 16-bit PCM on stdout
+        '-acodec', 'pcm_s16le',
+        '-ac', '1',  # Mono channel
+        '-ar', str(sample_rate),
+        '-loglevel', 'error',
+        '-'
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True)
+    except FileNotFoundError:
+        raise RuntimeError("FFmpeg not found. Please install FFmpeg and add it to PATH.")
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg error: {result.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """
+    Duration in seconds from the container metadata (ffprobe, nothing is decoded).
+
+    None when ffprobe is missing or the container does not record it (webm
+    written by MediaRecorder usually has no duration).
+    """
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+            capture_output=True, text=True
+        )
+        return float(result.stdout.strip())
+    except (FileNotFoundError, ValueError):
+        return None
@@ -0,0 +1,181 @@
+"""
+Decoded-audio artifacts for re-runs
+
+Every transcription of an answer (retries, model upgrades, engine comparisons,
+long-clip windows) needs the same 16 kHz mono float32 PCM. It is decoded with
+ffmpeg once and stored as `.npy` under AUDIO_CACHE_DIR, with a small `.json`
+(duration, speech-activity summary); later runs memory-map it instead of
+decoding again. Artifacts are keyed by the media file's path, size and mtime, so
+a retake gets a new one. Total size is bounded by AUDIO_CACHE_MAX_BYTES
+(least recently used artifacts are evicted; 0 disables the cache). Sizes and
+last use are tracked in an in-process index, so a miss never walks the cache;
+it is rebuilt every INDEX_RESCAN_SECONDS to see artifacts of other processes.
+
+Functions are synchronous (ffmpeg, file I/O); call them via asyncio.to_thread.
+"""
+
+import os
+import json
+import hashlib
+import threading
+import time
+from typing import Dict, Tuple
+
+from app.core import config
+from app.services.audio import SAMPLE_RATE, decode_audio
+
+# Energy-based speech activity: 30 ms frames above -40 dBFS count as speech
+_FRAME_SECONDS = 0.03
+_SPEECH_RMS = 0.01
+
+# Rebuild the index this often to pick up artifacts stored by other processes
+INDEX_RESCAN_SECONDS = 600.0
+
+# .npy path -> (last used, size), and the cache dir / total / time of the last scan
+_index: Dict[str, Tuple[float, int]] = {}
+_index_state = {'dir': None, 'total': 0, 'scanned': 0.0}
+_index_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return config.AUDIO_CACHE_MAX_BYTES > 0
+
+
+def cache_dir() -> str:
+    if config.AUDIO_CACHE_DIR:
+        return config.AUDIO_CACHE_DIR
+    from app.storage.file_manager import BASE
+    return os.path.join(BASE, '.audio_cache')
+
+
+def artifact_paths(media_path: str) -> Tuple[str, str]:
+    """(.npy, .json) paths of a media file's decoded audio"""
+    stat = os.stat(media_path)
+    key = hashlib.sha1(f"{os.path.abspath(media_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8')).hexdigest()
+    root = os.path.join(cache_dir(), key[:2], key)
+    return root + '.npy', root + '.json'
+
+
+def speech_summary(audio, sample_rate: int = SAMPLE_RATE) -> Dict:
+    """Seconds of speech-like energy, and where speech starts / ends"""
+    import numpy as np
+
+    frame = int(_FRAME_SECONDS * sample_rate)
+    n_frames = len(audio) // frame
+    if not n_frames:
+        return {'seconds': 0.0, 'ratio': 0.0, 'first': None, 'last': None}
+    rms = np.sqrt(np.mean(np.square(audio[:n_frames * frame].reshape(n_frames, frame)), axis=1))
+    active = np.flatnonzero(rms > _SPEECH_RMS)
+    return {
+        'seconds': round(len(active) * _FRAME_SECONDS, 2),
+        'ratio': round(len(active) / n_frames, 3),
+        'first': round(float(active[0]) * _FRAME_SECONDS, 2) if len(active) else None,
+        'last': round(float(active[-1] + 1) * _FRAME_SECONDS, 2) if len(active) else None,
+    }
+
+
+def load_audio(media_path: str):
+    """
+    Decoded audio of a media file, memory-mapped from the cache (decoded and
+    stored on a miss). Returns (float32 array, info); info is
+    {"duration": 93.4, "sampleRate": 16000, "speech": {"seconds", "ratio", "first", "last"}},
+    plus "path" of the .npy when the audio is memory-mapped from it.
+
+    Raises RuntimeError if ffmpeg cannot decode the file.
+    """
+    import numpy as np
+
+    npy_path, info_path = artifact_paths(media_path)
+    try:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        audio = np.load(npy_path, mmap_mode='r')
+        os.utime(info_path)  # Recently used: evicted last
+        _record(npy_path)
+        return audio, {**info, 'path': npy_path}
+    except (FileNotFoundError, ValueError, OSError):
+        pass
+
+    audio = decode_audio(media_path)
+    info = {
+        'duration': round(len(audio) / SAMPLE_RATE, 2),
+        'sampleRate': SAMPLE_RATE,
+        'speech': speech_summary(audio),
+    }
+    if len(audio) * audio.itemsize > config.AUDIO_CACHE_MAX_BYTES:
+        return audio, info
+
+    os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+    temp_path = f"{npy_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'wb') as f:
+        np.save(f, audio)
+    os.replace(temp_path, npy_path)
+    # The .json is written last: it marks the artifact as complete
+    with open(info_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+    os.replace(info_path + '.tmp', info_path)
+
+    _record(npy_path, os.path.getsize(npy_path))
+    evict()
+    return np.load(npy_path, mmap_mode='r'), {**info, 'path': npy_path}
+
+
+def _scan_index():
+    """Rebuild the index from the cache dir (the only full walk); call with _index_lock held"""
+    _index.clear()
+    total = 0
+    for root, _, files in os.walk(cache_dir()):
+        for name in files:
+            if not name.endswith('.npy'):
+                continue
+            npy_path = os.path.join(root, name)
+            info_path = npy_path[:-len('.npy')] + '.json'
+            try:
+                size = os.path.getsize(npy_path)
+                used = os.path.getmtime(info_path) if os.path.exists(info_path) else 0
+            except OSError:
+                continue
+            _index[npy_path] = (used, size)
+            total += size
+    _index_state.update(dir=cache_dir(), total=total, scanned=time.time())
+
+
+def _index_is_stale() -> bool:
+    return _index_state['dir'] != cache_dir() or time.time() - _index_state['scanned'] > INDEX_RESCAN_SECONDS
+
+
+def _record(npy_path: str, size: int = None):
+    """Mark an artifact as just used; `size` adds a newly stored one to the index"""
+    with _index_lock:
+        if _index_state['dir'] != cache_dir():
+            return  # Not indexed yet: the next eviction scans it
+        if npy_path in _index:
+            _, known_size = _index[npy_path]
+            _index[npy_path] = (time.time(), known_size)
+        elif size is not None:
+            _index[npy_path] = (time.time(), size)
+            _index_state['total'] += size
+
+
+def evict(max_bytes: int = None) -> int:
+    """Delete least recently used artifacts until the cache fits; returns bytes freed"""
+    max_bytes = config.AUDIO_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _index_lock:
+        if _index_is_stale():
+            _scan_index()
+        freed = 0
+        if _index_state['total'] <= max_bytes:
+            return freed
+        for npy_path, (_, size) in sorted(_index.items(), key=lambda item: item[1][0]):
+            if _index_state['total'] <= max_bytes:
+                break
+            info_path = npy_path[:-len('.npy')] + '.json'
+            for path in (info_path, npy_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # Evicted by another process
+            del _index[npy_path]
+            _index_state['total'] -= size
+            freed += size
+        return freed
@@ -0,0 +1,278 @@
+"""
+Post-transcription compaction and retention tiers
+
+Once an answer is transcribed, reviewers mostly need its audio. After a
+transcription job, and periodically via `scripts/compact_sessions.py`, each
+transcribed answer is reduced according to COMPACTION_MODE and the retention tiers:
+
+    full      Q{n}.webm kept (downscaled once if COMPACTION_MODE=downscale)
+    audio     after RETENTION_VIDEO_DAYS: only the Opus rendition Q{n}.opus is kept
+    transcript after RETENTION_AUDIO_DAYS: media deleted, transcript/segments kept
+
+Answers without a transcript are never touched. The state is recorded in
+meta.json under "storage", with the bytes reclaimed per run: bytes of deleted
+files and what downscaling saved (an Opus rendition written next to a kept
+video reclaims nothing). A downscaled video gets a new checksum in meta.json. Encodes are moved into place under the
+session lock (file_manager.answer_lock) only if the source answer is still the
+one that was encoded; a retake stored meanwhile wins and the encode is dropped.
+
+All functions are synchronous (they run ffmpeg); call them via asyncio.to_thread.
+"""
+
+import os
+import json
+import hashlib
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core import config
+from app.storage.file_manager import session_path, answer_lock, UPLOAD_CHUNK_SIZE
+from app.storage.metadata_manager import update_storage_metadata, update_answer_checksum
+from app.storage.blob_backend import get_backend, is_remote_backend
+from app.services import job_store
+
+
+def _run_ffmpeg(args: List[str], out_path: str) -> str:
+    """Run ffmpeg into a temp file next to `out_path`; returns the temp path"""
+    root, ext = os.path.splitext(out_path)
+    temp_path = f"{root}.tmp{ext}"  # Keep the extension so ffmpeg picks the container
+    cmd = ['ffmpeg', '-nostdin', '-y', '-loglevel', 'error'] + args + [temp_path]
+    try:
+        result = subprocess.run(cmd, capture_output=True)
+    except FileNotFoundError:
+        raise RuntimeError("FFmpeg not found. Please install FFmpeg and add it to PATH.")
+    if result.returncode != 0:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise RuntimeError(f"FFmpeg error: {result.stderr.decode(errors='replace').strip()}")
+    return temp_path
+
+
+def _replace_from(source_path: str, source_sha256: str, temp_path: str, out_path: str, on_replaced=None) -> bool:
+    """
+    Move an encode of `source_path` into place atomically, unless a retake
+    replaced the source while ffmpeg ran (the encode is then dropped).
+    `on_replaced()` runs under the same lock. Returns whether it was moved.
+    """
+    with answer_lock(source_path):
+        current = _file_checksum(source_path)['sha256'] if os.path.exists(source_path) else None
+        if current != source_sha256:
+            os.remove(temp_path)
+            return False
+        os.replace(temp_path, out_path)
+        if on_replaced:
+            on_replaced()
+    return True
+
+
+def extract_audio(video_path: str, audio_path: str, bitrate: Optional[str] = None) -> bool:
+    """Low-bitrate mono Opus rendition of an answer (speech-tuned); False if the answer was retaken meanwhile"""
+    source_sha256 = _file_checksum(video_path)['sha256']
+    temp_path = _run_ffmpeg([
+        '-i', video_path, '-vn',
+        '-c:a', 'libopus', '-b:a', bitrate or config.COMPACT_AUDIO_BITRATE,
+        '-ac', '1', '-application', 'voip'
+    ], audio_path)
+    return _replace_from(video_path, source_sha256, temp_path, audio_path)
+
+
+def downscale_video(video_path: str, height: Optional[int] = None, on_replaced=None) -> bool:
+    """
+    Re-encode an answer video in place at a lower resolution; False if the
+    answer was retaken meanwhile. `on_replaced(old_sha256, new_checksum)` runs
+    under the session lock right after the replace.
+    """
+    source_sha256 = _file_checksum(video_path)['sha256']
+    temp_path = _run_ffmpeg([
+        '-i', video_path,
+        '-vf', f"scale=-2:'min({height or config.COMPACT_VIDEO_HEIGHT},ih)'",
+        '-c:v', 'libvpx-vp9', '-b:v', '0', '-crf', '40', '-deadline', 'realtime', '-cpu-used', '8',
+        '-c:a', 'libopus', '-b:a', '32k'
+    ], video_path)
+    return _replace_from(
+        video_path, source_sha256, temp_path, video_path,
+        on_replaced and (lambda: on_replaced(source_sha256, _file_checksum(video_path)))
+    )
+
+
+def session_age_days(meta: Dict, meta_path: str, now: Optional[datetime] = None) -> float:
+    """Age of a session from finishedAt (else uploadedAt, else meta.json mtime)"""
+    now = now or datetime.now()
+    for key in ('finishedAt', 'uploadedAt'):
+        try:
+            return (now - datetime.fromisoformat(meta[key])).total_seconds() / 86400
+        except (KeyError, TypeError, ValueError):
+            continue
+    return (now.timestamp() - os.path.getmtime(meta_path)) / 86400
+
+
+def target_tier(age_days: float) -> str:
+    if config.RETENTION_AUDIO_DAYS > 0 and age_days >= config.RETENTION_AUDIO_DAYS:
+        return 'transcript'
+    if config.RETENTION_VIDEO_DAYS > 0 and age_days >= config.RETENTION_VIDEO_DAYS:
+        return 'audio'
+    return 'full'
+
+
+def _size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _file_checksum(path: str) -> Dict:
+    """{sha256, size} of a file, as stored in meta.json checksums"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return {"sha256": digest.hexdigest(), "size": os.path.getsize(path)}
+
+
+def compact_session(folder: str, dry_run: bool = False, now: Optional[datetime] = None) -> Optional[Dict]:
+    """
+    Apply compaction and the retention tier to one session.
+
+    Returns:
+        {
+            "folder": "...",
+            "tier": "audio",
+            "bytesBefore": 123456,
+            "bytesAfter": 2345,
+            "bytesReclaimed": 121111,      # freed: deleted files + downscaling
+            "actions": ["Q1.opus created", "Q1.webm deleted", ...],
+            "errors": []
+        }
+        or None if the session has no meta.json
+    """
+    path = session_path(folder)
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r') as f:
+        meta = json.load(f)
+
+    storage = meta.get('storage', {})
+    downscaled = set(storage.get('downscaled', []))
+    tier = target_tier(session_age_days(meta, meta_path, now))
+    transcribed = sorted(int(q) for q in meta.get('transcripts', {}))
+
+    report = {'folder': folder, 'tier': tier, 'bytesBefore': 0, 'bytesAfter': 0,
+              'bytesReclaimed': 0, 'actions': [], 'errors': []}
+    removed = []
+    rewritten = {}
+
+    def record_rewrite(q, old_sha256, checksum):
+        # The stored answer changed: keep its checksum (and transcript link) current
+        if update_answer_checksum(folder, q, old_sha256, checksum):
+            rewritten[q] = (old_sha256, checksum)
+
+    for q in transcribed:
+        video = os.path.join(path, f"Q{q}.webm")
+        audio = os.path.join(path, f"Q{q}.opus")
+        before = _size(video) + _size(audio)
+        report['bytesBefore'] += before
+        projected = before  # Dry runs only count deleted files
+        reclaimed = 0
+        try:
+            wants_audio = tier == 'audio' or (tier == 'full' and config.COMPACTION_MODE == 'audio')
+            if wants_audio and os.path.exists(video) and not os.path.exists(audio):
+                report['actions'].append(f"Q{q}.opus created")
+                if not dry_run and not extract_audio(video, audio):
+                    report['errors'].append(f"Q{q}: retaken during compaction, audio rendition dropped")
+
+            if tier == 'full' and config.COMPACTION_MODE == 'downscale' and q not in downscaled and os.path.exists(video):
+                report['actions'].append(f"Q{q}.webm downscaled")
+                if not dry_run:
+                    original = _size(video)
+                    if downscale_video(video, on_replaced=lambda old, new, q=q: record_rewrite(q, old, new)):
+                        downscaled.add(q)
+                        reclaimed += max(0, original - _size(video))
+                    else:
+                        report['errors'].append(f"Q{q}: retaken during compaction, downscaled copy dropped")
+
+            # Never drop the video before its audio rendition exists
+            if tier in ('audio', 'transcript') and os.path.exists(video) and (tier == 'transcript' or dry_run or os.path.exists(audio)):
+                size = _size(video)
+                if dry_run:
+                    deleted = True
+                else:
+                    # A retake drops the rendition under this lock: only delete a video whose audio is current
+                    with answer_lock(video):
+                        deleted = tier == 'transcript' or os.path.exists(audio)
+                        if deleted:
+                            os.remove(video)
+                if deleted:
+                    report['actions'].append(f"Q{q}.webm deleted")
+                    removed.append(f"Q{q}.webm")
+                    projected -= size
+                    reclaimed += size
+
+            if tier == 'transcript' and os.path.exists(audio):
+                report['actions'].append(f"Q{q}.opus deleted")
+                removed.append(f"Q{q}.opus")
+                projected -= _size(audio)
+                reclaimed += _size(audio)
+                if not dry_run:
+                    os.remove(audio)
+        except (RuntimeError, OSError) as e:
+            report['errors'].append(f"Q{q}: {e}")
+        report['bytesAfter'] += projected if dry_run else _size(video) + _size(audio)
+        report['bytesReclaimed'] += reclaimed
+
+    if dry_run:
+        return report
+
+    # Deleted media must not come back from the blob backend
+    if is_remote_backend():
+        backend = get_backend()
+        for name in removed:
+            try:
+                backend.delete(f"{folder}/{name}")
+            except Exception as e:
+                report['errors'].append(f"{name}: blob delete failed: {e}")
+
+    if report['actions'] or 'tier' not in storage:
+        update_storage_metadata(folder, {
+            'tier': tier,
+            'downscaled': sorted(downscaled),
+            'compactedAt': datetime.now().isoformat(),
+            'bytesReclaimed': storage.get('bytesReclaimed', 0) + report['bytesReclaimed'],
+        })
+        # A queued model upgrade checks the answer's checksum before running
+        for q, (old_sha256, checksum) in rewritten.items():
+            job_store.rekey_upgrade(folder, q, old_sha256, checksum['sha256'])
+    return report
+
+
+def format_report(reports: List[Dict]) -> str:
+    """One line per session plus the total reclaimed"""
+    lines = []
+    total = 0
+    for report in reports:
+        total += report['bytesReclaimed']
+        status = f" ⚠️  {'; '.join(report['errors'])}" if report['errors'] else ""
+        lines.append(
+            f"{report['folder']}: tier={report['tier']} "
+            f"{report['bytesBefore'] / 1e6:.1f} MB -> {report['bytesAfter'] / 1e6:.1f} MB "
+            f"(reclaimed {report['bytesReclaimed'] / 1e6:.1f} MB){status}"
+        )
+    lines.append(f"Total reclaimed: {total / 1e6:.1f} MB across {len(reports)} session(s)")
+    return "\n".join(lines)
+
+
+def compact_after_job(folder: str) -> Optional[Dict]:
+    """Compaction stage run after a transcription job (no-op unless COMPACTION_MODE is set)"""
+    if config.COMPACTION_MODE == 'off':
+        return None
+    if config.COMPACTION_MODE not in ('audio', 'downscale'):
+        print(f"⚠️  Unknown COMPACTION_MODE '{config.COMPACTION_MODE}', expected off, audio or downscale")
+        return None
+    report = compact_session(folder)
+    if report:
+        print(f"🗜️  Compacted {folder}: reclaimed {report['bytesReclaimed'] / 1e6:.1f} MB ({', '.join(report['actions']) or 'nothing to do'})")
+        for error in report['errors']:
+            print(f"⚠️  Compaction {folder}: {error}")
+    return report
@@ -0,0 +1,178 @@
+import os
+import tempfile
+
+from app.core import config
+from app.services.transcription_utils import confidence_from_logprobs, compact_segment
+
+# Lazy import to avoid crash if module is not installed
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+    print("⚠️  faster-whisper package not installed. Faster-Whisper transcription will be disabled.")
+    print("   Install with: pip install faster-whisper")
+
+
+def get_faster_whisper_model(model_size: str = "medium"):
+    """
+    Load a CTranslate2 Whisper model (loads once and caches for subsequent calls).
+
+    Weights are quantized to FASTER_WHISPER_COMPUTE_TYPE (default "int8") at load
+    time, which is much faster than fp32 openai-whisper on CPU-only hosts.
+    model_size: "tiny", "base", "small", "medium", "large-v3", ...
+    """
+    if not FASTER_WHISPER_AVAILABLE:
+        return None
+
+    # "<size>-int8" variants map to the plain model here: weights are already quantized
+    if model_size.endswith("-int8"):
+        model_size = model_size[:-len("-int8")]
+
+    # Cache model to avoid reloading on every call
+    if not hasattr(get_faster_whisper_model, '_model_cache'):
+        get_faster_whisper_model._model_cache = {}
+
+    if model_size not in get_faster_whisper_model._model_cache:
+        try:
+            print(f"📥 Loading Faster-Whisper model: {model_size} "
+                  f"({config.FASTER_WHISPER_COMPUTE_TYPE}, first time only, may take a moment)...")
+            model = WhisperModel(
+                model_size,
+                device="cpu",
+                compute_type=config.FASTER_WHISPER_COMPUTE_TYPE,
+                cpu_threads=config.FASTER_WHISPER_CPU_THREADS,
+            )
+            get_faster_whisper_model._model_cache[model_size] = model
+            print(f"✅ Faster-Whisper model {model_size} loaded successfully!")
+        except Exception as e:
+            print(f"⚠️  Error loading Faster-Whisper model: {e}")
+            return None
+
+    return get_faster_whisper_model._model_cache[model_size]
+
+
+def _run_faster_whisper(model, audio, language, model_size, translate_to_english, on_segment) -> dict:
+    """Run Faster-Whisper on a media file path or a 16 kHz mono float32 array"""
+    task = "translate" if translate_to_english else "transcribe"
+    task_text = "Translating to English" if translate_to_english else "Transcribing"
+    print(f"🔄 {task_text} with Faster-Whisper {model_size} ({config.FASTER_WHISPER_COMPUTE_TYPE})...")
+
+    segments_iter, info = model.transcribe(
+        audio,
+        language=language or None,  # None = auto-detect; source language when translating
+        task=task,
+        beam_size=1,  # Greedy decoding, same as openai-whisper with temperature=0.0
+        temperature=0.0,
+        condition_on_previous_text=True,
+        word_timestamps=False,
+    )
+    # Segments are generated lazily; decoding happens while iterating
+    segments = []
+    texts = []
+    for seg in segments_iter:
+        segment = compact_segment(seg.start, seg.end, seg.text, seg.avg_logprob, seg.no_speech_prob)
+        segments.append(segment)
+        texts.append(seg.text)
+        if on_segment:
+            on_segment(segment)
+
+    transcript_text = "".join(texts).strip()
+    confidence = confidence_from_logprobs([seg['avg_logprob'] for seg in segments])
+
+    return {
+        'success': True,
+        'transcript': transcript_text,
+        'confidence': confidence,
+        'error': None,
+        'language': info.language or language,
+        'language_probability': round(float(info.language_probability or 0.0), 3),
+        'model': model_size,
+        'segments': segments
+    }
+
+
+def transcribe_video(video_bytes: bytes, language: str = "en", model_size: str = "medium", translate_to_english: bool = False, on_segment=None) -> dict:
+    """
+    Transcribe video using Faster-Whisper (CTranslate2, int8 on CPU).
+
+    Same contract as whisper_local_transcription.transcribe_video.
+    on_segment(segment) is called as each segment is decoded.
+
+    Returns:
+        dict with keys: 'success', 'transcript', 'confidence', 'error', 'language',
+        'language_probability', 'model', 'segments'
+    """
+    if not FASTER_WHISPER_AVAILABLE:
+        return {
+            'success': False,
+            'transcript': '',
+            'confidence': 0.0,
+            'error': 'faster-whisper package not installed. Install with: pip install faster-whisper'
+        }
+
+    temp_video = None
+
+    try:
+        model = get_faster_whisper_model(model_size)
+        if not model:
+            return {
+                'success': False,
+                'transcript': '',
+                'confidence': 0.0,
+                'error': 'Failed to load Faster-Whisper model'
+            }
+
+        # faster-whisper decodes the WebM container itself (PyAV), no ffmpeg step needed
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as f:
+            f.write(video_bytes)
+            temp_video = f.name
+
+        return _run_faster_whisper(model, temp_video, language, model_size, translate_to_english, on_segment)
+
+    except Exception as e:
+        return {
+            'success': False,
+            'transcript': '',
+            'confidence': 0.0,
+            'error': f'Transcription error: {str(e)}'
+        }
+    finally:
+        if temp_video and os.path.exists(temp_video):
+            try:
+                os.unlink(temp_video)
+            except OSError:
+                pass
+
+
+def transcribe_audio(audio, language: str = "en", model_size: str = "medium", translate_to_english: bool = False, on_segment=None) -> dict:
+    """
+    Transcribe already-decoded audio (16 kHz mono float32 numpy array).
+
+    Used for windows of long answers (see long_clip); same result contract as transcribe_video.
+    """
+    if not FASTER_WHISPER_AVAILABLE:
+        return {
+            'success': False,
+            'transcript': '',
+            'confidence': 0.0,
+            'error': 'faster-whisper package not installed. Install with: pip install faster-whisper'
+        }
+
+    try:
+        model = get_faster_whisper_model(model_size)
+        if not model:
+            return {
+                'success': False,
+                'transcript': '',
+                'confidence': 0.0,
+                'error': 'Failed to load Faster-Whisper model'
+            }
+        return _run_faster_whisper(model, audio, language, model_size, translate_to_english, on_segment)
+    except Exception as e:
+        return {
+            'success': False,
+            'transcript': '',
+            'confidence': 0.0,
+            'error': f'Transcription error: {str(e)}'
+        }
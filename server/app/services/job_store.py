@@ -0,0 +1,634 @@
+"""
+Durable transcription job spool (SQLite under uploads/)
+
+Used when TRANSCRIPTION_MODE=worker: the API only enqueues jobs, and one or more
+`python -m app.worker` processes (on this node or on others sharing the volume)
+claim them with a lease, renew the lease with heartbeats, and write results back
+through the metadata layer. A job whose lease expires (worker crashed) is claimed
+again by the next worker, up to RETRY_MAX_ATTEMPTS claims; after that it is
+marked failed instead of taking down worker after worker.
+
+The database uses SQLite's rollback journal (JOB_DB_JOURNAL_MODE=DELETE) by
+default, which works on a volume shared by several nodes. WAL is faster but
+needs shared memory, so only enable it when JOB_DB_PATH is on local disk.
+
+Both modes also keep here the answers waiting for a model upgrade (see
+model_policy) and, in inline mode, the sessions a shutdown interrupted, which
+the next API process resumes (see session_transcription.drain_sessions).
+
+All functions are synchronous; call them via asyncio.to_thread from async code.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.core import config
+from app.storage.file_manager import BASE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    folder TEXT PRIMARY KEY,
+    questions_count INTEGER NOT NULL,
+    language TEXT,
+    model TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    heartbeat_at TEXT,
+    retry_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS tasks (
+    folder TEXT NOT NULL,
+    question_index INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    partial_text TEXT NOT NULL DEFAULT '',
+    confidence REAL NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT '',
+    started_at TEXT,
+    completed_at TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT NOT NULL DEFAULT '',
+    generation INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (folder, question_index)
+);
+CREATE TABLE IF NOT EXISTS upgrades (
+    folder TEXT NOT NULL,
+    question_index INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    sha256 TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    claimed_at REAL,
+    PRIMARY KEY (folder, question_index)
+);
+
+CREATE TABLE IF NOT EXISTS interrupted (
+    folder TEXT PRIMARY KEY,
+    questions_count INTEGER NOT NULL,
+    model TEXT,
+    indices TEXT NOT NULL,
+    interrupted_at TEXT
+);
+"""
+
+# Columns added after the first release: (table, column, declaration)
+_ADDED_COLUMNS = [
+    ('jobs', 'retry_at', 'REAL'),
+    ('tasks', 'attempts', 'INTEGER NOT NULL DEFAULT 0'),
+    ('tasks', 'last_error', "TEXT NOT NULL DEFAULT ''"),
+    ('tasks', 'generation', 'INTEGER NOT NULL DEFAULT 0'),
+    ('upgrades', 'claimed_at', 'REAL'),
+]
+
+# A claimed upgrade whose process died (or was stopped mid-claim) is offered again after this
+UPGRADE_CLAIM_SECONDS = 3600.0
+
+
+# Accepted JOB_DB_JOURNAL_MODE values (anything else keeps the database's current mode)
+_JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'WAL')
+
+# Database paths this process has already set up (_connect then only opens a connection)
+_prepared = set()
+_prepare_lock = threading.Lock()
+
+
+def db_path() -> str:
+    return config.JOB_DB_PATH or os.path.join(BASE, '.transcription_jobs.sqlite3')
+
+
+def _prepare(conn: sqlite3.Connection):
+    """Journal mode, schema and column migrations (once per process and database)"""
+    if config.JOB_DB_JOURNAL_MODE in _JOURNAL_MODES:
+        conn.execute(f"PRAGMA journal_mode={config.JOB_DB_JOURNAL_MODE}")
+    conn.executescript(_SCHEMA)
+    for table, column, declaration in _ADDED_COLUMNS:
+        columns = [row['name'] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if column not in columns:
+            try:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+            except sqlite3.OperationalError:
+                pass  # Added concurrently by another process
+
+
+def _connect() -> sqlite3.Connection:
+    path = db_path()
+    ready = path in _prepared and os.path.exists(path)
+    if not ready:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if not ready:
+        with _prepare_lock:
+            if path not in _prepared or not os.path.getsize(path):
+                _prepare(conn)
+                _prepared.add(path)
+    return conn
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _fail_unfinished_tasks(conn: sqlite3.Connection, folder: str, error: str):
+    """Mark the pending / processing tasks of a job failed, counting the attempt"""
+    conn.execute(
+        "UPDATE tasks SET status = 'failed', error = ?, last_error = ?, partial_text = '', "
+        "attempts = attempts + 1, completed_at = ? "
+        "WHERE folder = ? AND status IN ('pending', 'processing')",
+        (error, error, _now(), folder)
+    )
+
+
+def enqueue_job(folder: str, questions_count: int, language: Optional[str] = "en", model: Optional[str] = None) -> Dict:
+    """Add a job (no-op if the folder already has one, like TaskQueue.create_job)"""
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        existing = conn.execute("SELECT * FROM jobs WHERE folder = ?", (folder,)).fetchone()
+        if existing is None:
+            conn.execute(
+                "INSERT INTO jobs (folder, questions_count, language, model, created_at) VALUES (?, ?, ?, ?, ?)",
+                (folder, questions_count, language, model, _now())
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO tasks (folder, question_index) VALUES (?, ?)",
+                [(folder, i) for i in range(1, questions_count + 1)]
+            )
+            print(f"📋 Queued transcription job for {folder}")
+        conn.execute("COMMIT")
+        return dict(conn.execute("SELECT * FROM jobs WHERE folder = ?", (folder,)).fetchone())
+    finally:
+        conn.close()
+
+
+def claim_job(worker_id: str, lease_seconds: float, max_attempts: Optional[int] = None) -> Optional[Dict]:
+    """
+    Claim the oldest pending job that is due (or one whose lease expired); None if
+    there is nothing to do. A job whose lease expired after `max_attempts` claims
+    (default RETRY_MAX_ATTEMPTS) keeps killing its workers: it is marked failed,
+    with its unfinished tasks, instead of being claimed again.
+    """
+    if max_attempts is None:
+        max_attempts = config.RETRY_MAX_ATTEMPTS
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        abandoned = conn.execute(
+            "SELECT folder, attempts FROM jobs WHERE status = 'processing' AND lease_expires < ? AND attempts >= ?",
+            (now, max_attempts)
+        ).fetchall()
+        for job in abandoned:
+            error = f"Worker lease expired {job['attempts']} time(s); not claimed again"
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, completed_at = ?, lease_owner = NULL, "
+                "lease_expires = NULL WHERE folder = ?",
+                (error, _now(), job['folder'])
+            )
+            _fail_unfinished_tasks(conn, job['folder'], error)
+            print(f"⚠️  {job['folder']}: {error}")
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE (status = 'pending' AND (retry_at IS NULL OR retry_at <= ?)) "
+            "OR (status = 'processing' AND lease_expires < ?) "
+            "ORDER BY created_at LIMIT 1",
+            (now, now)
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'processing', lease_owner = ?, lease_expires = ?, retry_at = NULL, "
+            "attempts = attempts + 1, started_at = COALESCE(started_at, ?), heartbeat_at = ? WHERE folder = ?",
+            (worker_id, now + lease_seconds, _now(), _now(), row['folder'])
+        )
+        conn.execute("COMMIT")
+        job = dict(row)
+        job['attempts'] += 1
+        return job
+    finally:
+        conn.close()
+
+
+def heartbeat(folder: str, worker_id: str, lease_seconds: float) -> bool:
+    """Extend the lease; False if this worker no longer holds the job"""
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "UPDATE jobs SET lease_expires = ?, heartbeat_at = ? "
+            "WHERE folder = ? AND lease_owner = ? AND status = 'processing'",
+            (time.time() + lease_seconds, _now(), folder, worker_id)
+        )
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def update_task(folder: str, question_index: int, status: str, confidence: float = 0.0, error: str = "",
+                generation: Optional[int] = None) -> bool:
+    """
+    Set a task's status. With `generation`, only if no retake has bumped it since
+    (the supersession check and the update are one round trip); returns False if
+    the task was superseded.
+    """
+    conn = _connect()
+    try:
+        finished = status in ('success', 'failed')
+        cursor = conn.execute(
+            "UPDATE tasks SET status = ?, confidence = ?, error = ?, "
+            "partial_text = CASE WHEN ? THEN '' ELSE partial_text END, "
+            "attempts = attempts + CASE WHEN ? THEN 1 ELSE 0 END, "
+            "last_error = CASE WHEN ? = 'failed' THEN ? ELSE last_error END, "
+            "started_at = COALESCE(started_at, ?), completed_at = CASE WHEN ? THEN ? ELSE completed_at END "
+            "WHERE folder = ? AND question_index = ? AND (? IS NULL OR generation = ?)",
+            (status, confidence, error, finished, finished, status, error, _now(), finished, _now(),
+             folder, question_index, generation, generation)
+        )
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def append_task_text(folder: str, question_index: int, text: str):
+    """Publish partially decoded text of a task that is still processing"""
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE tasks SET status = 'processing', started_at = COALESCE(started_at, ?), "
+            "partial_text = TRIM(partial_text || ' ' || ?) "
+            "WHERE folder = ? AND question_index = ? AND status IN ('pending', 'processing')",
+            (_now(), text, folder, question_index)
+        )
+    finally:
+        conn.close()
+
+
+def complete_job(folder: str, worker_id: str, error: Optional[str] = None):
+    """Mark the job done (success if no task failed); re-queue it if a retake is still pending"""
+    conn = _connect()
+    try:
+        failed = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE folder = ? AND status != 'success'", (folder,)
+        ).fetchone()[0]
+        pending = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE folder = ? AND status = 'pending'", (folder,)
+        ).fetchone()[0]
+        status = 'success' if failed == 0 and not error else 'failed'
+        if pending and not error:
+            status = 'pending'
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, completed_at = CASE WHEN ? = 'pending' THEN NULL ELSE ? END, "
+            "lease_owner = NULL, lease_expires = NULL WHERE folder = ? AND lease_owner = ?",
+            (status, error, status, _now(), folder, worker_id)
+        )
+    finally:
+        conn.close()
+
+
+def fail_job(folder: str, worker_id: str, error: str) -> bool:
+    """
+    Job-level failure (pull, crash, push, ...): mark the unfinished tasks failed,
+    counting the attempt, and the job failed, so retry_failed can pick them up.
+    False if this worker no longer holds the job.
+    """
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, completed_at = ?, lease_owner = NULL, lease_expires = NULL "
+            "WHERE folder = ? AND lease_owner = ?",
+            (error, _now(), folder, worker_id)
+        )
+        held = cursor.rowcount == 1
+        if held:
+            _fail_unfinished_tasks(conn, folder, error)
+        conn.execute("COMMIT")
+        return held
+    finally:
+        conn.close()
+
+
+def pending_indices(folder: str, include_failed: bool = True) -> List[int]:
+    """Questions of a job that still need transcribing (successful ones are never redone)"""
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT question_index FROM tasks WHERE folder = ? AND status != 'success' "
+            "AND (? OR status != 'failed') ORDER BY question_index",
+            (folder, include_failed)
+        ).fetchall()
+        return [row['question_index'] for row in rows]
+    finally:
+        conn.close()
+
+
+def start_task(folder: str, question_index: int) -> int:
+    """Mark a task as processing right before its video is read; returns its generation"""
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE tasks SET status = 'processing', partial_text = '', started_at = ? "
+            "WHERE folder = ? AND question_index = ?",
+            (_now(), folder, question_index)
+        )
+        row = conn.execute(
+            "SELECT generation FROM tasks WHERE folder = ? AND question_index = ?", (folder, question_index)
+        ).fetchone()
+        return row['generation'] if row else 0
+    finally:
+        conn.close()
+
+
+def task_generation(folder: str, question_index: int) -> int:
+    """Upload generation of a task (bumped by supersede_task)"""
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT generation FROM tasks WHERE folder = ? AND question_index = ?", (folder, question_index)
+        ).fetchone()
+        return row['generation'] if row else 0
+    finally:
+        conn.close()
+
+
+def supersede_task(folder: str, question_index: int) -> Optional[str]:
+    """
+    A new take of a question was uploaded: bump its generation so a worker
+    transcribing the old take drops it, and re-queue the question if it was done.
+
+    Returns None (no job for it), "pending", "cancelling" or "queued"
+    (same meaning as TaskQueue.supersede).
+    """
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        task = conn.execute(
+            "SELECT status FROM tasks WHERE folder = ? AND question_index = ?", (folder, question_index)
+        ).fetchone()
+        if task is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE tasks SET generation = generation + 1 WHERE folder = ? AND question_index = ?",
+            (folder, question_index)
+        )
+        action = {'pending': 'pending', 'processing': 'cancelling'}.get(task['status'], 'queued')
+        if action == 'queued':
+            conn.execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0, error = '', partial_text = '', "
+                "started_at = NULL, completed_at = NULL WHERE folder = ? AND question_index = ?",
+                (folder, question_index)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'pending', error = NULL, completed_at = NULL, retry_at = NULL "
+                "WHERE folder = ? AND status IN ('success', 'failed')",
+                (folder,)
+            )
+        conn.execute("COMMIT")
+        return action
+    finally:
+        conn.close()
+
+
+def requeue_task(folder: str, question_index: int):
+    """Put a superseded task back to pending (the attempt is not counted)"""
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE tasks SET status = 'pending', partial_text = '', error = '', started_at = NULL "
+            "WHERE folder = ? AND question_index = ?",
+            (folder, question_index)
+        )
+    finally:
+        conn.close()
+
+
+def retry_failed(folder: str, indices: Optional[List[int]] = None, max_attempts: Optional[int] = None,
+                 delay_seconds: float = 0.0) -> Optional[List[int]]:
+    """
+    Reset failed tasks to pending and re-queue the job (after `delay_seconds`).
+
+    Returns the reset indices ([] if nothing to retry), or None if the job does not
+    exist or is not finished yet.
+    """
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        job = conn.execute("SELECT status FROM jobs WHERE folder = ?", (folder,)).fetchone()
+        if job is None or job['status'] not in ('success', 'failed'):
+            conn.execute("COMMIT")
+            return None
+        rows = conn.execute(
+            "SELECT question_index, attempts FROM tasks WHERE folder = ? AND status = 'failed' ORDER BY question_index",
+            (folder,)
+        ).fetchall()
+        retry = [
+            row['question_index'] for row in rows
+            if (indices is None or row['question_index'] in indices)
+            and (max_attempts is None or row['attempts'] < max_attempts)
+        ]
+        if retry:
+            conn.executemany(
+                "UPDATE tasks SET status = 'pending', error = '', partial_text = '', started_at = NULL, "
+                "completed_at = NULL WHERE folder = ? AND question_index = ?",
+                [(folder, idx) for idx in retry]
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'pending', error = NULL, completed_at = NULL, retry_at = ? WHERE folder = ?",
+                (time.time() + delay_seconds, folder)
+            )
+        conn.execute("COMMIT")
+        return retry
+    finally:
+        conn.close()
+
+
+def backlog() -> Tuple[int, int]:
+    """(answers queued or in progress across all jobs, workers holding a live lease)"""
+    if not os.path.exists(db_path()):
+        return 0, 0
+    conn = _connect()
+    try:
+        answers = conn.execute(
+            "SELECT COUNT(*) FROM tasks t JOIN jobs j ON j.folder = t.folder "
+            "WHERE j.status IN ('pending', 'processing') AND t.status IN ('pending', 'processing')"
+        ).fetchone()[0]
+        workers = conn.execute(
+            "SELECT COUNT(DISTINCT lease_owner) FROM jobs WHERE status = 'processing' AND lease_expires >= ?",
+            (time.time(),)
+        ).fetchone()[0]
+        return answers, workers
+    finally:
+        conn.close()
+
+
+def add_upgrade(folder: str, question_index: int, model: str, sha256: Optional[str], attempts: int = 0):
+    """Queue an answer transcribed with a fallback model for re-transcription with `model`"""
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO upgrades (folder, question_index, model, sha256, attempts, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (folder, question_index, model, sha256, attempts, _now())
+        )
+    finally:
+        conn.close()
+
+
+def remove_upgrade(folder: str, question_index: int, sha256: Optional[str] = None):
+    """
+    Drop a queued upgrade (the answer got a transcript from the requested model).
+    With `sha256`, only the upgrade of that take (not one queued for a retake since).
+    """
+    if not os.path.exists(db_path()):
+        return
+    conn = _connect()
+    try:
+        if sha256 is None:
+            conn.execute("DELETE FROM upgrades WHERE folder = ? AND question_index = ?", (folder, question_index))
+        else:
+            conn.execute(
+                "DELETE FROM upgrades WHERE folder = ? AND question_index = ? AND sha256 = ?",
+                (folder, question_index, sha256)
+            )
+    finally:
+        conn.close()
+
+
+def rekey_upgrade(folder: str, question_index: int, old_sha256: str, sha256: str):
+    """Point the upgrade of an answer re-encoded in place (compaction) at its new checksum"""
+    if not os.path.exists(db_path()):
+        return
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE upgrades SET sha256 = ? WHERE folder = ? AND question_index = ? AND sha256 = ?",
+            (sha256, folder, question_index, old_sha256)
+        )
+    finally:
+        conn.close()
+
+
+def claim_upgrade(claim_seconds: float = UPGRADE_CLAIM_SECONDS) -> Optional[Dict]:
+    """
+    Claim the oldest queued upgrade that nobody is working on. The row stays until
+    the upgrade is done (remove_upgrade / add_upgrade), so a process stopped
+    mid-upgrade loses nothing: release_upgrade hands it back, and a claim that
+    was never released expires after `claim_seconds`.
+    """
+    if not os.path.exists(db_path()):
+        return None
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        row = conn.execute(
+            "SELECT * FROM upgrades WHERE claimed_at IS NULL OR claimed_at < ? ORDER BY created_at LIMIT 1",
+            (now - claim_seconds,)
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE upgrades SET claimed_at = ? WHERE folder = ? AND question_index = ?",
+                (now, row['folder'], row['question_index'])
+            )
+        conn.execute("COMMIT")
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def release_upgrade(folder: str, question_index: int):
+    """Give a claimed upgrade back to the queue (interrupted before it finished)"""
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE upgrades SET claimed_at = NULL WHERE folder = ? AND question_index = ?", (folder, question_index)
+        )
+    finally:
+        conn.close()
+
+
+def save_interrupted(folder: str, questions_count: int, model: Optional[str], indices: List[int]):
+    """Record an inline session whose transcription was stopped by a shutdown"""
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO interrupted (folder, questions_count, model, indices, interrupted_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (folder, questions_count, model, json.dumps(sorted(indices)), _now())
+        )
+    finally:
+        conn.close()
+
+
+def pop_interrupted() -> List[Dict]:
+    """Take every interrupted session (removed), oldest first"""
+    if not os.path.exists(db_path()):
+        return []
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute("SELECT * FROM interrupted ORDER BY interrupted_at").fetchall()
+        conn.execute("DELETE FROM interrupted")
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return [{**dict(row), 'indices': json.loads(row['indices'])} for row in rows]
+
+
+def get_progress(folder: str) -> Optional[Dict]:
+    """Job progress in the same shape as TaskQueue.get_progress"""
+    if not os.path.exists(db_path()):
+        return None
+    conn = _connect()
+    try:
+        job = conn.execute("SELECT * FROM jobs WHERE folder = ?", (folder,)).fetchone()
+        if job is None:
+            return None
+        tasks: List[sqlite3.Row] = conn.execute(
+            "SELECT * FROM tasks WHERE folder = ? ORDER BY question_index", (folder,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    failed = [t['question_index'] for t in tasks if t['status'] == 'failed']
+    return {
+        'folder': folder,
+        'questions_count': job['questions_count'],
+        'status': job['status'],
+        'progress': (sum(1 for t in tasks if t['status'] in ('success', 'failed')), job['questions_count']),
+        'success_count': sum(1 for t in tasks if t['status'] == 'success'),
+        'failed_count': len(failed),
+        'failed_indices': failed,
+        'tasks': {
+            str(t['question_index']): {
+                'question_index': t['question_index'],
+                'status': t['status'],
+                'transcript': "",  # Final text lives in meta.json / the transcript endpoints
+                'partial_transcript': t['partial_text'] if t['status'] == 'processing' else "",
+                'segments_count': 0,
+                'confidence': t['confidence'],
+                'error': t['error'],
+                'attempts': t['attempts'],
+                'last_error': t['last_error'],
+                'generation': t['generation'],
+                'started_at': t['started_at'],
+                'completed_at': t['completed_at'],
+            }
+            for t in tasks
+        },
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'completed_at': job['completed_at'],
+        'retry_at': datetime.fromtimestamp(job['retry_at']).isoformat() if job['status'] == 'pending' and job['retry_at'] else None,
+    }
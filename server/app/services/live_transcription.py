@@ -0,0 +1,294 @@
+"""
+Live transcription of answers while they are being recorded
+
+Chunks of a live upload (POST /api/upload-chunk) are piped into one ffmpeg
+process per answer, which decodes the growing webm to 16 kHz PCM as it arrives.
+Whenever about LIVE_WINDOW_SECONDS of new audio are decoded, the next window
+(cut at silence, with LONG_CLIP_OVERLAP_SECONDS on both sides, see
+long_clip.plan_windows) is transcribed on the worker pool and stitched to the
+previous ones. When the last chunk arrives only the tail is left to transcribe,
+so the transcript is ready moments after the candidate stops.
+
+Inline mode only (windows run on this process's worker pool), and only with an
+engine that has transcribe_audio. Without ffmpeg or on any failure the answer is
+simply transcribed after the session finishes, as usual. Answers that get no
+chunk for LIVE_IDLE_TIMEOUT_SECONDS (tab closed) are dropped by reap_idle_loop,
+and whatever is left is dropped at shutdown (discard_all).
+"""
+
+import asyncio
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core import config
+from app.services import transcription_manager
+from app.services.audio import SAMPLE_RATE
+from app.services.long_clip import plan_windows, transcribe_window, Stitcher
+from app.services.transcription_jobs import resolve_language
+from app.services.transcription_utils import confidence_from_logprobs
+from app.services.worker_pool import get_pool
+
+_READ_SIZE = 64 * 1024
+
+
+class LiveDecoder:
+    """ffmpeg decoding webm from stdin to PCM on stdout (drained by a thread)"""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        cmd = [
+            'ffmpeg', '-nostdin', '-loglevel', 'error',
+            '-probesize', '32768',  # The first chunk holds the webm header; start decoding right away
+            '-i', 'pipe:0',
+            '-vn', '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(sample_rate),
+            'pipe:1'
+        ]
+        try:
+            self._process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            raise RuntimeError("FFmpeg not found. Please install FFmpeg and add it to PATH.")
+        self._pcm = bytearray()
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        while True:
+            data = self._process.stdout.read1(_READ_SIZE)
+            if not data:
+                break
+            with self._lock:
+                self._pcm.extend(data)
+
+    def feed(self, data: bytes):
+        """Write a webm chunk (blocking; call via asyncio.to_thread)"""
+        self._process.stdin.write(data)
+        self._process.stdin.flush()
+
+    def samples(self) -> int:
+        with self._lock:
+            return len(self._pcm) // 2
+
+    def audio(self, start: int, end: int):
+        """Decoded samples [start, end) as float32 in [-1, 1]"""
+        import numpy as np
+
+        with self._lock:
+            pcm = bytes(self._pcm[start * 2:end * 2])
+        return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+    def close(self):
+        """End of the answer: decode what is left (blocking)"""
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._reader.join()
+        self._process.wait()
+
+    def kill(self):
+        self._process.kill()
+        self._process.wait()  # Reap it; the reader thread then sees EOF and exits
+
+
+class LiveAnswer:
+    """Rolling-window transcription of one answer"""
+
+    def __init__(self, language, model_size: str, engine_key: str):
+        self.language = language
+        self.model_size = model_size
+        self.engine_key = engine_key
+        self.decoder = LiveDecoder()
+        self.overlap = int(config.LONG_CLIP_OVERLAP_SECONDS * SAMPLE_RATE)
+        self.stitcher = Stitcher(config.LONG_CLIP_OVERLAP_SECONDS)
+        self.committed = 0  # Samples transcribed and stitched
+        self.results: List[Dict] = []
+        self.error: Optional[str] = None
+        self.last_chunk = time.monotonic()
+        self._window: Optional[asyncio.Task] = None
+
+    async def feed(self, data: bytes):
+        self.last_chunk = time.monotonic()
+        try:
+            await asyncio.to_thread(self.decoder.feed, data)
+        except (BrokenPipeError, OSError) as e:
+            self.error = f"Live decoding stopped: {e}"
+            return
+        self._schedule()
+
+    def _absolute(self, window: Tuple[int, int, int, int], total: int) -> Tuple[int, int, int, int]:
+        """Window planned on the untranscribed tail, in answer samples (with overlap before the tail)"""
+        core_start, core_end = self.committed + window[0], self.committed + window[1]
+        return core_start, core_end, max(0, core_start - self.overlap), min(total, core_end + self.overlap)
+
+    def _schedule(self):
+        """Start the next window once enough audio past it is decoded (one window at a time, in order)"""
+        if self._window is not None or self.error:
+            return
+        total = self.decoder.samples()
+        if total - self.committed < (config.LIVE_WINDOW_SECONDS + config.LONG_CLIP_OVERLAP_SECONDS) * SAMPLE_RATE:
+            return
+        self._window = asyncio.create_task(self._transcribe_next(total))
+
+    def _plan_next(self, total: int) -> Tuple[int, int, int, int]:
+        """
+        Next window, planned on one window + overlap of the untranscribed tail
+        (the first cut only depends on those samples; blocking, run in a thread)
+        """
+        span = int((config.LIVE_WINDOW_SECONDS + config.LONG_CLIP_OVERLAP_SECONDS) * SAMPLE_RATE)
+        windows = plan_windows(
+            self.decoder.audio(self.committed, self.committed + span),
+            config.LIVE_WINDOW_SECONDS, config.LONG_CLIP_OVERLAP_SECONDS
+        )
+        return self._absolute(windows[0], total)
+
+    async def _run_window(self, window: Tuple[int, int, int, int]) -> Dict:
+        _, _, start, end = window
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_pool(), transcribe_window, self.engine_key, self.decoder.audio(start, end),
+            start / SAMPLE_RATE, self.language, self.model_size, False
+        )
+
+    def _stitch(self, window: Tuple[int, int, int, int], result: Dict, is_last: bool) -> bool:
+        if not result.get('success'):
+            self.error = result.get('error') or "Window failed"
+            return False
+        if self.language is None and result.get('language'):
+            self.language = result['language']  # Detected once, reused by the next windows
+        self.results.append(result)
+        self.stitcher.add(window, result, is_last)
+        self.committed = window[1]
+        return True
+
+    async def _transcribe_next(self, total: int):
+        try:
+            window = await asyncio.to_thread(self._plan_next, total)
+            result = await self._run_window(window)
+        except Exception as e:
+            self._window = None
+            self.error = str(e)
+            return
+        self._window = None
+        if self._stitch(window, result, is_last=False):
+            self._schedule()
+
+    async def finish(self) -> Dict:
+        """Transcribe what is left after the last chunk; same contract as transcribe_long_clip"""
+        await asyncio.to_thread(self.decoder.close)
+        while self._window is not None:
+            await self._window
+        total = self.decoder.samples()
+        if not self.error and not total:
+            self.error = "No audio decoded"
+
+        if not self.error and total > self.committed:
+            tail = await asyncio.to_thread(
+                plan_windows, self.decoder.audio(self.committed, total),
+                config.LIVE_WINDOW_SECONDS, config.LONG_CLIP_OVERLAP_SECONDS
+            )
+            windows = [self._absolute(window, total) for window in tail]
+            results = await asyncio.gather(*(self._run_window(w) for w in windows), return_exceptions=True)
+            for index, (window, result) in enumerate(zip(windows, results)):
+                if isinstance(result, Exception):
+                    result = {'success': False, 'error': str(result)}
+                if not self._stitch(window, result, is_last=index == len(windows) - 1):
+                    break
+
+        if self.error:
+            return {'success': False, 'transcript': '', 'confidence': 0.0, 'error': self.error}
+        segments = self.stitcher.segments
+        return {
+            'success': True,
+            'transcript': self.stitcher.transcript,
+            'confidence': confidence_from_logprobs([seg['avg_logprob'] for seg in segments]),
+            'error': None,
+            'language': self.language,
+            'language_probability': self.results[0].get('language_probability') if self.results else None,
+            'model': self.model_size,
+            'segments': segments,
+            'chunks': len(self.results)
+        }
+
+    def cancel(self):
+        if self._window is not None:
+            self._window.cancel()
+        self.decoder.kill()
+
+
+# (folder, question) -> answer being recorded
+_live: Dict[Tuple[str, int], LiveAnswer] = {}
+
+
+def enabled() -> bool:
+    return config.LIVE_TRANSCRIPTION and config.TRANSCRIPTION_MODE != "worker"
+
+
+async def feed_chunk(folder: str, question_index: int, seq: int, data: bytes):
+    """Hand a newly appended chunk to the answer's live transcription (chunk 0 starts it)"""
+    if not enabled():
+        return
+    key = (folder, question_index)
+    if seq == 0:
+        discard(folder, question_index)  # Retake
+        if not await transcription_manager.ensure_engine_loaded() or transcription_manager.TRANSCRIBE_AUDIO_FUNC is None:
+            return
+        language, _ = await asyncio.to_thread(resolve_language, folder)
+        try:
+            _live[key] = LiveAnswer(language, config.WHISPER_MODEL, transcription_manager.TRANSCRIBE_ENGINE_KEY)
+        except RuntimeError as e:
+            print(f"⚠️  Live transcription of {folder} Q{question_index} disabled: {e}")
+            return
+    answer = _live.get(key)
+    if answer is not None:
+        await answer.feed(data)
+
+
+async def finish_answer(folder: str, question_index: int) -> Optional[Dict]:
+    """Result of the live transcription of a complete answer (None if there was none)"""
+    answer = _live.pop((folder, question_index), None)
+    if answer is None:
+        return None
+    result = await answer.finish()
+    if not result['success']:
+        print(f"⚠️  Live transcription of {folder} Q{question_index} failed: {result['error']}")
+    return result
+
+
+def partial_transcript(folder: str, question_index: int) -> Optional[Dict]:
+    """Text stitched so far for an answer still being recorded"""
+    answer = _live.get((folder, question_index))
+    if answer is None or not answer.stitcher.segments:
+        return None
+    return {"text": answer.stitcher.transcript, "partial": True, "segmentsCount": len(answer.stitcher.segments)}
+
+
+def discard(folder: str, question_index: int):
+    answer = _live.pop((folder, question_index), None)
+    if answer is not None:
+        answer.cancel()
+
+
+def discard_idle(timeout: float) -> List[Tuple[str, int]]:
+    """Drop answers that got no chunk for `timeout` seconds; returns their keys"""
+    now = time.monotonic()
+    idle = [key for key, answer in _live.items() if now - answer.last_chunk >= timeout]
+    for folder, question_index in idle:
+        discard(folder, question_index)
+    return idle
+
+
+def discard_all():
+    """Shutdown: kill every live decoder (unfinished answers fall back to upload-one)"""
+    for folder, question_index in list(_live):
+        discard(folder, question_index)
+
+
+async def reap_idle_loop():
+    """Drop abandoned live answers (e.g. tab closed mid-answer), started with the app"""
+    timeout = config.LIVE_IDLE_TIMEOUT_SECONDS
+    while True:
+        await asyncio.sleep(max(1.0, timeout / 4))
+        for folder, question_index in discard_idle(timeout):
+            print(f"🧹 Live transcription of {folder} Q{question_index} dropped: no chunk for {timeout:.0f}s")
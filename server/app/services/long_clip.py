@@ -0,0 +1,240 @@
+"""
+Long-clip mode
+
+A long answer is split at silence into windows of about 30 seconds, the windows
+are transcribed in parallel on the worker pool, and text + timestamps are
+stitched back together. Per-clip latency then scales with the number of workers
+instead of with the clip length.
+
+Audio memory-mapped from the decoded-audio cache is never copied to the pool:
+workers get the .npy path and the window's sample offsets, and map the file
+themselves. Other audio (live answers) is sent window by window.
+
+Each window carries LONG_CLIP_OVERLAP_SECONDS of extra audio on both sides so
+words at a cut are not lost; when stitching, a segment belongs to the window
+whose core range contains its midpoint, and words repeated across a cut are
+dropped.
+"""
+
+import asyncio
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.core import config
+from app.services.audio import SAMPLE_RATE
+from app.services.transcription_utils import cancelled_result, confidence_from_logprobs
+from app.services.worker_pool import get_pool
+
+# Energy frame length and how far back from the window limit to look for silence
+_FRAME_SECONDS = 0.02
+_SEARCH_SECONDS = 5.0
+
+# Longest run of words checked for repetition across a cut
+_MAX_REPEATED_WORDS = 8
+
+# How often is_cancelled is checked while waiting for windows: a superseded clip
+# drops its queued windows within this delay (running ones finish in their process)
+CANCEL_POLL_SECONDS = 1.0
+
+
+def plan_windows(audio, window_seconds: float, overlap_seconds: float,
+                 sample_rate: int = SAMPLE_RATE) -> List[Tuple[int, int, int, int]]:
+    """
+    Split audio at its quietest frames.
+
+    Returns (core_start, core_end, window_start, window_end) sample offsets; core
+    ranges tile the clip, windows add the overlap on both sides and never exceed
+    window_seconds.
+    """
+    import numpy as np
+
+    frame = int(_FRAME_SECONDS * sample_rate)
+    n_frames = len(audio) // frame
+    core_frames = int(max(window_seconds - 2 * overlap_seconds, _SEARCH_SECONDS * 2) / _FRAME_SECONDS)
+    search_frames = int(_SEARCH_SECONDS / _FRAME_SECONDS)
+
+    cuts = [0]
+    if n_frames:
+        energy = np.sqrt(np.mean(np.square(audio[:n_frames * frame].reshape(n_frames, frame)), axis=1))
+        position = 0
+        while n_frames - position > core_frames:
+            lo = position + core_frames - search_frames
+            hi = position + core_frames
+            cut = lo + int(np.argmin(energy[lo:hi]))
+            cuts.append(cut * frame)
+            position = cut
+    cuts.append(len(audio))
+
+    overlap = int(overlap_seconds * sample_rate)
+    return [
+        (core_start, core_end, max(0, core_start - overlap), min(len(audio), core_end + overlap))
+        for core_start, core_end in zip(cuts, cuts[1:])
+    ]
+
+
+def transcribe_window(engine_key: str, audio, offset_seconds: float, language, model_size: str,
+                      translate_to_english: bool, span: Optional[Tuple[int, int]] = None) -> Dict:
+    """
+    Transcribe one window (runs in a worker process); timestamps are made clip-relative
+
+    `audio` is the window's samples, or the path of a cached .npy (see audio_cache)
+    with `span` = (start, end) sample offsets of the window in it.
+    """
+    from app.services.transcription_manager import load_engine_module
+
+    module = load_engine_module(engine_key)
+    if module is None or not hasattr(module, 'transcribe_audio'):
+        return {
+            'success': False,
+            'transcript': '',
+            'confidence': 0.0,
+            'error': f'Engine {engine_key} cannot transcribe decoded audio'
+        }
+
+    if isinstance(audio, str):
+        import numpy as np
+        audio = np.load(audio, mmap_mode='r')[span[0]:span[1]]
+
+    result = module.transcribe_audio(
+        audio,
+        language=language,
+        model_size=model_size,
+        translate_to_english=translate_to_english
+    )
+    for segment in result.get('segments') or []:
+        segment['start'] = round(segment['start'] + offset_seconds, 2)
+        segment['end'] = round(segment['end'] + offset_seconds, 2)
+    return result
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", '', word.lower())
+
+
+def _strip_repeated_words(previous_text: str, text: str) -> str:
+    """Drop the longest run of leading words of `text` that repeats the end of `previous_text`"""
+    previous = [_normalize_word(w) for w in previous_text.split()][-_MAX_REPEATED_WORDS:]
+    words = text.split()
+    normalized = [_normalize_word(w) for w in words]
+    for k in range(min(len(previous), len(words)), 0, -1):
+        if previous[-k:] == normalized[:k]:
+            return ' '.join(words[k:])
+    return text
+
+
+class Stitcher:
+    """Merges window results in order into clip-level segments"""
+
+    def __init__(self, overlap_seconds: float, sample_rate: int = SAMPLE_RATE):
+        self.overlap_seconds = overlap_seconds
+        self.sample_rate = sample_rate
+        self.segments: List[Dict] = []
+
+    def add(self, window: Tuple[int, int, int, int], result: Dict, is_last: bool) -> List[Dict]:
+        """Add the next window's result; returns the segments it contributed"""
+        core_start = window[0] / self.sample_rate
+        core_end = window[1] / self.sample_rate
+
+        added = []
+        for segment in result.get('segments') or []:
+            midpoint = (segment['start'] + segment['end']) / 2
+            if midpoint < core_start or (midpoint >= core_end and not is_last):
+                continue  # Belongs to the neighbouring window
+            segment = dict(segment)
+            previous = added[-1] if added else (self.segments[-1] if self.segments else None)
+            # Only audio in the overlap zone can have been transcribed twice
+            if previous and not added and segment['start'] < core_start + self.overlap_seconds:
+                segment['text'] = _strip_repeated_words(previous['text'], segment['text'])
+            if segment['text']:
+                added.append(segment)
+
+        self.segments.extend(added)
+        return added
+
+    @property
+    def transcript(self) -> str:
+        return ' '.join(segment['text'] for segment in self.segments if segment['text'])
+
+
+async def transcribe_long_clip(
+    audio,
+    engine_key: str,
+    language,
+    model_size: str,
+    translate_to_english: bool = False,
+    on_segment=None,
+    is_cancelled=None,
+    audio_path: Optional[str] = None
+) -> Dict:
+    """
+    Transcribe a long answer as parallel windows.
+
+    audio_path: the cached .npy `audio` is memory-mapped from (audio_cache.load_audio
+    info "path"); workers then slice the window from the file instead of
+    receiving a pickled copy.
+
+    on_segment: optional async callback(segment); segments are published in order
+    as soon as every earlier window is done.
+    is_cancelled: optional callable() -> bool, checked every CANCEL_POLL_SECONDS;
+    once true, windows that have not started are dropped so the pool is freed for
+    other work (windows already running in a worker process finish there).
+
+    Returns the same contract as the engines' transcribe_video plus 'chunks'.
+    """
+    windows = plan_windows(audio, config.LONG_CLIP_WINDOW_SECONDS, config.LONG_CLIP_OVERLAP_SECONDS)
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+
+    futures = {
+        loop.run_in_executor(
+            pool, transcribe_window, engine_key, audio_path or audio[start:end], start / SAMPLE_RATE,
+            language, model_size, translate_to_english, (start, end) if audio_path else None
+        ): index
+        for index, (_, _, start, end) in enumerate(windows)
+    }
+
+    stitcher = Stitcher(config.LONG_CLIP_OVERLAP_SECONDS)
+    results: Dict[int, Dict] = {}
+    next_index = 0
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=CANCEL_POLL_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+            if is_cancelled and is_cancelled():
+                return cancelled_result()
+            for future in done:
+                result = future.result()
+                if not result['success']:
+                    return {
+                        'success': False,
+                        'transcript': '',
+                        'confidence': 0.0,
+                        'error': f"Window {futures[future] + 1}/{len(windows)} failed: {result.get('error')}"
+                    }
+                results[futures[future]] = result
+
+            # Stitch (and publish) every window whose predecessors are all done
+            while next_index in results:
+                added = stitcher.add(windows[next_index], results[next_index], next_index == len(windows) - 1)
+                if on_segment:
+                    for segment in added:
+                        await on_segment(segment)
+                next_index += 1
+    finally:
+        for future in pending:
+            future.cancel()
+
+    segments = stitcher.segments
+    return {
+        'success': True,
+        'transcript': stitcher.transcript,
+        'confidence': confidence_from_logprobs([seg['avg_logprob'] for seg in segments]),
+        'error': None,
+        'language': results[0].get('language', language) if results else language,
+        'language_probability': results[0].get('language_probability') if results else None,
+        'model': model_size,
+        'segments': segments,
+        'chunks': len(windows)
+    }
@@ -0,0 +1,189 @@
+"""
+Latency-SLO-driven model selection
+
+Each transcription pass picks its model from the estimated wait until the
+transcripts are ready:
+
+    wait ≈ answers queued (all sessions) × seconds per answer (model) / parallelism
+
+Seconds per answer is an exponential moving average of observed durations per
+model; models without observations are extrapolated from a known one with
+relative costs. If the requested model would exceed TRANSCRIBE_SLO_SECONDS, the
+first entry of MODEL_FALLBACKS that fits is used (or the last one). Answers
+transcribed with a fallback are queued for an upgrade with the requested model,
+which runs when the node is idle (see upgrade_next_answer).
+"""
+
+import os
+import time
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from app.core import config
+
+# Relative cost per answer (medium = 1); int8 variants are roughly twice as fast
+RELATIVE_COST = {
+    'tiny': 0.06,
+    'base': 0.12,
+    'small': 0.35,
+    'medium': 1.0,
+    'turbo': 0.6,
+    'large': 2.0,
+    'large-v2': 2.0,
+    'large-v3': 2.0,
+}
+_INT8_SUFFIX = "-int8"
+_INT8_SPEEDUP = 0.5
+
+# Weight of the newest observation in the moving average
+EMA_ALPHA = 0.3
+
+_ema: Dict[str, float] = {}
+
+
+def relative_cost(model: str) -> float:
+    base, int8 = (model[:-len(_INT8_SUFFIX)], True) if model.endswith(_INT8_SUFFIX) else (model, False)
+    cost = RELATIVE_COST.get(base.split('.')[0], 1.0)  # "medium.en" costs like "medium"
+    return cost * _INT8_SPEEDUP if int8 else cost
+
+
+def record_duration(model: str, seconds: float):
+    """Feed the observed wall time of one answer"""
+    previous = _ema.get(model)
+    _ema[model] = seconds if previous is None else EMA_ALPHA * seconds + (1 - EMA_ALPHA) * previous
+
+
+def answer_seconds(model: str) -> Optional[float]:
+    """Estimated seconds per answer for `model` (None until something was measured)"""
+    if model in _ema:
+        return _ema[model]
+    if not _ema:
+        return None
+    known, seconds = next(iter(_ema.items()))
+    return seconds * relative_cost(model) / relative_cost(known)
+
+
+def estimate_wait(backlog: int, model: str, parallelism: int = 1) -> Optional[float]:
+    per_answer = answer_seconds(model)
+    if per_answer is None:
+        return None
+    return backlog * per_answer / max(1, parallelism)
+
+
+def fallback_models() -> List[str]:
+    return [m.strip() for m in config.MODEL_FALLBACKS.split(',') if m.strip()]
+
+
+def choose_model(requested: str, backlog: int, parallelism: int = 1) -> Tuple[str, Optional[float]]:
+    """
+    Model for the next pass, given the number of answers queued (including this job's).
+
+    Returns (model, estimated wait in seconds or None if unknown).
+    """
+    wait = estimate_wait(backlog, requested, parallelism)
+    if config.TRANSCRIBE_SLO_SECONDS <= 0 or wait is None or wait <= config.TRANSCRIBE_SLO_SECONDS:
+        return requested, wait
+
+    candidates = [m for m in fallback_models() if relative_cost(m) < relative_cost(requested)]
+    for model in candidates:
+        model_wait = estimate_wait(backlog, model, parallelism)
+        if model_wait <= config.TRANSCRIBE_SLO_SECONDS or model == candidates[-1]:
+            print(f"📉 Estimated wait {wait:.0f}s > SLO {config.TRANSCRIBE_SLO_SECONDS:.0f}s "
+                  f"({backlog} answers queued): using {model} instead of {requested} (~{model_wait:.0f}s)")
+            return model, model_wait
+    return requested, wait
+
+
+class DurationTracker:
+    """Times answers between on_start and on_progress and feeds the moving average"""
+
+    def __init__(self, model: str):
+        self.model = model
+        self._started: Dict[int, float] = {}
+
+    def start(self, question_index: int):
+        self._started[question_index] = time.monotonic()
+
+    def finish(self, question_index: int, success: bool):
+        started = self._started.pop(question_index, None)
+        if started is not None and success:
+            record_duration(self.model, time.monotonic() - started)
+
+
+async def upgrade_next_answer() -> bool:
+    """
+    Re-transcribe one answer that was transcribed with a fallback model, using the
+    model originally requested; the new transcript becomes the current version and
+    the fallback one is kept in its `versions`. Returns False if nothing was done.
+    """
+    from app.services import job_store
+
+    # Claimed, not removed: the row goes once the upgrade is done, so a shutdown
+    # (task cancelled) at any point leaves it queued for the next process
+    upgrade = await asyncio.to_thread(job_store.claim_upgrade)
+    if upgrade is None:
+        return False
+    folder, question_index = upgrade['folder'], upgrade['question_index']
+    try:
+        await _upgrade_answer(upgrade)
+    except asyncio.CancelledError:
+        # Quick local write; the loop is shutting down and the task must not await again
+        job_store.release_upgrade(folder, question_index)
+        raise
+    except Exception:
+        await asyncio.to_thread(_retry_or_drop, upgrade)
+        raise
+    return True
+
+
+def _retry_or_drop(upgrade: Dict):
+    """A failed upgrade is queued again until it has used RETRY_MAX_ATTEMPTS"""
+    from app.services import job_store
+
+    folder, question_index = upgrade['folder'], upgrade['question_index']
+    if upgrade['attempts'] + 1 < config.RETRY_MAX_ATTEMPTS:
+        job_store.add_upgrade(folder, question_index, upgrade['model'], upgrade['sha256'], upgrade['attempts'] + 1)
+    else:
+        job_store.remove_upgrade(folder, question_index, upgrade['sha256'])
+
+
+async def _upgrade_answer(upgrade: Dict):
+    """Re-transcribe one claimed upgrade and settle its row (done, retried or dropped)"""
+    from app.services import job_store
+    from app.services.transcription_manager import transcribe_batch_videos
+    from app.services.transcription_jobs import collect_video_files, save_transcription_result, resolve_language
+    from app.storage.file_manager import get_checksum
+    from app.storage.blob_backend import is_remote_backend, pull_session, push_session
+
+    folder, question_index, model = upgrade['folder'], upgrade['question_index'], upgrade['model']
+    if is_remote_backend():
+        await asyncio.to_thread(pull_session, folder)
+
+    # A retake since then makes this upgrade pointless
+    checksum = await asyncio.to_thread(get_checksum, folder, question_index) or {}
+    video_files = await asyncio.to_thread(collect_video_files, folder, question_index, [question_index])
+    if checksum.get('sha256') != upgrade['sha256'] or not os.path.exists(video_files[0][1]):
+        print(f"⏭️  Skipping upgrade of {folder} Q{question_index}: answer changed or removed")
+        await asyncio.to_thread(job_store.remove_upgrade, folder, question_index, upgrade['sha256'])
+        return
+
+    print(f"⬆️  Upgrading {folder} Q{question_index} to {model} (idle capacity)")
+    tracker = DurationTracker(model)
+    tracker.start(question_index)
+    language, _ = await asyncio.to_thread(resolve_language, folder)
+    results = await transcribe_batch_videos(video_files, language=language, model_size=model)
+    result = results.get(question_index, {})
+    tracker.finish(question_index, result.get('success', False))
+
+    if result.get('success'):
+        # Retaken while upgrading: the newer take owns the transcript
+        checksum = await asyncio.to_thread(get_checksum, folder, question_index) or {}
+        if checksum.get('sha256') == upgrade['sha256']:
+            # Also removes the upgrade row
+            await asyncio.to_thread(save_transcription_result, folder, question_index, result)
+            if is_remote_backend():
+                await asyncio.to_thread(push_session, folder)
+        else:
+            await asyncio.to_thread(job_store.remove_upgrade, folder, question_index, upgrade['sha256'])
+    else:
+        await asyncio.to_thread(_retry_or_drop, upgrade)
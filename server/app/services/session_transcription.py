@@ -0,0 +1,275 @@
+"""
+In-process session transcription (TRANSCRIPTION_MODE=inline)
+
+Runs a session's questions through the engine as a background task, publishing
+progress to the task queue. Failed questions are retried with backoff, and a
+question re-uploaded (retaken) while the job runs supersedes its old take: the
+old inference is aborted or its result ignored, and only the newest take is
+transcribed. Worker mode does the same through app/services/job_store.py.
+
+Each pass picks its model against TRANSCRIBE_SLO_SECONDS (see model_policy);
+answers transcribed with a fallback model are upgraded while the queue is idle.
+
+On shutdown (app lifespan) no new answers are started, answers already being
+decoded get SHUTDOWN_GRACE_SECONDS to finish, and whatever is left is saved in
+the job store and resumed by the next process (drain_sessions / resume_interrupted).
+Aborting works between segments, so only engines that stream segments
+(faster-whisper, long-clip windows) stop early. openai-whisper emits its
+segments when the whole answer is decoded: an answer it is decoding cannot be
+aborted, and the process exits only once that call returns (its result is dropped).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from app.core import config
+from app.storage.blob_backend import is_remote_backend, push_session
+from app.services.task_queue import queue, TaskStatus
+from app.services.transcription_manager import transcribe_batch_videos, is_transcription_available
+from app.services.model_policy import choose_model, DurationTracker, upgrade_next_answer
+from app.services.transcription_jobs import (
+    collect_video_files, save_transcription_result, retry_delay, resolve_language, save_session_language,
+    transcribed_questions, current_transcripts
+)
+from app.services.compaction import compact_after_job
+from app.services import job_store
+
+# Background session tasks of this process, and the shutdown state
+_session_tasks: Set[asyncio.Task] = set()
+_draining = asyncio.Event()  # No new answers / passes / retries
+_aborting = asyncio.Event()  # Grace period over: abort answers being decoded
+# Seconds aborted answers get to unwind (the engine stops at its next segment)
+ABORT_WAIT_SECONDS = 10.0
+
+
+async def transcribe_pass(folder: str, questions_count: int, indices: List[int], model_size: str, upgrade_to: Optional[str] = None):
+    """
+    Transcribe the given questions once, publishing progress to the task queue
+
+    `upgrade_to`: model_size is a fallback for this model (see model_policy)
+    """
+    # Collect video files (resolving the session folder touches the disk)
+    video_files = await asyncio.to_thread(collect_video_files, folder, questions_count, indices)
+    # TRANSCRIBE_LANGUAGE=auto: detected once per session, then reused by later passes
+    language, detect_once = await asyncio.to_thread(resolve_language, folder)
+
+    print(f"🔄 Starting transcription for {len(video_files)} videos in {folder} (model: {model_size})")
+
+    tracker = DurationTracker(model_size)
+    # Answers started before a shutdown began get the grace period
+    running = set()
+
+    async def on_start(question_index):
+        tracker.start(question_index)
+        if not _draining.is_set():
+            running.add(question_index)
+        await queue.start_task(folder, question_index)
+
+    def is_cancelled(question_index):
+        if _aborting.is_set() or (_draining.is_set() and question_index not in running):
+            return True
+        return queue.is_superseded(folder, question_index)
+
+    # Publish partial segments while each answer is decoded
+    async def on_segment(question_index, segment):
+        await queue.append_segment(folder, question_index, segment)
+
+    # Transcribe all videos with progress callback
+    async def on_progress(question_index, success, transcript, error, result=None):
+        tracker.finish(question_index, success and not (result or {}).get('cancelled'))
+        running.discard(question_index)
+        if (result or {}).get('cancelled') or queue.is_superseded(folder, question_index):
+            # A newer take arrived (or shutdown): drop this result, the answer is transcribed next
+            await queue.requeue_superseded(folder, question_index)
+            return
+        if success:
+            result = result or {'transcript': transcript}
+            await queue.update_task(
+                folder, question_index, TaskStatus.SUCCESS,
+                transcript=transcript, confidence=result.get('confidence', 0.95)
+            )
+            # Update metadata immediately
+            await asyncio.to_thread(save_transcription_result, folder, question_index, result, upgrade_to)
+        else:
+            await queue.update_task(
+                folder, question_index, TaskStatus.FAILED,
+                error=error
+            )
+
+    await transcribe_batch_videos(
+        video_files,
+        language=language,
+        translate_to_english=False,
+        model_size=model_size,
+        on_progress=on_progress,
+        on_segment=on_segment,
+        on_start=on_start,
+        is_cancelled=is_cancelled,
+        detect_language_once=detect_once,
+        on_language=lambda q, code, probability: asyncio.to_thread(save_session_language, folder, q, code, probability)
+    )
+
+
+async def transcribe_session(folder: str, questions_count: int, model_size: str, indices: Optional[List[int]] = None):
+    """
+    Background transcription task
+
+    Transcribes `indices` (default: every question), then any newer takes uploaded
+    meanwhile, then retries failed questions with exponential backoff until they
+    succeed or use RETRY_MAX_ATTEMPTS.
+    """
+    try:
+        if indices is None:
+            # Create transcription job
+            await queue.create_job(folder, questions_count, model_size)
+            await queue.start_job(folder)
+            # Answers transcribed live while they were recorded are done already
+            done = await asyncio.to_thread(current_transcripts, folder)
+            for question_index, transcript in done.items():
+                if question_index <= questions_count:
+                    await queue.update_task(
+                        folder, question_index, TaskStatus.SUCCESS,
+                        transcript=transcript.get('text', ''), confidence=transcript.get('confidence') or 0.0
+                    )
+            indices = [i for i in range(1, questions_count + 1) if i not in done]
+
+        while indices:
+            if _draining.is_set():
+                # Shutdown: drain_sessions saves what is left for the next process
+                return
+
+            # Smaller model if the queue would miss the latency SLO
+            pass_model, _ = choose_model(model_size, await queue.backlog())
+            await transcribe_pass(
+                folder, questions_count, indices, pass_model,
+                upgrade_to=model_size if pass_model != model_size else None
+            )
+
+            # Newer takes (retakes) go next, without backoff
+            indices = await queue.pending_tasks(folder)
+            if indices:
+                continue
+
+            # Mark job as complete
+            await queue.complete_job(folder)
+
+            # Automatic retry of failed questions that have attempts left
+            job = await queue.get_job(folder)
+            retryable = [
+                job.tasks[idx].attempts for idx in job.get_failed_tasks()
+                if job.tasks[idx].attempts < config.RETRY_MAX_ATTEMPTS
+            ] if job else []
+            if not retryable:
+                break
+            delay = retry_delay(max(retryable))
+            await queue.schedule_retry(folder, (datetime.now() + timedelta(seconds=delay)).isoformat())
+            print(f"⏳ {len(retryable)} question(s) failed in {folder}, retrying in {delay:.0f}s")
+            try:
+                await asyncio.wait_for(_draining.wait(), timeout=delay)
+                return  # Shutdown: the retry runs in the next process
+            except asyncio.TimeoutError:
+                pass
+            # None / [] if a manual retry or a retake took over in the meantime
+            indices = await queue.retry_tasks(folder, max_attempts=config.RETRY_MAX_ATTEMPTS)
+
+        print(f"✅ Transcription completed for {folder}")
+
+        # Audio rendition / downscale of the transcribed answers (COMPACTION_MODE)
+        await asyncio.to_thread(compact_after_job, folder)
+
+        # Mirror transcripts / segments to the blob backend
+        if is_remote_backend():
+            await asyncio.to_thread(push_session, folder)
+
+    except Exception as e:
+        print(f"⚠️  Transcription background task failed: {e}")
+        await queue.complete_job(folder)
+
+
+async def supersede_question(folder: str, question_index: int) -> Optional[str]:
+    """
+    A new take of a question was stored: cancel / ignore transcription of the old
+    take and queue only the newest one. No-op if the session is not being (or has
+    not been) transcribed. Returns the action taken (see TaskQueue.supersede).
+    """
+    if config.TRANSCRIPTION_MODE == "worker":
+        return await asyncio.to_thread(job_store.supersede_task, folder, question_index)
+
+    action = await queue.supersede(folder, question_index)
+    if action == "start":
+        job = await queue.get_job(folder)
+        start_session_task(folder, job.questions_count, job.model or config.WHISPER_MODEL, [question_index])
+    return action
+
+
+def start_session_task(folder: str, questions_count: int, model_size: str, indices: Optional[List[int]] = None) -> asyncio.Task:
+    """Run transcribe_session in the background, tracked for a graceful shutdown"""
+    task = asyncio.create_task(transcribe_session(folder, questions_count, model_size, indices))
+    _session_tasks.add(task)
+    task.add_done_callback(_session_tasks.discard)
+    return task
+
+
+async def drain_sessions(grace_seconds: float) -> int:
+    """
+    Shutdown: stop starting answers, give the ones being decoded `grace_seconds`
+    to finish, abort the rest and save every session with work left (queued,
+    interrupted or awaiting a retry) for resume_interrupted. Returns the number of
+    sessions saved. An answer openai-whisper is decoding cannot be aborted (see
+    above): its task is cancelled, but the engine thread runs to the end.
+    """
+    _draining.set()
+    running = {task for task in _session_tasks if not task.done()}
+    if running:
+        print(f"⏳ Shutdown: waiting up to {grace_seconds:.0f}s for {len(running)} transcription task(s)")
+        _, running = await asyncio.wait(running, timeout=grace_seconds)
+    if running:
+        _aborting.set()
+        _, running = await asyncio.wait(running, timeout=ABORT_WAIT_SECONDS)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    unfinished = await queue.unfinished_jobs(config.RETRY_MAX_ATTEMPTS)
+    for job in unfinished:
+        await asyncio.to_thread(job_store.save_interrupted, job['folder'], job['questions_count'], job['model'], job['indices'])
+        print(f"💾 Saved {job['folder']} Q{', Q'.join(map(str, job['indices']))} for the next process")
+    return len(unfinished)
+
+
+async def resume_interrupted() -> int:
+    """Startup: restart the sessions a previous process saved in drain_sessions"""
+    # A new lifespan in the same process (tests) takes work again
+    _draining.clear()
+    _aborting.clear()
+    if not is_transcription_available():
+        return 0  # Kept for a process that has an engine
+    interrupted = await asyncio.to_thread(job_store.pop_interrupted)
+    for saved in interrupted:
+        folder, questions_count = saved['folder'], saved['questions_count']
+        model_size = saved['model'] or config.WHISPER_MODEL
+        if await queue.get_job(folder) is None:
+            transcribed = await asyncio.to_thread(transcribed_questions, folder)
+            await queue.restore_job(folder, questions_count, transcribed, model_size)
+        # Questions transcribed meanwhile are skipped (only failed ones are reset)
+        indices = await queue.retry_tasks(folder, saved['indices'])
+        if indices:
+            print(f"▶️  Resuming transcription of {folder} (Q{', Q'.join(map(str, indices))})")
+            start_session_task(folder, questions_count, model_size, indices)
+    return len(interrupted)
+
+
+async def idle_upgrade_loop():
+    """
+    Re-transcribe answers that got a fallback model, one at a time, whenever no
+    session is waiting (started with the app when MODEL_UPGRADE_IDLE is set)
+    """
+    while True:
+        await asyncio.sleep(config.MODEL_UPGRADE_POLL_SECONDS)
+        try:
+            while is_transcription_available() and await queue.backlog() == 0:
+                if not await upgrade_next_answer():
+                    break
+        except Exception as e:
+            print(f"⚠️  Model upgrade failed: {e}")
@@ -0,0 +1,57 @@
+"""
+Stub transcription engine for load testing (TRANSCRIPTION_ENGINE=stub)
+
+Sleeps instead of running a model and returns a deterministic transcript with the
+same result contract as the real engines, so the whole pipeline (queue, worker,
+segments, retries, retakes) can be exercised without torch or ffmpeg (there is no
+transcribe_audio, so synthetic payloads are never decoded). Only used when
+configured explicitly; it is never picked as a fallback engine.
+"""
+
+import time
+import random
+import hashlib
+
+from app.core import config
+from app.services.transcription_utils import compact_segment
+
+STUB_AVAILABLE = True
+
+_SEGMENTS = 4
+
+
+def _transcribe(seed: bytes, language, model_size: str, on_segment) -> dict:
+    digest = hashlib.sha256(seed).hexdigest()[:8]
+    if config.STUB_FAILURE_RATE > 0 and random.random() < config.STUB_FAILURE_RATE:
+        time.sleep(config.STUB_TRANSCRIBE_SECONDS / 2)
+        return {
+            'success': False,
+            'transcript': '',
+            'confidence': 0.0,
+            'error': 'Stub engine: simulated failure'
+        }
+
+    # Decode "segments" at an even pace so streaming and cancellation are exercised
+    segments = []
+    for i in range(_SEGMENTS):
+        time.sleep(config.STUB_TRANSCRIBE_SECONDS / _SEGMENTS)
+        segment = compact_segment(i * 5.0, (i + 1) * 5.0, f"Stub segment {i + 1} of answer {digest}.", -0.2, 0.01)
+        segments.append(segment)
+        if on_segment:
+            on_segment(segment)
+
+    return {
+        'success': True,
+        'transcript': ' '.join(seg['text'] for seg in segments),
+        'confidence': 0.8,
+        'error': None,
+        'language': language or 'en',
+        'language_probability': 1.0 if language else 0.99,
+        'model': model_size,
+        'segments': segments
+    }
+
+
+def transcribe_video(video_bytes: bytes, language: str = "en", model_size: str = "medium", translate_to_english: bool = False, on_segment=None) -> dict:
+    """Same contract as whisper_local_transcription.transcribe_video; takes STUB_TRANSCRIBE_SECONDS"""
+    return _transcribe(video_bytes[:4096], language, model_size, on_segment)
@@ -28,6 +28,15 @@ class TranscriptionTask:
     error: str = ""
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
+    segments: List[Dict] = field(default_factory=list)  # Partial results while processing
+    attempts: int = 0  # Finished attempts (success or failure)
+    last_error: str = ""  # Error of the latest failed attempt (kept across retries)
+    generation: int = 0  # Bumped on every new upload (retake) of this question
+    superseded: bool = False  # A newer take arrived while this one was being transcribed
+    
+    def get_partial_transcript(self) -> str:
+        """Text decoded so far (while processing)"""
+        return " ".join(seg['text'] for seg in self.segments if seg.get('text'))
     
     def to_dict(self):
         return asdict(self)
@@ -38,11 +47,13 @@ class SessionTranscriptionJob:
     """Represents entire session transcription job"""
     folder: str
     questions_count: int
+    model: Optional[str] = None
     status: TaskStatus = TaskStatus.PENDING
     tasks: Dict[int, TranscriptionTask] = field(default_factory=dict)
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
+    retry_at: Optional[str] = None  # When the next automatic retry of failed tasks runs
     
     def get_progress(self) -> tuple[int, int]:
         """Returns (completed, total)"""
@@ -87,8 +98,13 @@ class SessionTranscriptionJob:
                     'question_index': v.question_index,
                     'status': v.status.value,
                     'transcript': v.transcript if v.status == TaskStatus.SUCCESS else "",
+                    'partial_transcript': v.get_partial_transcript() if v.status == TaskStatus.PROCESSING else "",
+                    'segments_count': len(v.segments),
                     'confidence': v.confidence,
                     'error': v.error,
+                    'attempts': v.attempts,
+                    'last_error': v.last_error,
+                    'generation': v.generation,
                     'started_at': v.started_at,
                     'completed_at': v.completed_at,
                 }
@@ -97,6 +113,7 @@ class SessionTranscriptionJob:
             'created_at': self.created_at,
             'started_at': self.started_at,
             'completed_at': self.completed_at,
+            'retry_at': self.retry_at,
         }
 
 
@@ -112,7 +129,7 @@ class TaskQueue:
             cls._instance = super().__new__(cls)
         return cls._instance
     
-    async def create_job(self, folder: str, questions_count: int) -> SessionTranscriptionJob:
+    async def create_job(self, folder: str, questions_count: int, model: Optional[str] = None) -> SessionTranscriptionJob:
         """Create new transcription job for session"""
         async with self._lock:
             if folder in self._jobs:
@@ -121,7 +138,8 @@ class TaskQueue:
             
             job = SessionTranscriptionJob(
                 folder=folder,
-                questions_count=questions_count
+                questions_count=questions_count,
+                model=model
             )
             
             # Initialize tasks for each question
@@ -176,6 +194,10 @@ class TaskQueue:
                 task.started_at = datetime.now().isoformat()
             elif status in [TaskStatus.SUCCESS, TaskStatus.FAILED]:
                 task.completed_at = datetime.now().isoformat()
+                task.segments = []  # Final segments are stored next to the transcript
+                task.attempts += 1
+                if status == TaskStatus.FAILED:
+                    task.last_error = error
             
             # Check if job is complete
             if job.is_complete() and job.status != TaskStatus.SUCCESS:
@@ -183,6 +205,218 @@ class TaskQueue:
                 job.completed_at = datetime.now().isoformat()
                 print(f"✅ Job completed for {folder}")
     
+    async def retry_tasks(
+        self,
+        folder: str,
+        indices: Optional[List[int]] = None,
+        max_attempts: Optional[int] = None
+    ) -> Optional[List[int]]:
+        """
+        Reset failed tasks to pending so that only they are transcribed again.
+        
+        indices: restrict to these questions (default: all failed ones)
+        max_attempts: skip tasks that already used this many attempts
+        
+        Returns the reset indices ([] if there is nothing to retry), or None if the
+        job does not exist or is still running. Successful tasks are never reset.
+        """
+        async with self._lock:
+            job = self._jobs.get(folder)
+            if not job or job.status == TaskStatus.PROCESSING:
+                return None
+            
+            retry = [
+                idx for idx in job.get_failed_tasks()
+                if (indices is None or idx in indices)
+                and (max_attempts is None or job.tasks[idx].attempts < max_attempts)
+            ]
+            for idx in retry:
+                task = job.tasks[idx]
+                task.status = TaskStatus.PENDING
+                task.error = ""
+                task.started_at = None
+                task.completed_at = None
+                task.segments = []
+            if retry:
+                job.status = TaskStatus.PROCESSING
+                job.completed_at = None
+                job.retry_at = None
+                print(f"🔁 Retrying Q{', Q'.join(map(str, retry))} for {folder}")
+            return sorted(retry)
+    
+    async def schedule_retry(self, folder: str, retry_at: Optional[str]):
+        """Record when the next automatic retry runs (None = no retry scheduled)"""
+        async with self._lock:
+            if folder in self._jobs:
+                self._jobs[folder].retry_at = retry_at
+    
+    async def restore_job(self, folder: str, questions_count: int, transcribed: List[int], model: Optional[str] = None) -> SessionTranscriptionJob:
+        """
+        Rebuild a job lost from memory (e.g. after a restart or OOM kill) from meta.json:
+        transcribed questions are successful, the others failed and can be retried.
+        """
+        async with self._lock:
+            if folder in self._jobs:
+                return self._jobs[folder]
+            
+            now = datetime.now().isoformat()
+            job = SessionTranscriptionJob(folder=folder, questions_count=questions_count, status=TaskStatus.FAILED, model=model)
+            for i in range(1, questions_count + 1):
+                done = i in transcribed
+                job.tasks[i] = TranscriptionTask(
+                    question_index=i,
+                    status=TaskStatus.SUCCESS if done else TaskStatus.FAILED,
+                    error="" if done else "Not transcribed (job state was lost)",
+                    completed_at=now
+                )
+            if not job.get_failed_tasks():
+                job.status = TaskStatus.SUCCESS
+            job.completed_at = now
+            self._jobs[folder] = job
+            print(f"📋 Restored transcription job for {folder} from metadata")
+            return job
+    
+    async def start_task(self, folder: str, question_index: int):
+        """Mark a task as processing right before its video is read"""
+        async with self._lock:
+            job = self._jobs.get(folder)
+            if not job or question_index not in job.tasks:
+                return
+            task = job.tasks[question_index]
+            task.status = TaskStatus.PROCESSING
+            task.started_at = datetime.now().isoformat()
+            task.superseded = False
+            task.segments = []
+    
+    def is_superseded(self, folder: str, question_index: int) -> bool:
+        """Whether the take being transcribed was replaced (lock-free; safe from engine threads)"""
+        job = self._jobs.get(folder)
+        task = job.tasks.get(question_index) if job else None
+        return bool(task and task.superseded)
+    
+    async def supersede(self, folder: str, question_index: int) -> Optional[str]:
+        """
+        A new take of a question was uploaded.
+        
+        Returns:
+            None          no transcription job for this question
+            "pending"     not started yet; the new file will be read
+            "cancelling"  in flight; the old take is aborted and the new one re-queued
+            "queued"      already done; re-queued behind the running job
+            "start"       already done and the job is idle; caller must start it
+        """
+        async with self._lock:
+            job = self._jobs.get(folder)
+            if not job or question_index not in job.tasks:
+                return None
+            
+            task = job.tasks[question_index]
+            task.generation += 1
+            if task.status == TaskStatus.PENDING:
+                return "pending"
+            if task.status == TaskStatus.PROCESSING:
+                task.superseded = True
+                print(f"⏹️  Q{question_index} of {folder} superseded by a new upload (generation {task.generation})")
+                return "cancelling"
+            
+            # Finished take: only the newest one gets transcribed
+            task.status = TaskStatus.PENDING
+            task.transcript = ""
+            task.error = ""
+            task.attempts = 0
+            task.started_at = None
+            task.completed_at = None
+            if job.status == TaskStatus.PROCESSING:
+                return "queued"
+            job.status = TaskStatus.PROCESSING
+            job.completed_at = None
+            job.retry_at = None
+            return "start"
+    
+    async def requeue_superseded(self, folder: str, question_index: int):
+        """Put a cancelled (superseded) task back to pending; the attempt is not counted"""
+        async with self._lock:
+            job = self._jobs.get(folder)
+            if not job or question_index not in job.tasks:
+                return
+            task = job.tasks[question_index]
+            task.status = TaskStatus.PENDING
+            task.superseded = False
+            task.error = ""
+            task.segments = []
+            task.started_at = None
+    
+    async def pending_tasks(self, folder: str) -> List[int]:
+        """Indices of tasks waiting to be transcribed"""
+        async with self._lock:
+            job = self._jobs.get(folder)
+            if not job:
+                return []
+            return sorted(idx for idx, t in job.tasks.items() if t.status == TaskStatus.PENDING)
+    
+    async def backlog(self) -> int:
+        """Answers queued or being transcribed, across all jobs"""
+        async with self._lock:
+            return sum(
+                1 for job in self._jobs.values() for t in job.tasks.values()
+                if t.status in (TaskStatus.PENDING, TaskStatus.PROCESSING)
+            )
+    
+    async def unfinished_jobs(self, max_attempts: int) -> List[Dict]:
+        """
+        Jobs with work left: questions queued or being transcribed, or failed with
+        automatic retries left. Returns [{"folder", "questions_count", "model", "indices"}].
+        """
+        async with self._lock:
+            unfinished = []
+            for job in self._jobs.values():
+                if job.status != TaskStatus.PROCESSING and not job.retry_at:
+                    continue
+                indices = sorted(
+                    idx for idx, t in job.tasks.items()
+                    if t.status in (TaskStatus.PENDING, TaskStatus.PROCESSING)
+                    or (t.status == TaskStatus.FAILED and t.attempts < max_attempts)
+                )
+                if indices:
+                    unfinished.append({
+                        'folder': job.folder,
+                        'questions_count': job.questions_count,
+                        'model': job.model,
+                        'indices': indices
+                    })
+            return unfinished
+    
+    async def append_segment(self, folder: str, question_index: int, segment: Dict):
+        """Publish a decoded segment for a task that is still processing"""
+        async with self._lock:
+            job = self._jobs.get(folder)
+            if not job or question_index not in job.tasks:
+                return
+            
+            task = job.tasks[question_index]
+            if task.status in [TaskStatus.SUCCESS, TaskStatus.FAILED] or task.superseded:
+                return
+            if task.status == TaskStatus.PENDING:
+                task.status = TaskStatus.PROCESSING
+                task.started_at = datetime.now().isoformat()
+            task.segments.append(segment)
+    
+    async def get_partial_transcript(self, folder: str, question_index: int) -> Optional[Dict]:
+        """Partial text for a task that is still processing (None otherwise)"""
+        async with self._lock:
+            job = self._jobs.get(folder)
+            if not job or question_index not in job.tasks:
+                return None
+            task = job.tasks[question_index]
+            if task.status != TaskStatus.PROCESSING:
+                return None
+            return {
+                'text': task.get_partial_transcript(),
+                'segments': list(task.segments),
+                'partial': True,
+                'startedAt': task.started_at,
+            }
+    
     async def complete_job(self, folder: str):
         """Mark entire job as complete"""
         async with self._lock:
@@ -0,0 +1,112 @@
+"""
+Helpers shared by everything that runs a session transcription job
+(the in-process background task and the standalone worker)
+"""
+
+import os
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.core import config
+from app.storage.file_manager import session_path, update_metadata, get_checksum
+from app.storage.segment_store import save_segments
+from app.storage.metadata_manager import update_language_metadata
+from app.services import job_store
+
+
+def collect_video_files(folder: str, questions_count: int, indices: Optional[List[int]] = None) -> List[Tuple[int, str]]:
+    """(question_index, video_path) for every question of a session (or only `indices`)"""
+    folder_path = session_path(folder)
+    return [
+        (i, os.path.join(folder_path, f"Q{i}.webm"))
+        for i in range(1, questions_count + 1)
+        if indices is None or i in indices
+    ]
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before the next automatic retry of a task that failed `attempts` times"""
+    return min(config.RETRY_BACKOFF_MAX_SECONDS, config.RETRY_BACKOFF_SECONDS * 2 ** max(0, attempts - 1))
+
+
+def _read_meta(folder: str) -> Dict:
+    meta_path = os.path.join(session_path(folder), 'meta.json')
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, 'r') as f:
+        return json.load(f)
+
+
+def transcribed_questions(folder: str) -> List[int]:
+    """Questions that already have a transcript in meta.json"""
+    return sorted(int(q) for q in _read_meta(folder).get('transcripts', {}))
+
+
+def current_transcripts(folder: str) -> Dict[int, Dict]:
+    """Transcripts made from the stored take of their answer (e.g. transcribed live while recorded)"""
+    meta = _read_meta(folder)
+    checksums = meta.get('checksums', {})
+    return {
+        int(q): transcript for q, transcript in meta.get('transcripts', {}).items()
+        if transcript.get('sourceSha256') and transcript['sourceSha256'] == (checksums.get(q) or {}).get('sha256')
+    }
+
+
+def recorded_questions_count(folder: str) -> Optional[int]:
+    """questionsCount recorded by /session/finish (None if not finished yet)"""
+    return _read_meta(folder).get('questionsCount')
+
+
+def resolve_language(folder: str, requested: Optional[str] = None) -> Tuple[Optional[str], bool]:
+    """
+    Language to transcribe a session with (see TRANSCRIBE_LANGUAGE).
+
+    Returns (language or None to detect per answer, whether to detect it once for the session).
+    """
+    requested = requested or config.TRANSCRIBE_LANGUAGE
+    if requested == 'clip':
+        return None, False
+    if requested != 'auto':
+        return requested, False
+    detected = _read_meta(folder).get('language') or {}
+    if detected.get('code'):
+        return detected['code'], False  # Detected on an earlier run
+    return None, True
+
+
+def save_session_language(folder: str, question_index: int, language: str, probability: Optional[float]):
+    """Store the language detected on one answer as the session language"""
+    update_language_metadata(folder, {
+        'code': language,
+        'probability': probability,
+        'detectedFrom': question_index,
+        'detectedAt': datetime.now().isoformat()
+    })
+
+
+def save_transcription_result(folder: str, question_index: int, result: Dict, upgrade_to: Optional[str] = None):
+    """
+    Persist a successful result: segments file + transcript in meta.json / transcripts.txt
+
+    `upgrade_to`: the result came from a fallback model (latency SLO); queue the
+    answer for re-transcription with this model when capacity is idle.
+    """
+    segments = result.get('segments')
+    checksum = get_checksum(folder, question_index) or {}
+    if segments is not None:
+        save_segments(folder, question_index, segments)
+    update_metadata(
+        folder, question_index,
+        transcript=result.get('transcript', ''),
+        confidence=result.get('confidence', 0.95),
+        model=result.get('model'),
+        language=result.get('language'),
+        segments_count=len(segments) if segments is not None else None,
+        source_sha256=checksum.get('sha256'),
+        upgrade_to=upgrade_to
+    )
+    if upgrade_to is not None:
+        job_store.add_upgrade(folder, question_index, upgrade_to, checksum.get('sha256'))
+    else:
+        job_store.remove_upgrade(folder, question_index)
@@ -5,59 +5,131 @@ Handles detection, initialization, and execution of transcription tasks
 
 import os
 import inspect
+import importlib.util
+import threading
 from typing import Optional, Dict, Tuple
 import asyncio
+import aiofiles
+from app.core import config
+from app.core.profiling import run_profiled
+from app.services.audio import SAMPLE_RATE, decode_audio, probe_duration
+from app.services.long_clip import transcribe_long_clip
+from app.services import audio_cache
+from app.services.transcription_utils import cancelled_result, speech_seconds
 
-# Lazy imports - try to load available transcription engines
+# Registered engines: key -> (module name, display name, availability flag in module, package to probe)
+ENGINES = {
+    'whisper_local': ('whisper_local_transcription', 'Whisper Local (FREE)', 'WHISPER_AVAILABLE', 'whisper'),
+    'faster_whisper': ('faster_whisper_transcription', 'Faster-Whisper int8 (CPU)', 'FASTER_WHISPER_AVAILABLE', 'faster_whisper'),
+    'stub': ('stub_transcription', 'Stub (load testing)', 'STUB_AVAILABLE', 'app.services.stub_transcription'),
+}
+# Engines used only when selected with TRANSCRIPTION_ENGINE, never as a fallback
+EXPLICIT_ONLY_ENGINES = {'stub'}
+
+# Lazy imports - engines (and torch) are only imported on the first transcription,
+# so API-only processes start fast; availability is probed without importing
 TRANSCRIBE_FUNC = None
+TRANSCRIBE_AUDIO_FUNC = None  # Engine's transcribe_audio (decoded PCM), if it has one
 TRANSCRIBE_ENGINE = None
+TRANSCRIBE_ENGINE_KEY = None
 TRANSCRIBE_AVAILABLE = False
+_init_lock = threading.Lock()
 
 
-def _init_transcription_engine():
-    """Initialize transcription engine once (cached)"""
-    global TRANSCRIBE_FUNC, TRANSCRIBE_ENGINE, TRANSCRIBE_AVAILABLE
-    
-    if TRANSCRIBE_AVAILABLE:
-        return  # Already initialized
-    
-    # Priority: Whisper Local only (project configured to use local Whisper)
-    engines = [
-        ('whisper_local_transcription', 'Whisper Local (FREE)'),
+class TranscriptionCancelled(Exception):
+    """Raised inside an engine (from its segment callback) to abort a superseded transcription"""
+
+
+def load_engine_module(engine_key: str):
+    """Import an engine module; returns None if it is unknown or its package is not installed"""
+    if engine_key not in ENGINES or not probe_engine(engine_key):
+        return None
+    module_name, _, flag, _ = ENGINES[engine_key]
+    module = __import__(
+        f'app.services.{module_name}',
+        fromlist=['transcribe_video']
+    )
+    if not getattr(module, flag, False):
+        return None
+    return module
+
+
+def probe_engine(engine_key: str) -> bool:
+    """Check that an engine's package is installed without importing it"""
+    try:
+        return importlib.util.find_spec(ENGINES[engine_key][3]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _engine_priority() -> list:
+    """Configured engine (TRANSCRIPTION_ENGINE) first, the others as fallbacks"""
+    preferred = config.TRANSCRIPTION_ENGINE
+    return [
+        key for key in dict.fromkeys([preferred] + list(ENGINES))
+        if key in ENGINES and (key == preferred or key not in EXPLICIT_ONLY_ENGINES)
     ]
+
+
+def _probe_available_engine() -> Optional[str]:
+    """Key of the engine that would be loaded, without importing anything heavy"""
+    for engine_key in _engine_priority():
+        if probe_engine(engine_key):
+            return engine_key
+    return None
+
+
+def _init_transcription_engine():
+    """Import and initialize the transcription engine once (cached)"""
+    global TRANSCRIBE_FUNC, TRANSCRIBE_AUDIO_FUNC, TRANSCRIBE_ENGINE, TRANSCRIBE_ENGINE_KEY, TRANSCRIBE_AVAILABLE
     
-    for module_name, engine_name in engines:
-        try:
-            module = __import__(
-                f'app.services.{module_name}',
-                fromlist=['transcribe_video']
-            )
-            TRANSCRIBE_FUNC = module.transcribe_video
-            TRANSCRIBE_ENGINE = engine_name
-            TRANSCRIBE_AVAILABLE = True
-            print(f"✅ {engine_name} transcription available")
-            return
-        except (ImportError, AttributeError):
-            continue
-        except Exception as e:
-            print(f"⚠️  Error loading {engine_name}: {e}")
-            continue
-    
-    print("⚠️  No transcription module available. Transcription will be skipped.")
+    with _init_lock:
+        if TRANSCRIBE_AVAILABLE:
+            return  # Already initialized
+        
+        if config.TRANSCRIPTION_ENGINE not in ENGINES:
+            print(f"⚠️  Unknown TRANSCRIPTION_ENGINE '{config.TRANSCRIPTION_ENGINE}', expected one of: {', '.join(ENGINES)}")
+        
+        for engine_key in _engine_priority():
+            engine_name = ENGINES[engine_key][1]
+            try:
+                module = load_engine_module(engine_key)
+                if module is None:
+                    continue
+                TRANSCRIBE_FUNC = module.transcribe_video
+                TRANSCRIBE_AUDIO_FUNC = getattr(module, 'transcribe_audio', None)
+                TRANSCRIBE_ENGINE = engine_name
+                TRANSCRIBE_ENGINE_KEY = engine_key
+                TRANSCRIBE_AVAILABLE = True
+                print(f"✅ {engine_name} transcription available")
+                return
+            except (ImportError, AttributeError):
+                continue
+            except Exception as e:
+                print(f"⚠️  Error loading {engine_name}: {e}")
+                continue
+        
+        print("⚠️  No transcription module available. Transcription will be skipped.")
 
 
 def is_transcription_available() -> bool:
-    """Check if transcription is available"""
-    if not TRANSCRIBE_AVAILABLE:
-        _init_transcription_engine()
-    return TRANSCRIBE_AVAILABLE
+    """Check if transcription is available (probe only, does not import the engine)"""
+    return TRANSCRIBE_AVAILABLE or _probe_available_engine() is not None
 
 
 def get_transcription_engine() -> str:
-    """Get current transcription engine name"""
+    """Get current (or, before the first transcription, expected) transcription engine name"""
+    if TRANSCRIBE_ENGINE:
+        return TRANSCRIBE_ENGINE
+    engine_key = _probe_available_engine()
+    return ENGINES[engine_key][1] if engine_key else "None"
+
+
+async def ensure_engine_loaded() -> bool:
+    """Import the engine on first use, off the event loop (importing torch takes seconds)"""
     if not TRANSCRIBE_AVAILABLE:
-        _init_transcription_engine()
-    return TRANSCRIBE_ENGINE or "None"
+        await asyncio.to_thread(_init_transcription_engine)
+    return TRANSCRIBE_AVAILABLE
 
 
 def _get_transcribe_signature() -> Dict[str, bool]:
@@ -68,6 +140,7 @@ def _get_transcribe_signature() -> Dict[str, bool]:
             'has_model_size': 'model_size' in sig.parameters,
             'has_language': 'language' in sig.parameters,
             'has_translate': 'translate_to_english' in sig.parameters,
+            'has_on_segment': 'on_segment' in sig.parameters,
         }
     return _get_transcribe_signature._signature_cache
 
@@ -76,26 +149,39 @@ async def transcribe_single_video(
     video_bytes: bytes,
     language: str = "en",
     translate_to_english: bool = False,
-    model_size: str = "medium"
+    model_size: str = "medium",
+    on_segment=None,
+    is_cancelled=None,
+    audio=None,
+    question_index: Optional[int] = None
 ) -> Dict:
     """
     Transcribe a single video
     
     Args:
-        video_bytes: Video file bytes
+        video_bytes: Video file bytes (unused when `audio` is given)
         language: Language code (vi, en, etc.)
         translate_to_english: Whether to translate to English
         model_size: Model size for Whisper (tiny, base, small, medium, large)
+        on_segment: Optional callback(segment) (sync or async), called on the
+                    event loop as segments are decoded
+        is_cancelled: Optional thread-safe callable() -> bool; checked per decoded
+                      segment, so engines that stream segments stop early
+        audio: Optional decoded 16 kHz mono float32 audio (see audio_cache); used
+               instead of video_bytes if the engine has transcribe_audio
+        question_index: Optional question number, used in profile names (`transcribe_Q1_...`)
     
     Returns:
         {
             'success': bool,
             'transcript': str,
             'confidence': float,
-            'error': str (if failed)
+            'segments': [{'start', 'end', 'text', 'avg_logprob', 'no_speech_prob'}, ...],
+            'error': str (if failed),
+            'cancelled': True (only if aborted via is_cancelled)
         }
     """
-    if not is_transcription_available():
+    if not await ensure_engine_loaded():
         return {
             'success': False,
             'transcript': '',
@@ -114,15 +200,37 @@ async def transcribe_single_video(
             kwargs['translate_to_english'] = translate_to_english
         if sig_info['has_model_size']:
             kwargs['model_size'] = model_size
+        if (on_segment or is_cancelled) and sig_info['has_on_segment']:
+            # Engines run in a worker thread; hand segments back to the event loop
+            loop = asyncio.get_running_loop()
+            
+            def segment_bridge(segment):
+                if is_cancelled and is_cancelled():
+                    raise TranscriptionCancelled()
+                if on_segment:
+                    asyncio.run_coroutine_threadsafe(_safe_callback(on_segment, segment), loop)
+            
+            kwargs['on_segment'] = segment_bridge
         
         # Run transcription in thread pool (non-blocking)
+        # (profiled with cProfile inside the worker thread when sampled)
+        func, media = TRANSCRIBE_FUNC, video_bytes
+        if audio is not None and TRANSCRIBE_AUDIO_FUNC is not None:
+            func, media = TRANSCRIBE_AUDIO_FUNC, audio
         result = await asyncio.to_thread(
-            TRANSCRIBE_FUNC,
-            video_bytes,
+            run_profiled,
+            f"transcribe_Q{question_index}" if question_index is not None else 'transcribe',
+            func,
+            media,
             **kwargs
         )
         
+        # Engines may report the abort as a plain error
+        if is_cancelled and is_cancelled():
+            return cancelled_result()
         return result
+    except TranscriptionCancelled:
+        return cancelled_result()
     except Exception as e:
         print(f"⚠️  Transcription error: {e}")
         return {
@@ -133,22 +241,82 @@ async def transcribe_single_video(
         }
 
 
+async def _transcribe_long_clip_if_needed(
+    video_path: str,
+    language: str,
+    translate_to_english: bool,
+    model_size: str,
+    on_segment=None,
+    is_cancelled=None,
+    audio=None,
+    audio_path=None
+) -> Tuple[Optional[Dict], Optional[object]]:
+    """
+    Long-clip mode: transcribe answers longer than LONG_CLIP_SECONDS as parallel
+    windows on the worker pool.
+    `audio`: already decoded audio (from the cache), else the duration is read
+    from the container and the video is only decoded when it is long, or when
+    the container has no duration.
+    `audio_path`: the cached .npy `audio` is mapped from (windows are not copied).
+
+    Returns (result, audio): result is None for short answers (or when disabled);
+    audio is the decoded array if there is one, so the engine does not decode again.
+    """
+    if config.LONG_CLIP_SECONDS <= 0 or not await ensure_engine_loaded():
+        return None, audio
+    
+    if audio is None:
+        duration = await asyncio.to_thread(probe_duration, video_path)
+        if duration is not None and duration <= config.LONG_CLIP_SECONDS:
+            return None, None
+        audio = await asyncio.to_thread(decode_audio, video_path)
+    duration = len(audio) / SAMPLE_RATE
+    if duration <= config.LONG_CLIP_SECONDS:
+        return None, audio
+    
+    print(f"✂️  Long clip ({duration:.0f}s): transcribing ~{config.LONG_CLIP_WINDOW_SECONDS:.0f}s windows in parallel...")
+    return await transcribe_long_clip(
+        audio,
+        TRANSCRIBE_ENGINE_KEY,
+        language if language else None,
+        model_size,
+        translate_to_english=translate_to_english,
+        on_segment=on_segment,
+        is_cancelled=is_cancelled,
+        audio_path=audio_path
+    ), audio
+
+
 async def transcribe_batch_videos(
     video_files: list[Tuple[int, str]],
     language: str = "en",
     translate_to_english: bool = False,
     model_size: str = "medium",
-    on_progress=None
+    on_progress=None,
+    on_segment=None,
+    on_start=None,
+    is_cancelled=None,
+    detect_language_once: bool = False,
+    on_language=None
 ) -> Dict[int, Dict]:
     """
     Transcribe multiple videos
     
     Args:
         video_files: List of (question_index, video_path) tuples
-        language: Language code
+        language: Language code (None = detect per answer)
         translate_to_english: Whether to translate
         model_size: Model size for Whisper
-        on_progress: Callback function(question_index, success, transcript, error)
+        on_progress: Callback function(question_index, success, transcript, error, result)
+        on_segment: Callback function(question_index, segment) for partial results
+        on_start: Callback function(question_index) before a video is read
+        is_cancelled: Thread-safe function(question_index) -> bool; a cancelled
+                      question stops early and reports {'cancelled': True}
+        detect_language_once: With language=None, detect the language on answers until
+                      one is confident (see language_is_confident), then pass it
+                      explicitly for the remaining answers
+        on_language: Callback function(question_index, language, probability) when
+                      the session language is detected
     
     Returns:
         {
@@ -172,25 +340,82 @@ async def transcribe_batch_videos(
                     'error': error
                 }
                 if on_progress:
-                    await _safe_callback(on_progress, question_index, False, '', error)
+                    await _safe_callback(on_progress, question_index, False, '', error, results[question_index])
                 continue
             
-            # Read video file
-            with open(video_path, 'rb') as f:
-                video_bytes = f.read()
+            segment_callback = None
+            if on_segment:
+                async def segment_callback(segment, q=question_index):
+                    await _safe_callback(on_segment, q, segment)
             
-            # Transcribe
-            print(f"🔄 Transcribing Q{question_index}...")
-            result = await transcribe_single_video(
-                video_bytes,
-                language=language,
-                translate_to_english=translate_to_english,
-                model_size=model_size
-            )
+            cancel_check = None
+            if is_cancelled:
+                cancel_check = lambda q=question_index: is_cancelled(q)
+            
+            if on_start:
+                await _safe_callback(on_start, question_index)
+            
+            result = None
+            if cancel_check and cancel_check():
+                result = cancelled_result()
+            
+            # Decoded audio from earlier runs (retries, upgrades, ...), else decoded once now
+            audio, audio_info = None, {}
+            if result is None and audio_cache.enabled() and await ensure_engine_loaded() \
+                    and (TRANSCRIBE_AUDIO_FUNC is not None or config.LONG_CLIP_SECONDS > 0):
+                try:
+                    audio, audio_info = await asyncio.to_thread(audio_cache.load_audio, video_path)
+                except RuntimeError as e:
+                    print(f"⚠️  Q{question_index}: decoded-audio cache skipped ({e})")
+            
+            # Long answers are split and transcribed in parallel (long-clip mode)
+            if result is None:
+                result, audio = await _transcribe_long_clip_if_needed(
+                    video_path, language, translate_to_english, model_size, segment_callback, cancel_check,
+                    audio, audio_info.get('path')
+                )
+            
+            if result is None and audio is not None and TRANSCRIBE_AUDIO_FUNC is not None:
+                print(f"🔄 Transcribing Q{question_index} (decoded audio)...")
+                result = await transcribe_single_video(
+                    None,
+                    language=language,
+                    translate_to_english=translate_to_english,
+                    model_size=model_size,
+                    on_segment=segment_callback,
+                    is_cancelled=cancel_check,
+                    audio=audio,
+                    question_index=question_index
+                )
+            
+            if result is None:
+                # Read video file (off the event loop)
+                async with aiofiles.open(video_path, 'rb') as f:
+                    video_bytes = await f.read()
+                
+                # Transcribe
+                print(f"🔄 Transcribing Q{question_index}...")
+                result = await transcribe_single_video(
+                    video_bytes,
+                    language=language,
+                    translate_to_english=translate_to_english,
+                    model_size=model_size,
+                    on_segment=segment_callback,
+                    is_cancelled=cancel_check,
+                    question_index=question_index
+                )
             
             results[question_index] = result
             
-            if result['success']:
+            if detect_language_once and not language and language_is_confident(result):
+                language = result['language']
+                print(f"🌐 Session language: {language} (from Q{question_index}, p={result.get('language_probability')})")
+                if on_language:
+                    await _safe_callback(on_language, question_index, language, result.get('language_probability'))
+            
+            if result.get('cancelled'):
+                print(f"⏹️  Q{question_index} cancelled (superseded by a newer upload, or shutdown)")
+            elif result['success']:
                 print(f"✅ Q{question_index} transcribed successfully")
             else:
                 print(f"⚠️  Q{question_index} transcription failed: {result.get('error')}")
@@ -201,7 +426,8 @@ async def transcribe_batch_videos(
                     question_index,
                     result['success'],
                     result.get('transcript', ''),
-                    result.get('error', '')
+                    result.get('error', ''),
+                    result
                 )
         
         except Exception as e:
@@ -213,21 +439,27 @@ async def transcribe_batch_videos(
                 'error': str(e)
             }
             if on_progress:
-                await _safe_callback(on_progress, question_index, False, '', str(e))
+                await _safe_callback(on_progress, question_index, False, '', str(e), results[question_index])
     
     return results
 
 
+def language_is_confident(result: Dict) -> bool:
+    """Whether a result's detected language can be reused for the other answers of the session"""
+    if not result.get('success') or not result.get('language'):
+        return False
+    return (
+        (result.get('language_probability') or 0.0) >= config.LANGUAGE_DETECT_MIN_PROBABILITY
+        and speech_seconds(result.get('segments') or []) >= config.LANGUAGE_DETECT_MIN_SPEECH_SECONDS
+    )
+
+
 async def _safe_callback(callback, *args):
     """Call callback safely (handle both sync and async)"""
     try:
-        if inspect.iscoroutinefunction(callback):
-            await callback(*args)
-        else:
-            callback(*args)
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            await result
     except Exception as e:
         print(f"⚠️  Callback error: {e}")
 
-
-# Initialize on import
-_init_transcription_engine()
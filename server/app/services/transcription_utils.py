@@ -0,0 +1,49 @@
+"""
+Helpers shared by the transcription engines (kept free of heavy imports)
+"""
+
+from typing import Dict, List
+
+
+def confidence_from_logprobs(logprobs: List[float], default: float = 0.85) -> float:
+    """
+    Whisper does not provide direct confidence scores; approximate one from the
+    average logprob of ALL segments (not just the first).
+
+    logprob typically ranges from -1.0 (poor) to 0.0 (good)
+    Normalize: (-1.0 -> 0.0), (-0.5 -> 0.5), (0.0 -> 1.0)
+    """
+    if not logprobs:
+        return default  # Default if no segments / no logprob available
+    avg_logprob = sum(logprobs) / len(logprobs)
+    return min(1.0, max(0.0, (avg_logprob + 1.0)))
+
+
+def compact_segment(start: float, end: float, text: str, avg_logprob: float, no_speech_prob: float) -> Dict:
+    """Segment fields kept per answer, rounded to keep stored segments small"""
+    return {
+        'start': round(float(start), 2),
+        'end': round(float(end), 2),
+        'text': text.strip(),
+        'avg_logprob': round(float(avg_logprob), 3),
+        'no_speech_prob': round(float(no_speech_prob), 3),
+    }
+
+
+def speech_seconds(segments: List[Dict], max_no_speech_prob: float = 0.6) -> float:
+    """Seconds covered by segments that are likely speech"""
+    return sum(
+        seg['end'] - seg['start'] for seg in segments
+        if seg.get('no_speech_prob', 0.0) < max_no_speech_prob
+    )
+
+
+def cancelled_result() -> Dict:
+    """Result of a transcription aborted because a newer upload superseded it"""
+    return {
+        'success': False,
+        'cancelled': True,
+        'transcript': '',
+        'confidence': 0.0,
+        'error': 'Cancelled: superseded by a newer upload'
+    }
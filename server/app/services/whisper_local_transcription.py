@@ -12,6 +12,61 @@ except ImportError:
     print("   Install with: pip install openai-whisper")
 
 import io
+from app.core import config
+from app.services.transcription_utils import confidence_from_logprobs, compact_segment
+
+INT8_SUFFIX = "-int8"
+
+
+def parse_model_variant(model_size: str) -> tuple[str, bool]:
+    """Split a model variant like "medium-int8" into ("medium", True)"""
+    if model_size.endswith(INT8_SUFFIX):
+        return model_size[:-len(INT8_SUFFIX)], True
+    return model_size, False
+
+
+def _quantized_model_path(base_size: str) -> str:
+    return os.path.join(config.WHISPER_CACHE_DIR, f"{base_size}{INT8_SUFFIX}-dynamic.pt")
+
+
+def _load_quantized_model(base_size: str):
+    """
+    Load a dynamically int8-quantized copy of a Whisper model for CPU inference.
+
+    Linear layers (most of the weights and decoding time) are quantized with
+    torch `quantize_dynamic`. The result is produced once and cached on disk,
+    later loads just unpickle it.
+    """
+    import torch
+
+    cache_path = _quantized_model_path(base_size)
+    if os.path.exists(cache_path):
+        try:
+            return torch.load(cache_path, map_location="cpu", weights_only=False)
+        except Exception as e:
+            print(f"⚠️  Cached quantized model unreadable ({e}), rebuilding...")
+
+    print(f"🔧 Quantizing Whisper {base_size} to int8 (first time only)...")
+    model = whisper.load_model(base_size, device="cpu")
+    # whisper.model.Linear only subclasses nn.Linear to cast dtypes, which is a no-op
+    # in fp32 on CPU; quantize_dynamic matches exact types, so reset the class first
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+
+    try:
+        os.makedirs(config.WHISPER_CACHE_DIR, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        torch.save(model, temp_path)
+        os.replace(temp_path, cache_path)
+        print(f"💾 Cached quantized model at {cache_path}")
+    except Exception as e:
+        print(f"⚠️  Could not cache quantized model: {e}")
+
+    return model
+
 
 def get_whisper_model(model_size: str = "medium"):
     """
@@ -22,6 +77,8 @@ def get_whisper_model(model_size: str = "medium"):
     - small: ~244M params, better quality
     - medium: ~769M params, high quality (recommended for best accuracy)
     - large: ~1550M params, best quality, slowest
+    Append "-int8" (e.g. "medium-int8") for a dynamically quantized CPU variant:
+    roughly half the memory and faster decoding, cached on disk after the first load.
     """
     if not WHISPER_AVAILABLE:
         return None
@@ -33,7 +90,11 @@ def get_whisper_model(model_size: str = "medium"):
     if model_size not in get_whisper_model._model_cache:
         try:
             print(f"📥 Loading Whisper model: {model_size} (first time only, may take a moment)...")
-            model = whisper.load_model(model_size)
+            base_size, quantized = parse_model_variant(model_size)
+            if quantized:
+                model = _load_quantized_model(base_size)
+            else:
+                model = whisper.load_model(model_size)
             # Log some internals of the loaded model to help debug model selection
             try:
                 device = getattr(model, 'device', None)
@@ -80,7 +141,75 @@ def extract_audio_from_video(video_path: str, output_audio_path: str) -> bool:
         print(f"⚠️  Error extracting audio: {e}")
         return False
 
-def transcribe_video(video_bytes: bytes, language: str = "en", model_size: str = "medium", translate_to_english: bool = False) -> dict:
+def _detect_language(model, audio) -> tuple[str, float]:
+    """Most likely language of the first 30 s of a 16 kHz array and its probability (what transcribe() does internally)"""
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels).to(model.device)
+    _, probs = model.detect_language(mel)
+    detected = max(probs, key=probs.get)
+    return detected, float(probs[detected])
+
+
+def _run_whisper(model, audio, language, model_size, translate_to_english, on_segment) -> dict:
+    """Run Whisper on an audio file path or a 16 kHz mono float32 array"""
+    if isinstance(audio, str):
+        # Decode once for both language detection and transcribe()
+        audio = whisper.load_audio(audio)
+    language_probability = 1.0
+    if not language:
+        # Detect up front to report the probability (transcribe() would detect anyway)
+        try:
+            language, language_probability = _detect_language(model, audio)
+            print(f"🌐 Detected language: {language} ({language_probability:.2f})")
+        except Exception as e:
+            print(f"⚠️  Language detection failed ({e}), letting Whisper detect it")
+            language, language_probability = None, 0.0
+    # Transcribe using Whisper
+    task = "translate" if translate_to_english else "transcribe"
+    task_text = "Translating to English" if translate_to_english else "Transcribing"
+    print(f"🔄 {task_text} with Whisper {model_size}...")
+
+    result = model.transcribe(
+        audio,
+        language=language or None,  # None = auto-detect; source language when translating
+        task=task,  # "transcribe" or "translate" (translate = translate to English)
+        verbose=False,  # Do not print progress
+        fp16=False,  # Use float32 for better CPU compatibility
+        condition_on_previous_text=True,  # Improves accuracy with context
+        initial_prompt=None,  # Can be added to improve results
+        word_timestamps=False,  # Not needed; saves time
+        temperature=0.0  # Deterministic output, better for transcription
+    )
+    
+    transcript_text = result["text"].strip()
+
+    segments = [
+        compact_segment(seg["start"], seg["end"], seg["text"],
+                        seg.get("avg_logprob", -1.0), seg.get("no_speech_prob", 0.0))
+        for seg in result.get("segments", [])
+    ]
+    if on_segment:
+        for segment in segments:
+            on_segment(segment)
+
+    # Whisper does not provide direct confidence scores
+    # Approximate from the average logprob of all segments
+    confidence = confidence_from_logprobs([seg['avg_logprob'] for seg in segments])
+    
+    detected_language = result.get("language", language)
+    
+    return {
+        'success': True,
+        'transcript': transcript_text,
+        'confidence': confidence,
+        'error': None,
+        'language': detected_language,
+        'language_probability': round(language_probability, 3),
+        'model': model_size,
+        'segments': segments
+    }
+
+
+def transcribe_video(video_bytes: bytes, language: str = "en", model_size: str = "medium", translate_to_english: bool = False, on_segment=None) -> dict:
     """
     Transcribe video using Whisper local (FREE!).
 
@@ -88,12 +217,18 @@ def transcribe_video(video_bytes: bytes, language: str = "en", model_size: str =
         video_bytes: Video file bytes (WebM format)
         language: Language code (default: "en" for English)
                   Can be: "vi", "en", "ja", "ko", "zh", etc.
-                  Or None to auto-detect
+                  Or None to auto-detect (also the source language when translating)
         model_size: Model size - "tiny", "base", "small", "medium", "large"
                     Default: "medium" (recommended for best accuracy)
+                    "<size>-int8" uses the dynamically quantized CPU variant
+        on_segment: Optional callback(segment) for each decoded segment.
+                    openai-whisper has no per-segment hook, so segments are
+                    published when the clip is done.
 
     Returns:
-        dict with keys: 'success', 'transcript', 'confidence', 'error'
+        dict with keys: 'success', 'transcript', 'confidence', 'error',
+        'language', 'language_probability', 'model',
+        'segments' (start, end, text, avg_logprob, no_speech_prob)
     """
     if not WHISPER_AVAILABLE:
         return {
@@ -133,52 +268,7 @@ def transcribe_video(video_bytes: bytes, language: str = "en", model_size: str =
                 'error': 'Failed to extract audio from video. Make sure ffmpeg is installed and in PATH.'
             }
         
-        # Transcribe using Whisper
-        task = "translate" if translate_to_english else "transcribe"
-        task_text = "Translating to English" if translate_to_english else "Transcribing"
-        print(f"🔄 {task_text} with Whisper {model_size}...")
-
-        result = model.transcribe(
-            temp_audio,
-            language=language if (language and not translate_to_english) else None,  # None = auto-detect, or skip if translating
-            task=task,  # "transcribe" or "translate" (translate = translate to English)
-            verbose=False,  # Do not print progress
-            fp16=False,  # Use float32 for better CPU compatibility
-            condition_on_previous_text=True,  # Improves accuracy with context
-            initial_prompt=None,  # Can be added to improve results
-            word_timestamps=False,  # Not needed; saves time
-            temperature=0.0  # Deterministic output, better for transcription
-        )
-        
-        transcript_text = result["text"].strip()
-
-        # Whisper does not provide direct confidence scores
-        # Calculate average logprob from ALL segments (not just the first)
-        segments = result.get("segments", [])
-        if segments:
-            # Get average logprob from all segments
-            logprobs = [seg.get("avg_logprob", -1.0) for seg in segments if "avg_logprob" in seg]
-            if logprobs:
-                avg_logprob = sum(logprobs) / len(logprobs)
-                # Convert logprob to approximate confidence (0-1 scale)
-                # logprob typically ranges from -1.0 (poor) to 0.0 (good)
-                # Normalize: (-1.0 -> 0.0), (-0.5 -> 0.5), (0.0 -> 1.0)
-                confidence = min(1.0, max(0.0, (avg_logprob + 1.0)))
-            else:
-                confidence = 0.85  # Default if no logprob available
-        else:
-            confidence = 0.85  # Default if no segments
-        
-        detected_language = result.get("language", language)
-        
-        return {
-            'success': True,
-            'transcript': transcript_text,
-            'confidence': confidence,
-            'error': None,
-            'language': detected_language,
-            'model': model_size
-        }
+        return _run_whisper(model, temp_audio, language, model_size, translate_to_english, on_segment)
         
     except Exception as e:
         error_msg = str(e)
@@ -201,3 +291,37 @@ def transcribe_video(video_bytes: bytes, language: str = "en", model_size: str =
             except:
                 pass
 
+
+
+
+def transcribe_audio(audio, language: str = "en", model_size: str = "medium", translate_to_english: bool = False, on_segment=None) -> dict:
+    """
+    Transcribe already-decoded audio (16 kHz mono float32 numpy array).
+
+    Used for windows of long answers (see long_clip); same result contract as transcribe_video.
+    """
+    if not WHISPER_AVAILABLE:
+        return {
+            'success': False,
+            'transcript': '',
+            'confidence': 0.0,
+            'error': 'whisper package not installed. Install with: pip install openai-whisper'
+        }
+    
+    try:
+        model = get_whisper_model(model_size)
+        if not model:
+            return {
+                'success': False,
+                'transcript': '',
+                'confidence': 0.0,
+                'error': 'Failed to load Whisper model'
+            }
+        return _run_whisper(model, audio, language, model_size, translate_to_english, on_segment)
+    except Exception as e:
+        return {
+            'success': False,
+            'transcript': '',
+            'confidence': 0.0,
+            'error': f'Transcription error: {str(e)}'
+        }
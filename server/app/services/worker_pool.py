@@ -0,0 +1,60 @@
+"""
+Process pool for CPU-bound transcription work
+
+Whisper models are not safe to share between concurrent calls (openai-whisper
+installs kv-cache hooks on the shared modules), so each worker process loads its
+own model copy on first use. Workers are spawned (not forked) so they do not
+inherit the event loop and server threads.
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core import config
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def worker_count() -> int:
+    """TRANSCRIBE_WORKERS, or half the cores when unset (0)"""
+    if config.TRANSCRIBE_WORKERS > 0:
+        return config.TRANSCRIBE_WORKERS
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def _init_worker(threads: int):
+    # Split the cores between workers instead of every worker using all of them
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['MKL_NUM_THREADS'] = str(threads)
+    config.FASTER_WHISPER_CPU_THREADS = threads
+
+
+def create_pool(workers: int) -> ProcessPoolExecutor:
+    """Spawned worker processes sharing the cores (also used by offline scripts)"""
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(threads,)
+    )
+    print(f"🧵 Started transcription worker pool: {workers} process(es) x {threads} thread(s)")
+    return pool
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Create the worker pool on first use"""
+    global _pool
+    if _pool is None:
+        _pool = create_pool(worker_count())
+    return _pool
+
+
+def shutdown_pool(wait: bool = True, cancel_futures: bool = True):
+    """Stop the pool; queued windows are dropped unless cancel_futures is False"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+        _pool = None
@@ -0,0 +1,198 @@
+"""
+Blob backends for session files
+
+Transcription always works on local files (ffmpeg and the engines need paths), so
+the local session folder is the working copy. With STORAGE_BACKEND=s3 finished
+sessions are pushed to an S3-compatible bucket (AWS S3, or MinIO via
+S3_ENDPOINT_URL), and nodes that do not share the uploads volume (e.g.
+transcription workers) pull a session before using it.
+
+Keys are session-relative: "<folder>/<file name>", independent of the local layout.
+"""
+
+import os
+import shutil
+from typing import List
+
+from app.core import config
+from app.storage.file_manager import session_path
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+
+
+class BlobBackend:
+    """Minimal object-store interface used by the storage layer"""
+
+    name = "base"
+
+    def put_file(self, key: str, local_path: str):
+        raise NotImplementedError
+
+    def get_file(self, key: str, local_path: str) -> bool:
+        """Download `key` to `local_path`; False if it does not exist"""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def list_keys(self, prefix: str = "") -> List[str]:
+        raise NotImplementedError
+
+
+class LocalFSBackend(BlobBackend):
+    """Blobs stored as files under the session folders themselves (the default: nothing to sync)"""
+
+    name = "local"
+
+    def _path(self, key: str) -> str:
+        folder, _, name = key.partition('/')
+        if not folder or not name or os.path.basename(name) != name:
+            raise ValueError(f"Invalid blob key: {key}")
+        return os.path.join(session_path(folder), name)
+
+    def put_file(self, key: str, local_path: str):
+        path = self._path(key)
+        if os.path.abspath(local_path) != os.path.abspath(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(local_path, path)
+
+    def get_file(self, key: str, local_path: str) -> bool:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return False
+        if os.path.abspath(local_path) != os.path.abspath(path):
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            shutil.copyfile(path, local_path)
+        return True
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def list_keys(self, prefix: str = "") -> List[str]:
+        folder = prefix.split('/', 1)[0]
+        if not folder:
+            raise ValueError("LocalFSBackend lists one session at a time")
+        path = session_path(folder)
+        if not os.path.isdir(path):
+            return []
+        keys = [f"{folder}/{name}" for name in sorted(os.listdir(path))
+                if os.path.isfile(os.path.join(path, name))]
+        return [key for key in keys if key.startswith(prefix)]
+
+
+class S3Backend(BlobBackend):
+    """S3-compatible bucket (set endpoint_url for MinIO or another S3 stand-in)"""
+
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str = "", region: str = "us-east-1"):
+        if not BOTO3_AVAILABLE:
+            raise RuntimeError("boto3 is not installed. Install it with: pip install boto3")
+        if not bucket:
+            raise RuntimeError("S3_BUCKET is not set")
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.client = boto3.client('s3', endpoint_url=endpoint_url or None, region_name=region)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put_file(self, key: str, local_path: str):
+        self.client.upload_file(local_path, self.bucket, self._key(key))
+
+    def get_file(self, key: str, local_path: str) -> bool:
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        temp_path = f"{local_path}.part"
+        try:
+            self.client.download_file(self.bucket, self._key(key), temp_path)
+        except ClientError as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey'):
+                return False
+            raise
+        os.replace(temp_path, local_path)
+        return True
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey'):
+                return False
+            raise
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def list_keys(self, prefix: str = "") -> List[str]:
+        keys = []
+        strip = len(self._key(""))
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            keys.extend(obj['Key'][strip:] for obj in page.get('Contents', []))
+        return keys
+
+
+def get_backend() -> BlobBackend:
+    """Configured backend (cached)"""
+    if get_backend._backend is None:
+        if config.STORAGE_BACKEND == "s3":
+            get_backend._backend = S3Backend(
+                config.S3_BUCKET, config.S3_PREFIX, config.S3_ENDPOINT_URL, config.S3_REGION
+            )
+        else:
+            if config.STORAGE_BACKEND != "local":
+                print(f"⚠️  Unknown STORAGE_BACKEND '{config.STORAGE_BACKEND}', using local")
+            get_backend._backend = LocalFSBackend()
+    return get_backend._backend
+
+get_backend._backend = None
+
+
+def is_remote_backend() -> bool:
+    return config.STORAGE_BACKEND == "s3"
+
+
+def push_session(folder: str, backend: BlobBackend = None) -> int:
+    """Upload every file of a local session folder; returns the number of files pushed"""
+    backend = backend or get_backend()
+    path = session_path(folder)
+    if isinstance(backend, LocalFSBackend) or not os.path.isdir(path):
+        return 0
+    pushed = 0
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if os.path.isfile(file_path) and not name.endswith(('.tmp', '.part', '.lock')):
+            backend.put_file(f"{folder}/{name}", file_path)
+            pushed += 1
+    return pushed
+
+
+def pull_session(folder: str, backend: BlobBackend = None) -> int:
+    """Download the files of a session that are missing locally; returns the number fetched"""
+    backend = backend or get_backend()
+    if isinstance(backend, LocalFSBackend):
+        return 0
+    path = session_path(folder)
+    pulled = 0
+    for key in backend.list_keys(f"{folder}/"):
+        local_path = os.path.join(path, key.split('/', 1)[1])
+        if not os.path.exists(local_path) and backend.get_file(key, local_path):
+            pulled += 1
+    return pulled
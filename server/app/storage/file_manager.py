@@ -1,79 +1,468 @@
-import os, json, datetime
+import os, re, json, fnmatch, hashlib, datetime, threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: meta.json writers are only serialized within one process
+    fcntl = None
+
+from app.core import config
+from app.storage import meta_cache
 
 # safe uploads base path (store uploads inside the `server/` folder)
 # From this file (`server/app/storage/file_manager.py`) the path to
 # `server/uploads` is two levels up + 'uploads'.
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'uploads'))
 
+# Session folders are sharded under BASE so no directory grows unbounded:
+#   flat:   uploads/<folder>                    (original layout)
+#   hashed: uploads/<h[0:2]>/<h[2:4]>/<folder>  (h = sha1 of the folder name)
+#   date:   uploads/<YYYY>/<MM>/<DD>/<folder>   (from the DD_MM_YYYY_ folder prefix)
+# Folders that are still flat are found until `scripts/migrate_storage_layout.py` moves them.
+LAYOUTS = ('flat', 'hashed', 'date')
+
+# Uploads are streamed to disk in chunks of this size (never fully in memory)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+_DATE_PREFIX = re.compile(r'^(\d{2})_(\d{2})_(\d{4})_')
+
+# meta.json writers of this process, striped by path (a fixed set, so no per-session entries pile up)
+_META_LOCKS = [threading.RLock() for _ in range(64)]
+# meta.json paths whose lock the current thread holds (the lock is reentrant)
+_held_meta_locks = threading.local()
+
+
+def layout_path(folder, layout=None):
+    """Where `folder` lives in the given layout (default: config.STORAGE_LAYOUT)"""
+    layout = layout or config.STORAGE_LAYOUT
+    if layout == 'date':
+        match = _DATE_PREFIX.match(folder)
+        if match:
+            day, month, year = match.groups()
+            return os.path.join(BASE, year, month, day, folder)
+        layout = 'hashed'  # Folder names not made by make_folder_name
+    if layout == 'hashed':
+        digest = hashlib.sha1(folder.encode('utf-8')).hexdigest()
+        return os.path.join(BASE, digest[0:2], digest[2:4], folder)
+    return os.path.join(BASE, folder)
+
+
+def folder_date(folder):
+    """Session date from the DD_MM_YYYY_ folder prefix (None for other names)"""
+    match = _DATE_PREFIX.match(folder)
+    if not match:
+        return None
+    day, month, year = (int(part) for part in match.groups())
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def select_session_folders(pattern=None, since=None, until=None):
+    """Session folder names matching a glob and a date range (date from the folder name)"""
+    folders = []
+    for folder, _ in iter_session_paths():
+        if pattern and not fnmatch.fnmatch(folder, pattern):
+            continue
+        if since or until:
+            day = folder_date(folder)
+            if day is None or (since and day < since) or (until and day > until):
+                continue
+        folders.append(folder)
+    return sorted(folders)
+
+
+def check_folder_name(folder):
+    """Raise ValueError unless `folder` is a plain session folder name that stays under BASE"""
+    if not folder or '..' in folder or '\0' in folder or '/' in folder or '\\' in folder \
+            or (os.altsep and os.altsep in folder):
+        raise ValueError(f"Invalid session folder: {folder!r}")
+    base = os.path.realpath(BASE)
+    if not os.path.realpath(layout_path(folder)).startswith(base + os.sep):
+        raise ValueError(f"Invalid session folder: {folder!r}")
+
+
+def session_path(folder):
+    """Directory of an existing (or new) session: the configured layout, else a legacy flat folder"""
+    path = layout_path(folder)
+    if not os.path.isdir(path):
+        flat = os.path.join(BASE, folder)
+        if os.path.isfile(os.path.join(flat, 'meta.json')):
+            return flat
+    return path
+
+
+def _subdirs(path):
+    try:
+        with os.scandir(path) as entries:
+            # Dot-directories hold caches (e.g. .audio_cache), never sessions
+            return sorted(entry.path for entry in entries if entry.is_dir() and not entry.name.startswith('.'))
+    except FileNotFoundError:
+        return []
+
+
+def iter_session_paths(layout=None):
+    """Yield (folder, path) of every session, shard by shard (never lists one huge directory)"""
+    layout = layout or config.STORAGE_LAYOUT
+    depth = {'flat': 0, 'hashed': 2, 'date': 3}[layout]
+    seen = set()
+
+    # Legacy flat folders (and everything, in the flat layout)
+    for path in _subdirs(BASE):
+        if os.path.isfile(os.path.join(path, 'meta.json')):
+            seen.add(path)
+            yield os.path.basename(path), path
+
+    shards = [BASE]
+    for _ in range(depth):
+        shards = [sub for shard in shards for sub in _subdirs(shard)]
+    if layout == 'date':
+        # Folder names without a date prefix fall back to hashed shards
+        shards += [sub for shard in _subdirs(BASE) for sub in _subdirs(shard) if len(os.path.basename(shard)) == 2]
+    for shard in shards:
+        for path in _subdirs(shard):
+            if path not in seen and os.path.isfile(os.path.join(path, 'meta.json')):
+                seen.add(path)
+                yield os.path.basename(path), path
+
+
 def ensure_session_folder(folder):
-    path = os.path.join(BASE, folder)
+    path = layout_path(folder)
     os.makedirs(path, exist_ok=True)
     meta = {"userName": folder.split('_')[-1], "uploadedAt": None, "timeZone": "Asia/Bangkok", "receivedQuestions": []}
-    with open(os.path.join(path, 'meta.json'), 'w') as f:
+    meta_path = os.path.join(path, 'meta.json')
+    with _meta_lock(meta_path):
+        _write_meta(meta_path, meta)
+
+@contextmanager
+def _meta_lock(meta_path):
+    """
+    Exclusive access to a meta.json: threads of this process, then other processes
+    (API, workers, scripts). Reentrant within a thread.
+    """
+    held = _held_meta_locks.__dict__.setdefault('paths', set())
+    if meta_path in held:
+        yield
+        return
+    with _META_LOCKS[hash(meta_path) % len(_META_LOCKS)]:
+        held.add(meta_path)
+        try:
+            if fcntl is None:
+                yield
+                return
+            with open(meta_path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            held.discard(meta_path)
+
+def answer_lock(path):
+    """
+    Lock of the session a file belongs to (its meta.json lock). Held while an
+    answer or one of its renditions is replaced, so compaction never moves an
+    encode of an old take over a retake.
+    """
+    return _meta_lock(os.path.join(os.path.dirname(path), 'meta.json'))
+
+def _store_take(folder, index, temp_path, fname):
+    """Move a new take into place and drop the audio rendition of the previous one"""
+    rendition = os.path.join(os.path.dirname(fname), f"Q{index}.opus")
+    with answer_lock(fname):
+        os.replace(temp_path, fname)
+        if os.path.exists(rendition):
+            os.remove(rendition)
+    # Also from the blob backend, or media playback would fetch it back
+    from app.storage.blob_backend import is_remote_backend, get_backend
+    if is_remote_backend():
+        try:
+            get_backend().delete(f"{folder}/Q{index}.opus")
+        except Exception as e:
+            print(f"⚠️  Could not delete the old audio rendition of {folder} Q{index}: {e}")
+
+def _write_meta(meta_path, meta):
+    """Replace meta.json atomically (readers never see a half-written file)"""
+    temp_path = meta_path + '.tmp'
+    with open(temp_path, 'w') as f:
         json.dump(meta, f)
+    os.replace(temp_path, meta_path)
+    meta_cache.invalidate(meta_path)
+
+def modify_metadata(folder, change):
+    """
+    Read-modify-write a session's meta.json under its lock.
+
+    Every meta.json writer goes through here so concurrent updates (upload,
+    transcription results, language detection, compaction) never drop each
+    other's keys. `change(meta)` edits the dict in place.
+
+    Returns the updated meta, or None if the session has no meta.json.
+    """
+    meta_path = os.path.join(session_path(folder), 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with _meta_lock(meta_path):
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        change(meta)
+        _write_meta(meta_path, meta)
+    return meta
 
 def save_question_file(folder, index, content_bytes):
-    path = os.path.join(BASE, folder)
+    path = session_path(folder)
     if not os.path.exists(path):
         raise FileNotFoundError("Session folder not found")
     fname = os.path.join(path, f"Q{index}.webm")
     with open(fname, 'wb') as f:
         f.write(content_bytes)
 
-def update_metadata(folder, index, transcript=None, confidence=None):
-    path = os.path.join(BASE, folder)
-    meta_path = os.path.join(path, 'meta.json')
+class QuestionUpload:
+    """
+    An answer written to `Q{index}.webm` as it is received, hashed on the way.
+
+    The data goes to a temp file that only replaces the answer if its SHA-256
+    differs from the stored one, so a client retrying with the same blob costs
+    no rewrite and keeps the existing transcript. Call write() per chunk, then
+    finish(); abort() drops the temp file.
+    """
+
+    def __init__(self, folder, index):
+        path = session_path(folder)
+        if not os.path.exists(path):
+            raise FileNotFoundError("Session folder not found")
+        self.folder = folder
+        self.index = index
+        self.fname = os.path.join(path, f"Q{index}.webm")
+        self.temp_path = f"{self.fname}.part"
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._file = open(self.temp_path, 'wb')
+
+    def write(self, chunk):
+        self._digest.update(chunk)
+        self.size += len(chunk)
+        self._file.write(chunk)
+
+    def finish(self):
+        """
+        Returns:
+            {"sha256": "...", "size": 123456, "unchanged": false}
+        """
+        try:
+            self._file.close()
+            sha256 = self._digest.hexdigest()
+            stored = get_checksum(self.folder, self.index)
+            if stored and stored.get('sha256') == sha256 and os.path.exists(self.fname):
+                os.remove(self.temp_path)
+                return {"sha256": sha256, "size": self.size, "unchanged": True}
+            _store_take(self.folder, self.index, self.temp_path, self.fname)
+        except BaseException:
+            self.abort()
+            raise
+        return {"sha256": sha256, "size": self.size, "unchanged": False}
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+def save_question_stream(folder, index, fileobj, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Stream a file object into `Q{index}.webm`, hashing it on the way (see QuestionUpload).
+
+    Returns:
+        {"sha256": "...", "size": 123456, "unchanged": false}
+    """
+    upload = QuestionUpload(folder, index)
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            upload.write(chunk)
+    except BaseException:
+        upload.abort()
+        raise
+    return upload.finish()
+
+def _live_paths(folder, index):
+    """Growing file of a live (chunked) upload, and its {seq, size} state"""
+    root = os.path.join(session_path(folder), f"Q{index}.live")
+    return root + '.part', root + '.tmp'
+
+
+def append_question_chunk(folder, index, seq, data):
+    """
+    Append chunk `seq` of a live upload (chunks are numbered from 0; seq 0 starts a
+    new take). A chunk that was already appended (client retry) is ignored.
+
+    Raises FileNotFoundError if the session does not exist and ValueError on a
+    gap in the sequence.
+
+    Returns:
+        {"seq": 4, "size": 123456, "appended": true}   # seq: next expected chunk
+    """
+    path = session_path(folder)
+    if not os.path.exists(path):
+        raise FileNotFoundError("Session folder not found")
+    data_path, state_path = _live_paths(folder, index)
+
+    state = {"seq": 0, "size": 0}
+    if seq > 0 and os.path.exists(state_path):
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+    if seq < state["seq"]:
+        return {**state, "appended": False}
+    if seq > state["seq"]:
+        raise ValueError(f"Expected chunk {state['seq']}, got {seq}")
+
+    with open(data_path, 'wb' if seq == 0 else 'r+b') as f:
+        # Drop bytes of a chunk whose append was interrupted before the state was saved
+        f.truncate(state["size"])
+        f.seek(state["size"])
+        f.write(data)
+    state = {"seq": seq + 1, "size": state["size"] + len(data)}
+    with open(state_path + '.new', 'w') as f:
+        json.dump(state, f)
+    os.replace(state_path + '.new', state_path)
+    return {**state, "appended": True}
+
+
+def finish_question_chunks(folder, index, chunks, sha256=None):
+    """
+    Move a complete live upload (`chunks` chunks) into `Q{index}.webm`, like
+    save_question_stream. `sha256` (client digest of the whole answer) is checked
+    when given.
+
+    Raises FileNotFoundError if there is no live upload and ValueError if it is
+    incomplete or does not match the digest.
+
+    Returns:
+        {"sha256": "...", "size": 123456, "unchanged": false}
+    """
+    data_path, state_path = _live_paths(folder, index)
+    if not os.path.exists(state_path):
+        raise FileNotFoundError(f"No live upload for question {index}")
+    with open(state_path, 'r') as f:
+        state = json.load(f)
+    if state["seq"] != chunks:
+        raise ValueError(f"Received {state['seq']} of {chunks} chunks")
+
+    digest = hashlib.sha256()
+    with open(data_path, 'r+b') as f:
+        f.truncate(state["size"])  # Bytes of an interrupted append
+        while True:
+            chunk = f.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    if sha256 and digest.hexdigest() != sha256:
+        raise ValueError("Checksum mismatch")
+
+    fname = os.path.join(session_path(folder), f"Q{index}.webm")
+    stored = get_checksum(folder, index)
+    unchanged = bool(stored and stored.get('sha256') == digest.hexdigest() and os.path.exists(fname))
+    if unchanged:
+        os.remove(data_path)
+    else:
+        _store_take(folder, index, data_path, fname)
+    os.remove(state_path)
+    return {"sha256": digest.hexdigest(), "size": state["size"], "unchanged": unchanged}
+
+
+def get_checksum(folder, index):
+    """Stored checksum of an answer ({sha256, size}) or None"""
+    meta_path = os.path.join(session_path(folder), 'meta.json')
     if not os.path.exists(meta_path):
-        return
+        return None
     with open(meta_path, 'r') as f:
         meta = json.load(f)
-    meta['uploadedAt'] = datetime.datetime.now().isoformat()
-    if index not in meta.get('receivedQuestions', []):
-        meta.setdefault('receivedQuestions', []).append(index)
+    return meta.get('checksums', {}).get(str(index))
+
+def update_metadata(folder, index, transcript=None, confidence=None, model=None, language=None, segments_count=None, checksum=None, source_sha256=None, upgrade_to=None):
+    def change(meta):
+        meta['uploadedAt'] = datetime.datetime.now().isoformat()
+        if index not in meta.get('receivedQuestions', []):
+            meta.setdefault('receivedQuestions', []).append(index)
+        if checksum is not None:
+            # {sha256, size} of the stored Q{index}.webm
+            meta.setdefault('checksums', {})[str(index)] = checksum
+
+        # Lưu transcript nếu có
+        if transcript is not None:
+            if 'transcripts' not in meta:
+                meta['transcripts'] = {}
+            previous = meta['transcripts'].get(str(index))
+            meta['transcripts'][str(index)] = {
+                'text': transcript,
+                'confidence': confidence,
+                'createdAt': datetime.datetime.now().isoformat()
+            }
+            if model is not None:
+                meta['transcripts'][str(index)]['model'] = model
+            if language is not None:
+                meta['transcripts'][str(index)]['language'] = language
+            if segments_count is not None:
+                # Segments live in Q{index}.segments.jsonl (see segment_store)
+                meta['transcripts'][str(index)]['segmentsCount'] = segments_count
+            if source_sha256 is not None:
+                # Checksum of the Q{index}.webm this transcript was made from
+                meta['transcripts'][str(index)]['sourceSha256'] = source_sha256
+            if upgrade_to is not None:
+                # Transcribed with a fallback model; re-transcribed with this one when idle
+                meta['transcripts'][str(index)]['upgradeTo'] = upgrade_to
+            if previous and config.TRANSCRIPT_VERSIONS_KEPT > 0:
+                # Keep earlier transcripts (newest first), e.g. the fallback-model one after an upgrade
+                versions = previous.pop('versions', [])
+                versions.insert(0, {k: previous[k] for k in ('text', 'confidence', 'model', 'createdAt', 'sourceSha256') if k in previous})
+                meta['transcripts'][str(index)]['versions'] = versions[:config.TRANSCRIPT_VERSIONS_KEPT]
+
+            # Tự động tạo file transcripts.txt trong folder uploads
+            _create_transcripts_file(folder, meta)
+
+    modify_metadata(folder, change)
+
+def render_transcripts_file(folder, meta):
+    """Nội dung file transcripts.txt (None nếu chưa có transcript); shared with scripts/create_transcripts_file.py"""
+    transcripts = meta.get('transcripts', {})
+    userName = meta.get('userName', folder.split('_')[-1] if '_' in folder else folder)
     
-    # Lưu transcript nếu có
-    if transcript is not None:
-        if 'transcripts' not in meta:
-            meta['transcripts'] = {}
-        meta['transcripts'][str(index)] = {
-            'text': transcript,
-            'confidence': confidence,
-            'createdAt': datetime.datetime.now().isoformat()
-        }
-        
-        # Tự động tạo file transcripts.txt trong folder uploads
-        _create_transcripts_file(folder, meta)
+    if not transcripts:
+        return None
     
-    with open(meta_path, 'w') as f:
-        json.dump(meta, f)
+    lines = [
+        f"Interview Transcripts - {userName}\n",
+        f"Folder: {folder}\n",
+        f"Date: {meta.get('uploadedAt', 'N/A')}\n",
+        "=" * 60 + "\n\n",
+    ]
+    
+    # Sắp xếp theo thứ tự câu hỏi
+    for q_idx in sorted(transcripts.keys(), key=int):
+        transcript_data = transcripts[q_idx]
+        lines.append(f"Question {q_idx}:\n")
+        lines.append("-" * 60 + "\n")
+        lines.append(f"{transcript_data['text']}\n")
+        lines.append(f"\nConfidence: {transcript_data.get('confidence', 0):.2%}\n")
+        lines.append(f"Created: {transcript_data.get('createdAt', 'N/A')}\n")
+        lines.append("\n" + "=" * 60 + "\n\n")
+    return "".join(lines)
 
 def _create_transcripts_file(folder, meta):
     """Tạo file transcripts.txt trong folder uploads"""
     try:
-        folder_path = os.path.join(BASE, folder)
-        transcripts = meta.get('transcripts', {})
-        userName = meta.get('userName', folder.split('_')[-1] if '_' in folder else folder)
-        
-        if not transcripts:
+        content = render_transcripts_file(folder, meta)
+        if content is None:
             return
         
         # Tạo file transcripts.txt
-        transcripts_file = os.path.join(folder_path, 'transcripts.txt')
+        transcripts_file = os.path.join(session_path(folder), 'transcripts.txt')
         with open(transcripts_file, 'w', encoding='utf-8') as f:
-            f.write(f"Interview Transcripts - {userName}\n")
-            f.write(f"Folder: {folder}\n")
-            f.write(f"Date: {meta.get('uploadedAt', 'N/A')}\n")
-            f.write("=" * 60 + "\n\n")
-            
-            # Sắp xếp theo thứ tự câu hỏi
-            for q_idx in sorted(transcripts.keys(), key=int):
-                transcript_data = transcripts[q_idx]
-                f.write(f"Question {q_idx}:\n")
-                f.write("-" * 60 + "\n")
-                f.write(f"{transcript_data['text']}\n")
-                f.write(f"\nConfidence: {transcript_data.get('confidence', 0):.2%}\n")
-                f.write(f"Created: {transcript_data.get('createdAt', 'N/A')}\n")
-                f.write("\n" + "=" * 60 + "\n\n")
+            f.write(content)
         
     except Exception as e:
         # Không fail nếu không tạo được file transcripts.txt
@@ -0,0 +1,100 @@
+"""
+In-process LRU of parsed meta.json files for the read endpoints
+
+Entries are validated on every read by (mtime_ns, size, inode) of the file, so
+writes from other processes (workers, scripts) are picked up; writers in this
+process also call invalidate(), which drops the entry and keeps a read that was
+in flight during the write from caching what it read. The ETag is built from
+(mtime_ns, size) only, so every API process serves the same ETag for the same
+file. Bounded by META_CACHE_ENTRIES and by META_CACHE_MAX_BYTES (file sizes);
+no state is kept for files that are not cached. Cached dicts are shared: do not
+mutate them.
+
+Functions are synchronous (they stat / read files); call them via asyncio.to_thread
+from async code.
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from app.core import config
+
+_lock = threading.Lock()
+# meta_path -> (mtime_ns, size, inode, meta)
+_entries: "OrderedDict[str, Tuple[int, int, int, Dict]]" = OrderedDict()
+_bytes = 0
+# meta_path -> [reads in flight, written during those reads]; only while a read is in flight
+_loading: Dict[str, list] = {}
+
+
+def invalidate(meta_path: str):
+    """Drop a cached entry after writing meta.json"""
+    global _bytes
+    with _lock:
+        loading = _loading.get(meta_path)
+        if loading:
+            loading[1] = True
+        entry = _entries.pop(meta_path, None)
+        if entry:
+            _bytes -= entry[1]
+
+
+def _store(meta_path: str, entry: Tuple[int, int, int, Dict]):
+    global _bytes
+    old = _entries.pop(meta_path, None)
+    if old:
+        _bytes -= old[1]
+    if entry[1] > config.META_CACHE_MAX_BYTES:
+        return
+    _entries[meta_path] = entry
+    _bytes += entry[1]
+    while _entries and (len(_entries) > config.META_CACHE_ENTRIES or _bytes > config.META_CACHE_MAX_BYTES):
+        _, evicted = _entries.popitem(last=False)
+        _bytes -= evicted[1]
+
+
+def load(meta_path: str, cache: bool = True) -> Tuple[Dict, str, float]:
+    """
+    Parsed meta.json with its validator.
+
+    With cache=False (full listings) a valid cached entry is still used, but the
+    file is not added and the LRU order is left alone, so one pass over the whole
+    archive does not evict the sessions reviewers keep open.
+
+    Returns (meta, etag, mtime in seconds). Raises FileNotFoundError or
+    json.JSONDecodeError like reading the file directly.
+    """
+    stat = os.stat(meta_path)
+    key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    with _lock:
+        entry = _entries.get(meta_path)
+        if entry and entry[:3] == key:
+            if cache:
+                _entries.move_to_end(meta_path)
+            return entry[3], _etag(stat), stat.st_mtime
+        cache = cache and config.META_CACHE_ENTRIES > 0
+        if cache:
+            loading = _loading.setdefault(meta_path, [0, False])
+            loading[0] += 1
+
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    finally:
+        if cache:
+            with _lock:
+                loading[0] -= 1
+                written = loading[1]
+                if not loading[0]:
+                    del _loading[meta_path]
+    if cache and not written:
+        with _lock:
+            _store(meta_path, key + (meta,))
+    return meta, _etag(stat), stat.st_mtime
+
+
+def _etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
@@ -1,15 +1,36 @@
-import os, json
 from datetime import datetime
-path_base = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'uploads'))
+from app.storage.file_manager import modify_metadata
 
 def finalize_metadata(folder, questions_count):
-    path = os.path.join(path_base, folder)
-    meta_path = os.path.join(path, 'meta.json')
-    if not os.path.exists(meta_path):
-        return
-    with open(meta_path, 'r') as f:
-        meta = json.load(f)
-    meta['finishedAt'] = datetime.now().isoformat()
-    meta['questionsCount'] = questions_count
-    with open(meta_path, 'w') as f:
-        json.dump(meta, f)
+    def change(meta):
+        meta['finishedAt'] = datetime.now().isoformat()
+        meta['questionsCount'] = questions_count
+    modify_metadata(folder, change)
+
+def update_language_metadata(folder, language):
+    """Record the session language detected once for all answers (meta['language'])"""
+    modify_metadata(folder, lambda meta: meta.update(language=language))
+
+def update_storage_metadata(folder, storage):
+    """Record the compaction / retention state of a session (meta['storage'])"""
+    modify_metadata(folder, lambda meta: meta.update(storage=storage))
+
+def update_answer_checksum(folder, index, old_sha256, checksum):
+    """
+    New checksum ({sha256, size}) of an answer re-encoded in place by compaction,
+    and the sourceSha256 of its transcript (same answer, new bytes). Skipped,
+    returning False, if meta.json already records another take.
+    """
+    updated = []
+
+    def change(meta):
+        checksums = meta.setdefault('checksums', {})
+        if (checksums.get(str(index)) or {}).get('sha256') != old_sha256:
+            return
+        checksums[str(index)] = checksum
+        transcript = meta.get('transcripts', {}).get(str(index))
+        if transcript and transcript.get('sourceSha256') == old_sha256:
+            transcript['sourceSha256'] = checksum['sha256']
+        updated.append(index)
+    modify_metadata(folder, change)
+    return bool(updated)
@@ -0,0 +1,85 @@
+"""
+Segment-level transcripts stored next to each answer as `Q{n}.segments.jsonl`
+
+Format (compact, one row per line, rows sorted by time):
+    {"fields": ["start", "end", "avg_logprob", "no_speech_prob", "text"]}
+    [0.0, 4.2, -0.213, 0.012, "Hello, my name is ..."]
+    ...
+
+Because rows are sorted, a time-range query binary-searches the file by byte
+offset and only parses the rows it returns.
+"""
+
+import os
+import json
+from typing import Dict, List, Optional
+
+from app.storage.file_manager import session_path
+
+FIELDS = ['start', 'end', 'avg_logprob', 'no_speech_prob', 'text']
+
+# Below this many bytes left in the search window, scan linearly
+_SCAN_BYTES = 4096
+
+
+def segments_path(folder: str, index: int) -> str:
+    return os.path.join(session_path(folder), f"Q{index}.segments.jsonl")
+
+
+def save_segments(folder: str, index: int, segments: List[Dict]):
+    """Write all segments of one answer (replaces any previous file atomically)"""
+    path = segments_path(folder, index)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'fields': FIELDS}, separators=(',', ':')) + "\n")
+        for seg in sorted(segments, key=lambda s: s['start']):
+            row = [seg.get(name) for name in FIELDS]
+            f.write(json.dumps(row, separators=(',', ':'), ensure_ascii=False) + "\n")
+    os.replace(temp_path, path)
+
+
+def _row_to_segment(line: bytes) -> Dict:
+    return dict(zip(FIELDS, json.loads(line)))
+
+
+def _seek_first_ending_after(f, data_start: int, size: int, t: float) -> int:
+    """Byte offset of a row start at or before the first row with end > t"""
+    lo, hi = data_start, size
+    while hi - lo > _SCAN_BYTES:
+        mid = (lo + hi) // 2
+        f.seek(mid)
+        f.readline()  # Skip to the next row boundary
+        pos = f.tell()
+        line = f.readline()
+        if not line or pos >= hi or _row_to_segment(line)['end'] > t:
+            hi = mid
+        else:
+            lo = pos + len(line)
+    return lo
+
+
+def load_segments(folder: str, index: int, start: Optional[float] = None, end: Optional[float] = None) -> Optional[List[Dict]]:
+    """
+    Load segments overlapping [start, end] (seconds); both bounds optional.
+
+    Returns None if the answer has no stored segments.
+    """
+    path = segments_path(folder, index)
+    if not os.path.exists(path):
+        return None
+
+    segments = []
+    with open(path, 'rb') as f:
+        f.readline()  # Header
+        data_start = f.tell()
+        if start is not None:
+            f.seek(_seek_first_ending_after(f, data_start, os.fstat(f.fileno()).st_size, start))
+
+        for line in f:
+            segment = _row_to_segment(line)
+            if start is not None and segment['end'] <= start:
+                continue
+            if end is not None and segment['start'] >= end:
+                break
+            segments.append(segment)
+    return segments
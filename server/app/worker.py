@@ -0,0 +1,234 @@
+"""
+Standalone transcription worker
+
+Usage: `python -m app.worker [--worker-id ID]` (from the `server/` folder)
+
+Claims jobs from the durable job store (see app/services/job_store.py), keeps
+the lease alive with heartbeats, runs the same transcribe_batch_videos logic as
+the API and writes results back through the metadata layer. Start several
+workers per node, or on other nodes sharing the uploads volume, to scale
+transcription independently of HTTP (set TRANSCRIPTION_MODE=worker on the API).
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Dict
+
+from app.core import config
+from app.services import job_store
+from app.services.transcription_manager import is_transcription_available, transcribe_batch_videos
+from app.services.transcription_jobs import (
+    collect_video_files, save_transcription_result, retry_delay, resolve_language, save_session_language
+)
+from app.services.compaction import compact_after_job
+from app.services.model_policy import choose_model, DurationTracker, upgrade_next_answer
+from app.services.worker_pool import shutdown_pool
+from app.storage.blob_backend import is_remote_backend, pull_session, push_session
+
+# A retake is noticed within this many seconds: engines check for cancellation
+# per segment, but the task generation is only read from the job store this often
+GENERATION_POLL_SECONDS = 2.0
+
+
+async def _keep_lease(folder: str, worker_id: str, lost: threading.Event):
+    """Renew the job lease until cancelled; sets `lost` if another worker took the job"""
+    interval = max(1.0, config.WORKER_LEASE_SECONDS / 3)
+    while True:
+        await asyncio.sleep(interval)
+        if not await asyncio.to_thread(job_store.heartbeat, folder, worker_id, config.WORKER_LEASE_SECONDS):
+            print(f"⚠️  Lost lease on {folder}; stopping work on it")
+            lost.set()
+            return
+
+
+async def run_job(job: Dict, worker_id: str):
+    """Transcribe one claimed job"""
+    folder = job['folder']
+    model_size = job['model'] or config.WHISPER_MODEL
+    print(f"🔄 [{worker_id}] Transcribing {folder} ({job['questions_count']} videos, model: {model_size}, attempt {job['attempts']})")
+
+    # Smaller model if the shared queue would miss the latency SLO
+    answers, workers = await asyncio.to_thread(job_store.backlog)
+    requested = model_size
+    model_size, _ = choose_model(requested, answers, workers)
+    upgrade_to = requested if model_size != requested else None
+    tracker = DurationTracker(model_size)
+
+    # Upload generation of the take each question is transcribing, and the last
+    # (monotonic time, generation) read from the job store
+    generations = {}
+    polled = {}
+    # Set by the heartbeat when the lease is gone: the job belongs to another
+    # worker now, so stop transcribing and never write its state again
+    lease_lost = threading.Event()
+
+    async def on_start(question_index):
+        if lease_lost.is_set():
+            return
+        tracker.start(question_index)
+        generations[question_index] = await asyncio.to_thread(job_store.start_task, folder, question_index)
+
+    def is_cancelled(question_index):
+        # Called from the engine thread per segment; a retake bumps the generation
+        if lease_lost.is_set():
+            return True
+        now = time.monotonic()
+        last = polled.get(question_index)
+        if last is None or now - last[0] >= GENERATION_POLL_SECONDS:
+            last = polled[question_index] = (now, job_store.task_generation(folder, question_index))
+        return last[1] != generations.get(question_index)
+
+    async def on_segment(question_index, segment):
+        if lease_lost.is_set():
+            return
+        await asyncio.to_thread(job_store.append_task_text, folder, question_index, segment['text'])
+
+    async def on_progress(question_index, success, transcript, error, result=None):
+        tracker.finish(question_index, success and not (result or {}).get('cancelled'))
+        if lease_lost.is_set():
+            return
+        generation = generations.get(question_index)
+        if (result or {}).get('cancelled'):
+            superseded = True
+        elif success:
+            # The update only applies to the take that was transcribed
+            superseded = not await asyncio.to_thread(
+                job_store.update_task, folder, question_index, 'success',
+                (result or {}).get('confidence', 0.95), '', generation
+            )
+            if not superseded:
+                try:
+                    await asyncio.to_thread(
+                        save_transcription_result, folder, question_index, result or {'transcript': transcript}, upgrade_to
+                    )
+                except Exception as e:
+                    await asyncio.to_thread(
+                        job_store.update_task, folder, question_index, 'failed', 0.0, f"Could not save the transcript: {e}"
+                    )
+                    raise
+        else:
+            superseded = not await asyncio.to_thread(
+                job_store.update_task, folder, question_index, 'failed', 0.0, error or '', generation
+            )
+        if superseded:
+            # A newer take was uploaded: drop this result, the new take runs next
+            await asyncio.to_thread(job_store.requeue_task, folder, question_index)
+
+    lease = asyncio.create_task(_keep_lease(folder, worker_id, lease_lost))
+    try:
+        if is_remote_backend():
+            # This node may not share the uploads volume with the API
+            await asyncio.to_thread(pull_session, folder)
+        # Only questions not yet transcribed (a retry never redoes successful ones)
+        indices = await asyncio.to_thread(job_store.pending_indices, folder)
+        while indices and not lease_lost.is_set():
+            # TRANSCRIBE_LANGUAGE=auto: detected once per session (stored in meta.json)
+            language, detect_once = await asyncio.to_thread(resolve_language, folder, job['language'])
+            video_files = await asyncio.to_thread(collect_video_files, folder, job['questions_count'], indices)
+            await transcribe_batch_videos(
+                video_files,
+                language=language,
+                translate_to_english=False,
+                model_size=model_size,
+                on_progress=on_progress,
+                on_segment=on_segment,
+                on_start=on_start,
+                is_cancelled=is_cancelled,
+                detect_language_once=detect_once,
+                on_language=lambda q, code, probability: asyncio.to_thread(save_session_language, folder, q, code, probability)
+            )
+            # Retakes uploaded meanwhile
+            indices = await asyncio.to_thread(job_store.pending_indices, folder, False)
+        if lease_lost.is_set():
+            print(f"⏹️  [{worker_id}] Stopped {folder}: its lease expired and another worker may own it")
+            return
+        await asyncio.to_thread(compact_after_job, folder)
+        if is_remote_backend():
+            await asyncio.to_thread(push_session, folder)
+        await asyncio.to_thread(job_store.complete_job, folder, worker_id)
+        print(f"✅ [{worker_id}] Transcription completed for {folder}")
+        await _schedule_retry(folder)
+    except Exception as e:
+        print(f"⚠️  [{worker_id}] Job {folder} failed: {e}")
+        # Unfinished questions are failed too, so they get the usual backoff
+        # (or a manual retry) instead of staying pending in a failed job
+        try:
+            if await asyncio.to_thread(job_store.fail_job, folder, worker_id, str(e)):
+                await _schedule_retry(folder)
+        except Exception as store_error:
+            print(f"⚠️  [{worker_id}] Could not record the failure of {folder}: {store_error}")
+    finally:
+        lease.cancel()
+
+
+async def _schedule_retry(folder: str):
+    """Re-queue failed questions that have attempts left, after exponential backoff"""
+    progress = await asyncio.to_thread(job_store.get_progress, folder)
+    attempts = [
+        task['attempts'] for task in progress['tasks'].values()
+        if task['status'] == 'failed' and task['attempts'] < config.RETRY_MAX_ATTEMPTS
+    ] if progress else []
+    if not attempts:
+        return
+    delay = retry_delay(max(attempts))
+    retrying = await asyncio.to_thread(
+        job_store.retry_failed, folder, None, config.RETRY_MAX_ATTEMPTS, delay
+    )
+    if retrying:
+        print(f"⏳ {folder}: retrying Q{', Q'.join(map(str, retrying))} in {delay:.0f}s")
+
+
+async def run_worker(worker_id: str, stop: asyncio.Event):
+    """Claim and run jobs until `stop` is set (the current job is finished first)"""
+    print(f"👷 Worker {worker_id} polling {job_store.db_path()}")
+    while not stop.is_set():
+        job = await asyncio.to_thread(job_store.claim_job, worker_id, config.WORKER_LEASE_SECONDS)
+        if job is None:
+            # Idle: upgrade one answer transcribed with a fallback model
+            if config.MODEL_UPGRADE_IDLE:
+                try:
+                    if await upgrade_next_answer():
+                        continue
+                except Exception as e:
+                    print(f"⚠️  [{worker_id}] Model upgrade failed: {e}")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=config.WORKER_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await run_job(job, worker_id)
+    print(f"👋 Worker {worker_id} stopped")
+
+
+async def _main(worker_id: str):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows: fall back to KeyboardInterrupt
+    await run_worker(worker_id, stop)
+    shutdown_pool(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Standalone transcription worker")
+    parser.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}")
+    args = parser.parse_args()
+
+    if not is_transcription_available():
+        print("❌ No transcription engine available on this node")
+        return 1
+
+    asyncio.run(_main(args.worker_id))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+"""
+Compare transcription engines on the same clips: speed and word-error-rate drift.
+
+Usage:
+    python scripts/benchmark_engines.py <clip.webm|session_folder> [...]
+        [--engines whisper_local,faster_whisper] [--model medium] [--language en]
+
+The first engine in `--engines` is the reference; WER drift of every other engine
+is measured against its transcript of the same clip.
+"""
+
+import os
+import sys
+import re
+import time
+import argparse
+import subprocess
+
+# Add parent directory to path so local modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.storage.file_manager import session_path
+from app.services.transcription_manager import ENGINES, load_engine_module
+
+
+def collect_clips(paths):
+    """Expand session folders (absolute or relative to uploads) into their Q*.webm files."""
+    clips = []
+    for path in paths:
+        if not os.path.exists(path) and os.path.isdir(session_path(path)):
+            path = session_path(path)
+        if os.path.isdir(path):
+            clips.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if re.fullmatch(r'Q\d+\.webm', name)
+            )
+        elif os.path.isfile(path):
+            clips.append(path)
+        else:
+            print(f"⚠️  Skipping {path}: not found")
+    return clips
+
+
+def clip_duration(path):
+    """Clip duration in seconds via ffprobe (None if unavailable)."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+            capture_output=True, text=True
+        )
+        return float(result.stdout.strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def normalize_words(text):
+    return re.sub(r"[^\w\s']", ' ', text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (ref_word != hyp_word)  # substitution
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def run_engine(engine_key, clips, model_size, language):
+    """Transcribe every clip with one engine; returns {clip: (seconds, result)} or None."""
+    module = load_engine_module(engine_key)
+    if module is None:
+        print(f"⚠️  Engine {engine_key} is not available (package not installed)")
+        return None
+
+    # Load the model up front so the first clip is not charged for it
+    loader = getattr(module, 'get_whisper_model', None) or getattr(module, 'get_faster_whisper_model', None)
+    if loader:
+        started = time.perf_counter()
+        loader(model_size)
+        print(f"📥 {engine_key}: model loaded in {time.perf_counter() - started:.1f}s")
+
+    timings = {}
+    for clip in clips:
+        with open(clip, 'rb') as f:
+            video_bytes = f.read()
+        started = time.perf_counter()
+        result = module.transcribe_video(video_bytes, language=language, model_size=model_size)
+        timings[clip] = (time.perf_counter() - started, result)
+        status = "✅" if result['success'] else f"❌ {result.get('error')}"
+        print(f"   {engine_key} {os.path.basename(clip)}: {timings[clip][0]:.1f}s {status}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcription engines on the same clips.")
+    parser.add_argument('paths', nargs='+', help="Clip files or session folders")
+    parser.add_argument('--engines', default=','.join(ENGINES), help="Comma-separated engine keys; first is the reference")
+    parser.add_argument('--model', default='medium', help="Model size passed to every engine")
+    parser.add_argument('--language', default='en', help="Language code (empty for auto-detect)")
+    args = parser.parse_args()
+
+    clips = collect_clips(args.paths)
+    if not clips:
+        print("❌ No clips to benchmark")
+        return 1
+
+    engines = [key.strip() for key in args.engines.split(',') if key.strip()]
+    unknown = [key for key in engines if key not in ENGINES]
+    if unknown:
+        print(f"❌ Unknown engine(s): {', '.join(unknown)}. Available: {', '.join(ENGINES)}")
+        return 1
+
+    durations = {clip: clip_duration(clip) for clip in clips}
+    audio_seconds = sum(d for d in durations.values() if d)
+    print(f"📁 {len(clips)} clip(s), {audio_seconds:.1f}s of audio\n")
+
+    results = {}
+    for engine_key in engines:
+        print(f"{'='*60}\n🔄 {engine_key} ({args.model})")
+        results[engine_key] = run_engine(engine_key, clips, args.model, args.language or None)
+
+    reference_key = engines[0]
+    reference = results.get(reference_key)
+
+    print(f"\n{'='*60}")
+    print(f"{'engine':<16}{'total s':>10}{'RTF':>8}{'speedup':>10}{'WER drift':>12}{'failed':>8}")
+    reference_total = sum(t for t, _ in reference.values()) if reference else None
+    for engine_key in engines:
+        timings = results.get(engine_key)
+        if timings is None:
+            print(f"{engine_key:<16}{'n/a':>10}")
+            continue
+        total = sum(t for t, _ in timings.values())
+        failed = sum(1 for _, r in timings.values() if not r['success'])
+        rtf = f"{total / audio_seconds:.2f}" if audio_seconds else "n/a"
+        speedup = f"{reference_total / total:.2f}x" if reference_total and total else "n/a"
+
+        drift = "ref" if engine_key == reference_key else "n/a"
+        if reference and engine_key != reference_key:
+            rates = [
+                word_error_rate(reference[clip][1]['transcript'], timings[clip][1]['transcript'])
+                for clip in clips
+                if reference[clip][1]['success'] and timings[clip][1]['success']
+            ]
+            if rates:
+                drift = f"{sum(rates) / len(rates):.2%}"
+        print(f"{engine_key:<16}{total:>10.1f}{rtf:>8}{speedup:>10}{drift:>12}{failed:>8}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Check that the API imports fast and without the transcription stack.
+
+Usage:
+    python scripts/benchmark_import_time.py [--budget 1.0] [--runs 5] [--importtime]
+
+Each run imports `app.main` in a fresh interpreter. Fails (exit code 1) if the
+best run is over budget or if torch / whisper / faster_whisper got imported;
+the engines must only load on the first transcription.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ['torch', 'whisper', 'faster_whisper', 'ctranslate2', 'numpy']
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'heavy': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_once(importtime: bool = False) -> dict:
+    """Import app.main in a fresh interpreter; returns {seconds, heavy}"""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', _PROBE]
+    proc = subprocess.run(cmd, cwd=SERVER_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or "import failed")
+    if importtime:
+        _print_slowest_imports(proc.stderr)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _print_slowest_imports(stderr: str, limit: int = 15):
+    """Print the slowest modules from `-X importtime` output (cumulative microseconds)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len('import time:'):].split('|')]
+        rows.append((int(cumulative), name.strip()))
+    print("\n📋 Slowest imports (cumulative):")
+    for cumulative, name in sorted(rows, reverse=True)[:limit]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure `import app.main` time in a fresh interpreter")
+    parser.add_argument('--budget', type=float, default=1.0, help="Max seconds for the best run")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--importtime', action='store_true', help="Show the slowest imports of the last run")
+    args = parser.parse_args()
+
+    results = [measure_once() for _ in range(max(1, args.runs - 1))]
+    results.append(measure_once(importtime=args.importtime))
+
+    times = sorted(r['seconds'] for r in results)
+    heavy = sorted({m for r in results for m in r['heavy']})
+    print(f"\nimport app.main: best {times[0]:.3f}s, median {times[len(times) // 2]:.3f}s over {len(times)} runs (budget {args.budget:.2f}s)")
+
+    ok = True
+    if times[0] > args.budget:
+        print(f"❌ Over budget by {times[0] - args.budget:.3f}s")
+        ok = False
+    if heavy:
+        print(f"❌ Heavy modules imported at startup: {', '.join(heavy)}")
+        ok = False
+    if ok:
+        print("✅ Startup import is within budget and lazy")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,60 @@
+"""
+Apply compaction and retention tiers to stored sessions, and report bytes reclaimed.
+
+Usage:
+    python scripts/compact_sessions.py [folder_name ...] [--dry-run] [--report report.json]
+
+Run it daily (e.g. from cron) so sessions move to the audio / transcript tiers as
+they age (RETENTION_VIDEO_DAYS, RETENTION_AUDIO_DAYS). COMPACTION_MODE=audio or
+downscale also compacts answers that were transcribed before it was enabled.
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+
+# Add parent directory to path so local modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core import config
+from app.storage.file_manager import iter_session_paths
+from app.services.compaction import compact_session, format_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact session media and apply retention tiers")
+    parser.add_argument('folders', nargs='*', help="Session folders (default: all)")
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would change")
+    parser.add_argument('--report', help="Also write the per-session report as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"📋 mode={config.COMPACTION_MODE} videoDays={config.RETENTION_VIDEO_DAYS} "
+          f"audioDays={config.RETENTION_AUDIO_DAYS}{' (dry run)' if args.dry_run else ''}\n")
+
+    folders = args.folders or [folder for folder, _ in iter_session_paths()]
+    reports = []
+    for folder in folders:
+        report = compact_session(folder, dry_run=args.dry_run)
+        if report is None:
+            print(f"❌ meta.json not found: {folder}")
+            continue
+        reports.append(report)
+
+    print(format_report(reports))
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({
+                'ranAt': datetime.now().isoformat(),
+                'dryRun': args.dry_run,
+                'bytesReclaimed': sum(r['bytesReclaimed'] for r in reports),
+                'sessions': reports
+            }, f, indent=2)
+        print(f"📄 Report written to {args.report}")
+    return 1 if any(r['errors'] for r in reports) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,110 +1,129 @@
 """
 Create `transcripts.txt` files for folders that have transcripts in `meta.json`.
 
-Usage: `python scripts/create_transcripts_file.py [folder_name]`
-If `folder_name` is not provided, the script will process all folders.
+Usage:
+    python scripts/create_transcripts_file.py [folder_name ...] [--filter GLOB] [--since YYYY-MM-DD]
+        [--until YYYY-MM-DD] [--jobs N] [--force] [--dry-run]
+
+If no `folder_name` is provided, the script processes all folders (optionally
+filtered by folder-name glob and by the session date in the folder name).
+
+Folders are processed in parallel (process pool) and incrementally: a folder is
+skipped when `transcripts.txt` is newer than `meta.json`, or when the rendered
+content is identical to the existing file (its mtime is then refreshed so the
+next run skips it without rendering). `--force` rewrites every file. Rendering is
+`file_manager.render_transcripts_file`, the same code the API uses.
 """
 
 import os
 import sys
 import json
+import time
+import hashlib
+import argparse
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
 
 # Add parent directory to path so local modules can be imported
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from app.storage.file_manager import BASE
+from app.storage.file_manager import BASE, session_path, select_session_folders, render_transcripts_file
+
+# Per-folder outcomes
+WRITTEN, UNCHANGED, UP_TO_DATE, NO_TRANSCRIPTS, MISSING, ERROR = (
+    'written', 'unchanged', 'up to date', 'no transcripts', 'meta.json not found', 'error'
+)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
 
-def create_transcripts_file(folder_path, meta):
-    """Create `transcripts.txt` in the given folder."""
-    try:
-        transcripts = meta.get('transcripts', {})
-        userName = meta.get('userName', 'Unknown')
-        folder_name = os.path.basename(folder_path)
-        
-        if not transcripts:
-            return False
-        
-        # Write transcripts.txt
-        transcripts_file = os.path.join(folder_path, 'transcripts.txt')
-        with open(transcripts_file, 'w', encoding='utf-8') as f:
-            f.write(f"Interview Transcripts - {userName}\n")
-            f.write(f"Folder: {folder_name}\n")
-            f.write(f"Date: {meta.get('uploadedAt', 'N/A')}\n")
-            f.write("=" * 60 + "\n\n")
-            
-            # Sort by question index
-            for q_idx in sorted(transcripts.keys(), key=int):
-                transcript_data = transcripts[q_idx]
-                f.write(f"Question {q_idx}:\n")
-                f.write("-" * 60 + "\n")
-                f.write(f"{transcript_data['text']}\n")
-                f.write(f"\nConfidence: {transcript_data.get('confidence', 0):.2%}\n")
-                f.write(f"Created: {transcript_data.get('createdAt', 'N/A')}\n")
-                f.write("\n" + "=" * 60 + "\n\n")
-        
-        return True
-        
-    except Exception as e:
-        print(f"⚠️  Error creating transcripts.txt for {os.path.basename(folder_path)}: {e}")
-        return False
 
-def process_folder(folder_name):
-    """Process a specific folder."""
-    folder_path = os.path.join(BASE, folder_name)
+def process_folder(folder_name, dry_run=False, force=False):
+    """Regenerate one folder's transcripts.txt if needed. Returns (folder, status, detail)."""
+    folder_path = session_path(folder_name)
     meta_path = os.path.join(folder_path, 'meta.json')
-    
-    if not os.path.exists(meta_path):
-        print(f"❌ meta.json not found: {folder_name}")
-        return False
-    
+    transcripts_path = os.path.join(folder_path, 'transcripts.txt')
+
     try:
+        if not os.path.exists(meta_path):
+            return folder_name, MISSING, ''
+
+        if not force and os.path.exists(transcripts_path) and os.path.getmtime(transcripts_path) >= os.path.getmtime(meta_path):
+            return folder_name, UP_TO_DATE, ''
+
         with open(meta_path, 'r', encoding='utf-8') as f:
             meta = json.load(f)
-        
-        transcripts = meta.get('transcripts', {})
-        if not transcripts:
-            print(f"⚠️  Folder {folder_name} has no transcripts")
-            return False
-        
-        if create_transcripts_file(folder_path, meta):
-            print(f"✅ Created transcripts.txt for folder: {folder_name}")
-            return True
-        else:
-            return False
-            
+
+        content = render_transcripts_file(folder_name, meta)
+        if content is None:
+            return folder_name, NO_TRANSCRIPTS, ''
+        data = content.encode('utf-8')
+
+        if not force and os.path.exists(transcripts_path):
+            with open(transcripts_path, 'rb') as f:
+                if _sha256(f.read()) == _sha256(data):
+                    if not dry_run:
+                        os.utime(transcripts_path)  # Next run skips it by mtime
+                    return folder_name, UNCHANGED, ''
+
+        if not dry_run:
+            temp_path = transcripts_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, transcripts_path)
+        return folder_name, WRITTEN, f"{len(meta.get('transcripts', {}))} transcript(s)"
+
     except Exception as e:
-        print(f"❌ Error processing {folder_name}: {e}")
-        return False
+        return folder_name, ERROR, str(e)
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create transcripts.txt from meta.json (parallel, incremental)")
+    parser.add_argument('folders', nargs='*', help="Session folders (default: all)")
+    parser.add_argument('--filter', help="Folder name glob, e.g. '*_10_2026_*'")
+    parser.add_argument('--since', type=_parse_date, help="Only sessions from this date (folder name date)")
+    parser.add_argument('--until', type=_parse_date, help="Only sessions up to this date")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--force', action='store_true', help="Rewrite even if up to date")
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would be written")
+    args = parser.parse_args()
 
-def process_all_folders():
-    """Process all folders under uploads base directory."""
-    if not os.path.exists(BASE):
+    if not args.folders and not os.path.exists(BASE):
         print(f"❌ Uploads directory not found: {BASE}")
-        return
-    
-    folders = [f for f in os.listdir(BASE) if os.path.isdir(os.path.join(BASE, f))]
-    
+        return 1
+
+    folders = args.folders or select_session_folders(args.filter, args.since, args.until)
     if not folders:
         print("ℹ️  No folders found in uploads")
-        return
-    
-    print(f"📁 Found {len(folders)} folder(s)\n")
-    
-    success_count = 0
-    for folder_name in folders:
-        print(f"{'='*60}")
-        if process_folder(folder_name):
-            success_count += 1
-        print()
-    
-    print(f"✅ Done! Created transcripts.txt for {success_count}/{len(folders)} folder(s)")
+        return 0
 
-if __name__ == '__main__':
-    if len(sys.argv) > 1:
-        # Xử lý một folder cụ thể
-        folder_name = sys.argv[1]
-        process_folder(folder_name)
-    else:
-        # Xử lý tất cả folders
-        process_all_folders()
+    print(f"📁 {len(folders)} folder(s), {args.jobs} job(s){' (dry run)' if args.dry_run else ''}\n")
+
+    counts = {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        chunksize = max(1, len(folders) // (max(1, args.jobs) * 8))
+        results = pool.map(process_folder, folders, [args.dry_run] * len(folders), [args.force] * len(folders), chunksize=chunksize)
+        for folder_name, status, detail in results:
+            counts[status] = counts.get(status, 0) + 1
+            if status == WRITTEN:
+                print(f"✅ {'Would write' if args.dry_run else 'Wrote'} transcripts.txt for {folder_name} ({detail})")
+            elif status in (ERROR, MISSING):
+                print(f"❌ {folder_name}: {status}{f' ({detail})' if detail else ''}")
+    elapsed = time.perf_counter() - started
 
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"\n✅ Done in {elapsed:.1f}s ({len(folders) / elapsed if elapsed else 0:.0f} folders/s): {summary}")
+    return 1 if counts.get(ERROR) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,210 @@
+"""
+Load generator: concurrent candidates replaying the interview client flow.
+
+Usage:
+    python scripts/load_test.py [--base-url http://127.0.0.1:8000] [--candidates 20]
+        [--rate 2] [--arrival poisson|constant] [--questions 5]
+        [--video FILE | --size-kb 512] [--poll-interval 1] [--timeout 600] [--report FILE]
+
+Each candidate runs verify-token -> session/start -> N x upload-one ->
+session/finish, then polls transcription-status until the session is `success`
+or `failed`. Candidates arrive at `--rate` per second (Poisson or evenly spaced).
+Payloads are a real recording (`--video`) or synthetic bytes (`--size-kb`; every
+answer gets a different first byte so each upload is a new take).
+
+Reports p50/p95/p99 latency and status codes per endpoint (429 / 413 rejections
+included), upload throughput, and time-to-transcript (finish response until the
+session reaches a final status). `--report` also writes the raw numbers as JSON.
+
+Run the server with the stub engine to load-test the pipeline without a model:
+    TRANSCRIPTION_ENGINE=stub STUB_TRANSCRIBE_SECONDS=2 uvicorn app.main:app
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+
+import httpx
+
+TOKEN = "12345"
+FINAL_STATUSES = ('success', 'failed')
+
+
+class Recorder:
+    """Latencies and status codes per endpoint"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.codes = defaultdict(lambda: defaultdict(int))
+        self.uploaded_bytes = 0
+        self.upload_seconds = 0.0
+        self.time_to_transcript = []
+        self.outcomes = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.codes[endpoint][type(e).__name__] += 1
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        self.codes[endpoint][str(resp.status_code)] += 1
+        return resp
+
+
+async def run_candidate(client: httpx.AsyncClient, rec: Recorder, number: int, payload: bytes, args) -> str:
+    """One candidate end to end; returns the outcome ('success', 'failed', or where it stopped)"""
+    resp = await rec.request(client, 'verify-token', 'POST', '/api/verify-token', json={"token": TOKEN})
+    if resp is None or resp.status_code != 200:
+        return 'verify-token rejected'
+
+    resp = await rec.request(client, 'session/start', 'POST', '/api/session/start',
+                             json={"token": TOKEN, "userName": f"Load{number}"})
+    if resp is None or resp.status_code != 200:
+        return 'session/start rejected'
+    folder = resp.json()['folder']
+
+    for q in range(1, args.questions + 1):
+        started = time.perf_counter()
+        resp = await rec.request(
+            client, 'upload-one', 'POST', '/api/upload-one',
+            data={"token": TOKEN, "folder": folder, "questionIndex": str(q)},
+            files={"video": (f"Q{q}.webm", bytes([(number + q) % 256]) + payload[1:], "video/webm")}
+        )
+        if resp is None or resp.status_code != 200:
+            return 'upload-one rejected'
+        rec.uploaded_bytes += len(payload)
+        rec.upload_seconds += time.perf_counter() - started
+
+    resp = await rec.request(client, 'session/finish', 'POST', '/api/session/finish',
+                             json={"token": TOKEN, "folder": folder, "questionsCount": args.questions})
+    if resp is None or resp.status_code != 200:
+        return 'session/finish rejected'
+    if not resp.json().get('transcribing'):
+        return 'not transcribing'
+
+    finished = time.perf_counter()
+    deadline = finished + args.timeout
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(args.poll_interval)
+        # 404 right after finish: the background job is not registered yet
+        resp = await rec.request(client, 'transcription-status', 'GET', f'/api/transcription-status/{folder}')
+        if resp is not None and resp.status_code == 200 and resp.json()['status'] in FINAL_STATUSES:
+            rec.time_to_transcript.append(time.perf_counter() - finished)
+            return resp.json()['status']
+    return 'timed out'
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def _summary(values: list) -> dict:
+    return {
+        'count': len(values),
+        'p50': _percentile(values, 0.50),
+        'p95': _percentile(values, 0.95),
+        'p99': _percentile(values, 0.99),
+        'max': max(values, default=0.0),
+    }
+
+
+async def run(args, payload: bytes) -> dict:
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=args.candidates)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.request_timeout, limits=limits) as client:
+        async def candidate(number: int, delay: float):
+            await asyncio.sleep(delay)
+            outcome = await run_candidate(client, rec, number, payload, args)
+            rec.outcomes[outcome] += 1
+
+        # Arrival times of every candidate
+        delays, at = [], 0.0
+        for _ in range(args.candidates):
+            delays.append(at)
+            at += random.expovariate(args.rate) if args.arrival == 'poisson' else 1.0 / args.rate
+
+        started = time.perf_counter()
+        await asyncio.gather(*(candidate(n, delay) for n, delay in enumerate(delays, 1)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        'elapsed': elapsed,
+        'endpoints': {
+            endpoint: {**_summary(rec.latencies[endpoint]), 'codes': dict(rec.codes[endpoint])}
+            for endpoint in rec.codes
+        },
+        'uploadMBps': rec.uploaded_bytes / rec.upload_seconds / 1e6 if rec.upload_seconds else 0.0,
+        'uploadedMB': rec.uploaded_bytes / 1e6,
+        'timeToTranscript': _summary(rec.time_to_transcript),
+        'outcomes': dict(rec.outcomes),
+    }
+
+
+def print_report(report: dict, args):
+    print(f"\n{args.candidates} candidate(s) x {args.questions} question(s) in {report['elapsed']:.1f}s "
+          f"({args.arrival} arrivals, {args.rate:g}/s)\n")
+    print(f"  {'endpoint':22s} {'count':>6s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}  codes")
+    for endpoint, stats in report['endpoints'].items():
+        codes = ", ".join(f"{code}: {n}" for code, n in sorted(stats['codes'].items()))
+        print(f"  {endpoint:22s} {stats['count']:6d} "
+              + " ".join(f"{stats[k] * 1000:6.0f}ms" for k in ('p50', 'p95', 'p99', 'max'))
+              + f"  {codes}")
+
+    ttt = report['timeToTranscript']
+    print(f"\n  Upload throughput: {report['uploadMBps']:.1f} MB/s per candidate ({report['uploadedMB']:.1f} MB total)")
+    print(f"  Time to transcript ({ttt['count']} session(s)): p50 {ttt['p50']:.1f}s, "
+          f"p95 {ttt['p95']:.1f}s, p99 {ttt['p99']:.1f}s, max {ttt['max']:.1f}s")
+    print("  Outcomes: " + ", ".join(f"{outcome}: {n}" for outcome, n in sorted(report['outcomes'].items())))
+
+
+def _positive_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number '{value}'")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay concurrent interview sessions against a running server")
+    parser.add_argument('--base-url', default="http://127.0.0.1:8000")
+    parser.add_argument('--candidates', type=int, default=20, help="Sessions to run")
+    parser.add_argument('--rate', type=_positive_float, default=2.0, help="Candidate arrivals per second")
+    parser.add_argument('--arrival', choices=['poisson', 'constant'], default='poisson')
+    parser.add_argument('--questions', type=int, default=5, help="Answers uploaded per session")
+    parser.add_argument('--video', help="Real recording to upload as every answer")
+    parser.add_argument('--size-kb', type=int, default=512, help="Size of a synthetic answer (without --video)")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds between status polls")
+    parser.add_argument('--timeout', type=float, default=600.0, help="Max seconds to wait for a transcript")
+    parser.add_argument('--request-timeout', type=float, default=120.0, help="Per-request timeout")
+    parser.add_argument('--report', help="Write the raw report as JSON")
+    args = parser.parse_args()
+
+    if args.video:
+        with open(args.video, 'rb') as f:
+            payload = f.read()
+    else:
+        payload = os.urandom(max(1, args.size_kb) * 1024)
+
+    report = asyncio.run(run(args, payload))
+    print_report(report, args)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.report}")
+
+    incomplete = sum(n for outcome, n in report['outcomes'].items() if outcome != 'success')
+    return 1 if incomplete else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+"""
+Move existing session folders into the sharded storage layout.
+
+Usage:
+    python scripts/migrate_storage_layout.py [--from flat] [--to hashed] [--dry-run] [--push]
+
+`--to` defaults to STORAGE_LAYOUT. Folders already in place are skipped, so the
+script can be re-run (e.g. after an interrupted run). The API keeps finding
+folders that are still flat, so it can migrate while the server is running.
+`--push` also uploads every session to the configured blob backend (STORAGE_BACKEND=s3).
+"""
+
+import os
+import sys
+import shutil
+import argparse
+
+# Add parent directory to path so local modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core import config
+from app.storage.file_manager import BASE, LAYOUTS, layout_path, iter_session_paths
+from app.storage.blob_backend import get_backend, push_session
+
+
+def migrate(source_layout: str, target_layout: str, dry_run: bool = False, push: bool = False):
+    moved = skipped = pushed = 0
+    backend = get_backend() if push else None
+
+    for folder, path in list(iter_session_paths(source_layout)):
+        target = layout_path(folder, target_layout)
+        if os.path.abspath(path) == os.path.abspath(target):
+            skipped += 1
+        elif os.path.exists(target):
+            print(f"⚠️  {folder}: target already exists ({target}), skipping")
+            skipped += 1
+            continue
+        else:
+            print(f"{'Would move' if dry_run else 'Moving'} {os.path.relpath(path, BASE)} -> {os.path.relpath(target, BASE)}")
+            if not dry_run:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)  # A rename on the same filesystem
+            moved += 1
+
+        if backend is not None and not dry_run:
+            pushed += push_session(folder, backend)
+
+    print(f"\n✅ Done! {'Would move' if dry_run else 'Moved'} {moved} session(s), {skipped} already in place")
+    if push:
+        print(f"☁️  Pushed {pushed} file(s) to the {backend.name} backend")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move session folders into the sharded storage layout")
+    parser.add_argument('--from', dest='source', choices=LAYOUTS, default='flat', help="Layout to scan (default: flat)")
+    parser.add_argument('--to', dest='target', choices=LAYOUTS, default=config.STORAGE_LAYOUT,
+                        help="Target layout (default: STORAGE_LAYOUT)")
+    parser.add_argument('--dry-run', action='store_true', help="Only print what would be moved")
+    parser.add_argument('--push', action='store_true', help="Also upload sessions to the blob backend")
+    args = parser.parse_args()
+
+    if not os.path.exists(BASE):
+        print(f"❌ Uploads directory not found: {BASE}")
+        return 1
+    migrate(args.source, args.target, dry_run=args.dry_run, push=args.push)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
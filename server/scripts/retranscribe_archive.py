@@ -0,0 +1,226 @@
+"""
+Re-transcribe archived sessions with another engine / model (e.g. after a model upgrade).
+
+Usage:
+    python scripts/retranscribe_archive.py --model large-v3 [--engine faster_whisper]
+        [folder_name ...] [--filter GLOB] [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+        [--jobs N] [--language CODE] [--tag TAG] [--checkpoint FILE] [--dry-run]
+
+Answers are transcribed on a process pool (one model copy per process, cores
+split between them). Results are written as versioned files next to the current
+transcripts, `<session>/versions/<tag>/Q{n}.json` (tag defaults to
+`<engine>-<model>`); `meta.json` and `transcripts.txt` are not touched, so the
+live API is unaffected.
+
+Progress is appended to a checkpoint file (default `uploads/.retranscribe-<tag>.jsonl`)
+after every answer, with the checksum of the take it transcribed: re-running the
+same command after a crash skips answers finished from the same take (failed
+ones, and answers retaken since, are transcribed again). Throughput and ETA are printed as it runs.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import date, datetime
+from concurrent.futures import as_completed
+
+# Add parent directory to path so local modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core import config
+from app.storage import file_manager
+from app.storage.file_manager import session_path, select_session_folders
+from app.services.transcription_manager import ENGINES, probe_engine, load_engine_module
+from app.services.transcription_jobs import resolve_language
+from app.services.worker_pool import create_pool
+
+VERSIONS_DIR = 'versions'
+
+
+def retranscribe_answer(engine_key: str, media_path: str, language, model_size: str) -> dict:
+    """Transcribe one answer (runs in a worker process)"""
+    module = load_engine_module(engine_key)
+    if module is None:
+        return {'success': False, 'error': f'Engine {engine_key} is not available'}
+    with open(media_path, 'rb') as f:
+        media_bytes = f.read()
+    return module.transcribe_video(media_bytes, language=language, model_size=model_size)
+
+
+def version_path(folder: str, tag: str, question_index: int) -> str:
+    return os.path.join(session_path(folder), VERSIONS_DIR, tag, f"Q{question_index}.json")
+
+
+def _answer_media(folder_path: str, question_index: int):
+    """Q{n}.webm, else its audio rendition after compaction (see compaction.py)"""
+    for name in (f"Q{question_index}.webm", f"Q{question_index}.opus"):
+        path = os.path.join(folder_path, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def collect_work(folders, tag: str, language_arg, done: set):
+    """(folder, question, media_path, language, source_sha256) of every answer still to do"""
+    work = []
+    for folder in folders:
+        meta_path = os.path.join(session_path(folder), 'meta.json')
+        if not os.path.exists(meta_path):
+            continue
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        language, _ = resolve_language(folder, language_arg)
+        checksums = meta.get('checksums', {})
+        for q in sorted(set(meta.get('receivedQuestions', []))):
+            sha256 = (checksums.get(str(q)) or {}).get('sha256')
+            # Only the take the checkpoint entry was made from counts as done
+            if (folder, q, sha256) in done:
+                continue
+            media = _answer_media(session_path(folder), q)
+            if media is None:
+                continue
+            # Checkpoint lost: an existing version of the same take is still valid
+            existing = version_path(folder, tag, q)
+            if sha256 and os.path.exists(existing):
+                with open(existing, 'r', encoding='utf-8') as f:
+                    if json.load(f).get('sourceSha256') == sha256:
+                        continue
+            work.append((folder, q, media, language, sha256))
+    return work
+
+
+def save_version(folder: str, tag: str, question_index: int, engine: str, result: dict, source_sha256):
+    path = version_path(folder, tag, question_index)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'text': result.get('transcript', ''),
+            'confidence': result.get('confidence'),
+            'engine': engine,
+            'model': result.get('model'),
+            'language': result.get('language'),
+            'segments': result.get('segments') or [],
+            'sourceSha256': source_sha256,
+            'createdAt': datetime.now().isoformat()
+        }, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def read_checkpoint(path: str) -> set:
+    """(folder, question, source sha256) of answers already transcribed successfully"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line after a crash
+            if entry.get('status') == 'success':
+                done.add((entry['folder'], entry['question'], entry.get('sha256')))
+    return done
+
+
+def _append_checkpoint(f, entry: dict):
+    f.write(json.dumps(entry) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m" if seconds >= 3600 else f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-transcribe archived sessions into versioned transcripts")
+    parser.add_argument('folders', nargs='*', help="Session folders (default: all)")
+    parser.add_argument('--engine', default=config.TRANSCRIPTION_ENGINE, choices=list(ENGINES))
+    parser.add_argument('--model', default=config.WHISPER_MODEL)
+    parser.add_argument('--language', default=config.TRANSCRIBE_LANGUAGE,
+                        help="Code, 'auto' (session language from meta.json) or 'clip'")
+    parser.add_argument('--filter', help="Folder name glob, e.g. '*_10_2026_*'")
+    parser.add_argument('--since', type=_parse_date, help="Only sessions from this date (folder name date)")
+    parser.add_argument('--until', type=_parse_date, help="Only sessions up to this date")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="Worker processes (each loads the model)")
+    parser.add_argument('--tag', help="Version name (default: <engine>-<model>)")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: uploads/.retranscribe-<tag>.jsonl)")
+    parser.add_argument('--dry-run', action='store_true', help="Only list what would be transcribed")
+    args = parser.parse_args()
+
+    tag = args.tag or f"{args.engine}-{args.model}"
+    checkpoint = args.checkpoint or os.path.join(file_manager.BASE, f".retranscribe-{tag}.jsonl")
+
+    if not probe_engine(args.engine):
+        print(f"❌ Engine {args.engine} is not installed")
+        return 1
+
+    folders = args.folders or select_session_folders(args.filter, args.since, args.until)
+    done = read_checkpoint(checkpoint)
+    work = collect_work(folders, tag, args.language, done)
+    print(f"📁 {len(folders)} session(s), {len(work)} answer(s) to transcribe as '{tag}' "
+          f"({len(done)} already done per {checkpoint})")
+    if args.dry_run or not work:
+        for folder, q, media, language, _ in work:
+            print(f"  {folder} Q{q} ({os.path.basename(media)}, language: {language or 'detect'})")
+        return 0
+
+    failed = 0
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint)), exist_ok=True)
+    pool = create_pool(max(1, args.jobs))
+    try:
+        with open(checkpoint, 'a', encoding='utf-8') as log:
+            futures = {
+                pool.submit(retranscribe_answer, args.engine, media, language, args.model): (folder, q, sha256)
+                for folder, q, media, language, sha256 in work
+            }
+            for finished, future in enumerate(as_completed(futures), 1):
+                folder, q, sha256 = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'success': False, 'error': str(e)}
+
+                if result.get('success'):
+                    save_version(folder, tag, q, args.engine, result, sha256)
+                    status = 'success'
+                else:
+                    status = 'failed'
+                    failed += 1
+                _append_checkpoint(log, {
+                    'folder': folder, 'question': q, 'sha256': sha256, 'status': status,
+                    'error': result.get('error'), 'at': datetime.now().isoformat()
+                })
+
+                elapsed = time.perf_counter() - started
+                rate = finished / elapsed
+                eta = (len(work) - finished) / rate if rate else 0
+                mark = "✅" if status == 'success' else f"⚠️  {result.get('error')}"
+                print(f"[{finished}/{len(work)}] {folder} Q{q} {mark} | "
+                      f"{rate * 60:.1f} answers/min | ETA {_format_eta(eta)}")
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted; re-run the same command to resume from the checkpoint")
+        pool.shutdown(wait=False, cancel_futures=True)
+        return 130
+    pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Done in {_format_eta(elapsed)}: {len(work) - failed} transcribed, {failed} failed "
+          f"({len(work) / elapsed * 60:.1f} answers/min)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,31 @@
+"""
+Shared fixtures. Tests run from `server/` (python -m pytest); nothing touches the
+real uploads folder.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.storage import file_manager
+
+
+@pytest.fixture
+def uploads_base(tmp_path, monkeypatch):
+    """
+    Point the uploads folder at a temp dir. Modules that did
+    `from app.storage.file_manager import BASE` hold their own copy, so BASE is
+    patched in every loaded app module that still has the original value.
+    """
+    import app.main  # noqa: F401  (load every module that may have copied BASE)
+
+    original = file_manager.BASE
+    base = str(tmp_path / 'uploads')
+    os.makedirs(base)
+    for name, module in list(sys.modules.items()):
+        if (name == 'app' or name.startswith(('app.', 'scripts.'))) and getattr(module, 'BASE', None) == original:
+            monkeypatch.setattr(module, 'BASE', base)
+    return base
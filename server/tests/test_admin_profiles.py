@@ -0,0 +1,99 @@
+"""Profiling admin endpoints and transcription profile names"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config, profiling
+from app.main import app
+from app.services import transcription_manager
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_disabled_without_admin_token(client, monkeypatch):
+    monkeypatch.setattr(config, 'ADMIN_TOKEN', "")
+    assert client.get('/api/admin/profiling', params={"token": ""}).status_code == 403
+    assert client.get('/api/admin/profiles', params={"token": "12345"}).status_code == 403
+
+
+def test_requires_the_configured_token(client, monkeypatch):
+    monkeypatch.setattr(config, 'ADMIN_TOKEN', "s3cret")
+    assert client.get('/api/admin/profiling', params={"token": "12345"}).status_code == 401
+    resp = client.get('/api/admin/profiling', params={"token": "s3cret"})
+    assert resp.status_code == 200 and resp.json()['ok']
+
+
+def test_transcription_profile_is_named_after_the_question(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setitem(profiling._state, 'sample_rate', 1.0)
+
+    async def ensure_engine_loaded():
+        return True
+
+    monkeypatch.setattr(transcription_manager, 'ensure_engine_loaded', ensure_engine_loaded)
+    monkeypatch.setattr(transcription_manager, 'TRANSCRIBE_FUNC', lambda media: {'success': True})
+    monkeypatch.setattr(transcription_manager, '_get_transcribe_signature', lambda: {
+        'has_language': False, 'has_translate': False, 'has_model_size': False, 'has_on_segment': False
+    })
+
+    asyncio.run(transcription_manager.transcribe_single_video(b'', question_index=3))
+    names = os.listdir(tmp_path)
+    assert len(names) == 1 and '_transcribe_Q3_' in names[0] and names[0].endswith('.prof')
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def busy_on_loop():
+    _spin(0.02)
+
+
+def busy_in_thread():
+    _spin(0.1)
+
+
+def stray_thread():
+    _spin(0.3)
+
+
+def test_request_profiles_only_hold_their_own_stacks(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(config, 'PROFILE_INTERVAL_MS', 1)
+    monkeypatch.setitem(profiling._state, 'sample_rate', 1.0)
+
+    async def app(scope, receive, send):
+        if scope['path'] == '/loop':
+            for _ in range(5):
+                busy_on_loop()
+                await asyncio.sleep(0)
+        else:
+            await asyncio.to_thread(busy_in_thread)
+
+    async def main():
+        profiling.install_executor(asyncio.get_running_loop())
+        middleware = profiling.ProfilingMiddleware(app)
+        stray = threading.Thread(target=stray_thread)
+        stray.start()
+        await asyncio.gather(*(middleware({'type': 'http', 'method': 'GET', 'path': path}, None, None)
+                               for path in ('/loop', '/thread')))
+        stray.join()
+
+    asyncio.run(main())
+    folded = {}
+    for name in os.listdir(tmp_path):
+        with open(os.path.join(tmp_path, name)) as f:
+            folded['loop' if '_loop_' in name else 'thread'] = f.read()
+    assert 'busy_on_loop' in folded['loop'] and 'busy_in_thread' in folded['thread']
+    assert 'busy_in_thread' not in folded['loop'] and 'busy_on_loop' not in folded['thread']
+    assert 'stray_thread' not in folded['loop'] + folded['thread']
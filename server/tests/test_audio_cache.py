@@ -0,0 +1,65 @@
+"""Decoded-audio cache: eviction from the in-process index, windows mapped from the .npy"""
+
+import os
+
+import numpy as np
+import pytest
+
+from app.core import config
+from app.services import audio_cache
+from app.services.long_clip import transcribe_window
+
+
+def _store(root: str, name: str, samples: int, used: float) -> str:
+    npy_path = os.path.join(root, name[:2], name + '.npy')
+    os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+    np.save(npy_path, np.zeros(samples, dtype=np.float32))
+    info_path = npy_path[:-len('.npy')] + '.json'
+    with open(info_path, 'w') as f:
+        f.write('{}')
+    os.utime(info_path, (used, used))
+    return npy_path
+
+
+@pytest.fixture
+def cache_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'AUDIO_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(audio_cache, '_index', {})
+    monkeypatch.setattr(audio_cache, '_index_state', {'dir': None, 'total': 0, 'scanned': 0.0})
+    return str(tmp_path)
+
+
+def test_evicts_least_recently_used_without_walking_again(cache_root, monkeypatch):
+    old = _store(cache_root, 'aa01', 1000, used=100)
+    recent = _store(cache_root, 'bb02', 1000, used=200)
+    size = os.path.getsize(old)
+
+    assert audio_cache.evict(max_bytes=10 * size) == 0
+
+    # Later misses use the index only
+    monkeypatch.setattr(audio_cache.os, 'walk', lambda *_: pytest.fail("the cache was walked again"))
+    newest = _store(cache_root, 'cc03', 1000, used=300)
+    audio_cache._record(newest, os.path.getsize(newest))
+    audio_cache._record(old)  # Used again: now newer than `recent`
+
+    assert audio_cache.evict(max_bytes=2 * size) == size
+    assert not os.path.exists(recent)
+    assert os.path.exists(old) and os.path.exists(newest)
+
+
+def test_window_is_sliced_from_the_cached_file(tmp_path, monkeypatch):
+    npy_path = str(tmp_path / 'clip.npy')
+    np.save(npy_path, np.arange(100, dtype=np.float32))
+    received = {}
+
+    class Engine:
+        @staticmethod
+        def transcribe_audio(audio, **kwargs):
+            received['audio'] = np.array(audio)
+            return {'success': True, 'segments': [{'start': 0.0, 'end': 1.0, 'text': 'hi'}]}
+
+    monkeypatch.setattr('app.services.transcription_manager.load_engine_module', lambda key: Engine)
+    result = transcribe_window('stub', npy_path, 2.0, 'en', 'base', False, span=(10, 20))
+
+    assert received['audio'].tolist() == list(range(10, 20))
+    assert result['segments'][0]['start'] == 2.0
@@ -0,0 +1,58 @@
+"""S3Backend against an in-memory S3 (moto)"""
+
+import os
+
+import pytest
+
+pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+
+from app.storage.blob_backend import S3Backend, push_session, pull_session
+from app.storage.file_manager import ensure_session_folder, session_path
+
+FOLDER = "01_01_2026_10_00_BlobProbe"
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY'):
+        monkeypatch.setenv(name, 'testing')
+    with moto.mock_aws():
+        s3 = S3Backend("interviews", prefix="sessions/")
+        s3.client.create_bucket(Bucket="interviews")
+        yield s3
+
+
+def test_put_get_exists_delete(backend, tmp_path):
+    source = tmp_path / 'Q1.webm'
+    source.write_bytes(b'answer')
+    key = f"{FOLDER}/Q1.webm"
+
+    backend.put_file(key, str(source))
+    assert backend.exists(key)
+    assert backend.client.head_object(Bucket="interviews", Key=f"sessions/{key}")
+    assert backend.list_keys(f"{FOLDER}/") == [key]
+
+    target = tmp_path / 'copy' / 'Q1.webm'
+    assert backend.get_file(key, str(target))
+    assert target.read_bytes() == b'answer'
+
+    backend.delete(key)
+    assert not backend.exists(key)
+    missing = tmp_path / 'missing.webm'
+    assert backend.get_file(key, str(missing)) is False
+    assert not os.path.exists(f"{missing}.part")
+
+
+def test_push_then_pull_session(backend, uploads_base):
+    ensure_session_folder(FOLDER)
+    path = session_path(FOLDER)
+    with open(os.path.join(path, 'Q1.webm'), 'wb') as f:
+        f.write(b'answer')
+    open(os.path.join(path, 'meta.json.lock'), 'w').close()
+
+    assert push_session(FOLDER, backend) == 2  # meta.json + Q1.webm, not the lock file
+    os.remove(os.path.join(path, 'Q1.webm'))
+    assert pull_session(FOLDER, backend) == 1
+    with open(os.path.join(path, 'Q1.webm'), 'rb') as f:
+        assert f.read() == b'answer'
@@ -0,0 +1,133 @@
+"""Compaction accounting, retake races and the locked meta.json writers"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from app.core import config
+from app.services import compaction
+from app.storage.file_manager import (
+    ensure_session_folder, session_path, update_metadata, modify_metadata, save_question_stream
+)
+from app.storage.metadata_manager import update_language_metadata
+
+FOLDER = "01_01_2026_10_00_CompactProbe"
+OLD_TAKE = b'v' * 10_000
+RETAKE = b'r' * 8_000
+
+
+@pytest.fixture
+def session(uploads_base):
+    ensure_session_folder(FOLDER)
+    video = os.path.join(session_path(FOLDER), 'Q1.webm')
+    with open(video, 'wb') as f:
+        f.write(OLD_TAKE)
+    sha256 = hashlib.sha256(OLD_TAKE).hexdigest()
+    update_metadata(FOLDER, 1, checksum={"sha256": sha256, "size": len(OLD_TAKE)})
+    update_metadata(FOLDER, 1, transcript="hello", confidence=0.9, source_sha256=sha256)
+    return video
+
+
+def _meta():
+    with open(os.path.join(session_path(FOLDER), 'meta.json')) as f:
+        return json.load(f)
+
+
+def _fake_ffmpeg(monkeypatch, output, during=None):
+    """ffmpeg stand-in writing `output` to the temp file; `during()` runs while it "encodes" """
+    def run_ffmpeg(args, out_path):
+        if during:
+            during()
+        root, ext = os.path.splitext(out_path)
+        temp_path = f"{root}.tmp{ext}"
+        with open(temp_path, 'wb') as f:
+            f.write(output)
+        return temp_path
+
+    monkeypatch.setattr(compaction, '_run_ffmpeg', run_ffmpeg)
+
+
+def _retake():
+    return save_question_stream(FOLDER, 1, io.BytesIO(RETAKE))
+
+
+def test_audio_rendition_next_to_kept_video_reclaims_nothing(session, monkeypatch):
+    monkeypatch.setattr(config, 'COMPACTION_MODE', 'audio')
+    _fake_ffmpeg(monkeypatch, b'a' * 1_000)
+    report = compaction.compact_session(FOLDER)
+    assert report['actions'] == ["Q1.opus created"]
+    assert report['bytesReclaimed'] == 0
+    assert _meta()['storage']['bytesReclaimed'] == 0
+
+
+def test_downscale_updates_checksum_and_transcript_source(session, monkeypatch):
+    monkeypatch.setattr(config, 'COMPACTION_MODE', 'downscale')
+    _fake_ffmpeg(monkeypatch, b'd' * 4_000)
+    report = compaction.compact_session(FOLDER)
+    assert report['bytesReclaimed'] == 6_000
+
+    new_sha256 = hashlib.sha256(b'd' * 4_000).hexdigest()
+    meta = _meta()
+    assert meta['checksums']['1'] == {"sha256": new_sha256, "size": 4_000}
+    assert meta['transcripts']['1']['sourceSha256'] == new_sha256
+    assert meta['storage']['downscaled'] == [1]
+
+
+def test_retake_during_downscale_wins(session, monkeypatch):
+    monkeypatch.setattr(config, 'COMPACTION_MODE', 'downscale')
+    _fake_ffmpeg(monkeypatch, b'd' * 4_000, during=_retake)
+    report = compaction.compact_session(FOLDER)
+
+    with open(session, 'rb') as f:
+        assert f.read() == RETAKE
+    assert report['errors'] and report['bytesReclaimed'] == 0
+    assert not os.path.exists(os.path.join(session_path(FOLDER), 'Q1.tmp.webm'))
+    assert _meta()['storage']['downscaled'] == []
+
+
+def test_retake_drops_the_stale_audio_rendition(session, monkeypatch):
+    audio = os.path.join(session_path(FOLDER), 'Q1.opus')
+    with open(audio, 'wb') as f:
+        f.write(b'old audio')
+    _retake()
+    assert not os.path.exists(audio)
+
+    # The audio tier rebuilds the rendition from the retake before dropping the video
+    monkeypatch.setattr(compaction, 'target_tier', lambda age: 'audio')
+    _fake_ffmpeg(monkeypatch, b'new audio')
+    compaction.compact_session(FOLDER)
+    with open(audio, 'rb') as f:
+        assert f.read() == b'new audio'
+    assert not os.path.exists(session)
+
+
+def test_retake_during_extraction_keeps_the_video(session, monkeypatch):
+    monkeypatch.setattr(compaction, 'target_tier', lambda age: 'audio')
+    _fake_ffmpeg(monkeypatch, b'old audio', during=_retake)
+    report = compaction.compact_session(FOLDER)
+
+    assert not os.path.exists(os.path.join(session_path(FOLDER), 'Q1.opus'))
+    with open(session, 'rb') as f:
+        assert f.read() == RETAKE
+    assert report['errors']
+
+
+def test_concurrent_writers_keep_each_others_keys(session):
+    def mark(i):
+        modify_metadata(FOLDER, lambda meta: meta.setdefault('marks', {}).update({str(i): True}))
+
+    threads = [threading.Thread(target=mark, args=(i,)) for i in range(20)]
+    threads.append(threading.Thread(target=update_language_metadata, args=(FOLDER, {"code": "en"})))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    meta = _meta()
+    assert len(meta['marks']) == 20
+    assert meta['language'] == {"code": "en"}
+    assert meta['transcripts']['1']['text'] == "hello"
@@ -0,0 +1,84 @@
+"""
+Event-loop lag while large answers are uploaded
+
+Runs the API in-process (httpx ASGI transport, sessions in a temp folder) and
+uploads synthetic answers while a probe task measures how late the loop wakes
+up from 10 ms sleeps. Blocking storage I/O on the event loop shows up as lag
+proportional to the upload size.
+
+Sizes and budget: LAG_TEST_SIZE_MB (default 32), LAG_TEST_UPLOADS (3) and
+LAG_TEST_BUDGET_MS (100), e.g. `LAG_TEST_SIZE_MB=200 python -m pytest tests/test_event_loop_lag.py`.
+"""
+
+import asyncio
+import os
+import time
+
+import httpx
+
+from app.core import config
+from app.api import session_finish
+
+PROBE_INTERVAL = 0.01
+SIZE_MB = float(os.getenv('LAG_TEST_SIZE_MB', 32))
+UPLOADS = int(os.getenv('LAG_TEST_UPLOADS', 3))
+BUDGET_MS = float(os.getenv('LAG_TEST_BUDGET_MS', 100))
+
+
+async def _probe_lag(stop: asyncio.Event, lags: list):
+    """Record how late each 10 ms sleep wakes up (seconds)"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def _run_session(client: httpx.AsyncClient, payload: bytes, uploads: int):
+    """start -> N x upload-one -> finish"""
+    resp = await client.post('/api/session/start', json={"token": "12345", "userName": "LagProbe"})
+    resp.raise_for_status()
+    folder = resp.json()['folder']
+
+    for q in range(1, uploads + 1):
+        resp = await client.post(
+            '/api/upload-one',
+            data={"token": "12345", "folder": folder, "questionIndex": str(q)},
+            # Vary the first byte so every upload is a new take
+            files={"video": (f"Q{q}.webm", bytes([q % 256]) + payload[1:], "video/webm")}
+        )
+        resp.raise_for_status()
+
+    resp = await client.post('/api/session/finish', json={"token": "12345", "folder": folder, "questionsCount": uploads})
+    resp.raise_for_status()
+    return folder
+
+
+async def _measure(payload: bytes, uploads: int) -> list:
+    from app.main import app
+
+    stop = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(_probe_lag(stop, lags))
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://lag-probe", timeout=None) as client:
+            await _run_session(client, payload, uploads)
+    finally:
+        stop.set()
+        await probe
+    return lags
+
+
+def test_uploads_do_not_block_the_event_loop(uploads_base, monkeypatch):
+    # Storage I/O only: no transcription, no admission limits
+    monkeypatch.setattr(session_finish, 'is_transcription_available', lambda: False)
+    monkeypatch.setattr(config, 'UPLOAD_DISK_RESERVE_BYTES', 0)
+    monkeypatch.setattr(config, 'ADMISSION_MAX_BACKLOG_SECONDS', 0)
+
+    payload = os.urandom(int(SIZE_MB * 1024 * 1024))
+    lags = asyncio.run(_measure(payload, UPLOADS))
+
+    assert lags, "the probe never ran"
+    worst_ms = max(lags) * 1000
+    assert worst_ms <= BUDGET_MS, f"the event loop was blocked for {worst_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+    assert os.listdir(uploads_base), "sessions were not written to the temp uploads folder"
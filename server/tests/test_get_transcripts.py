@@ -0,0 +1,66 @@
+"""Transcript read endpoints"""
+
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.storage.file_manager import ensure_session_folder, update_metadata
+
+FOLDER = "01_01_2026_10_00_ReadProbe"
+
+
+@pytest.fixture
+def client(uploads_base):
+    ensure_session_folder(FOLDER)
+    update_metadata(FOLDER, 1, transcript="hello", confidence=0.9)
+    return TestClient(app)
+
+
+def _batch(client, *folders, fmt="json"):
+    return client.post('/api/transcripts/batch', json={
+        "sessions": [{"folder": folder} for folder in folders], "format": fmt
+    })
+
+
+def test_batch_rejects_folders_outside_uploads(client, uploads_base):
+    outside = os.path.join(os.path.dirname(uploads_base), 'outside')
+    os.makedirs(outside)
+    with open(os.path.join(outside, 'meta.json'), 'w') as f:
+        json.dump({"userName": "secret", "transcripts": {"1": {"text": "leak"}}}, f)
+
+    resp = _batch(client, "../outside", "..", "a/b", FOLDER)
+    assert resp.status_code == 200
+    sessions = resp.json()['sessions']
+    assert [s['ok'] for s in sessions] == [False, False, False, True]
+    assert "leak" not in resp.text
+    assert sessions[3]['transcripts']['1']['text'] == "hello"
+
+
+@pytest.mark.parametrize('fmt', ['json', 'ndjson'])
+def test_batch_reports_bad_names_per_session(client, fmt):
+    resp = _batch(client, "bad\u0000name", FOLDER, fmt=fmt)
+    assert resp.status_code == 200
+    if fmt == 'json':
+        sessions = resp.json()['sessions']
+    else:
+        sessions = [json.loads(line) for line in resp.text.splitlines()]
+    by_folder = {s['folder']: s for s in sessions}
+    assert by_folder["bad\u0000name"]['ok'] is False and by_folder["bad\u0000name"]['error']
+    assert by_folder[FOLDER]['ok'] is True
+
+
+@pytest.mark.parametrize('path', [
+    '/api/transcripts/missing', '/api/transcripts/missing/1', '/api/transcripts/missing/1/segments',
+])
+def test_unknown_session_is_404(client, path):
+    assert client.get(path).status_code == 404
+
+
+def test_reads_session(client):
+    resp = client.get(f'/api/transcripts/{FOLDER}/1')
+    assert resp.status_code == 200
+    assert resp.json()['transcript']['text'] == "hello"
+    assert client.get(f'/api/transcripts/{FOLDER}/1', headers={'If-None-Match': resp.headers['etag']}).status_code == 304
@@ -0,0 +1,70 @@
+"""Durable job store (SQLite spool under the uploads folder)"""
+
+import os
+
+import pytest
+
+from app.services import job_store
+
+
+@pytest.fixture
+def store(uploads_base, monkeypatch):
+    monkeypatch.setattr(job_store.config, 'JOB_DB_PATH', '')
+    return job_store
+
+
+def test_claimed_upgrade_stays_queued_until_done(store):
+    store.add_upgrade('s1', 2, 'medium', 'abc')
+
+    upgrade = store.claim_upgrade()
+    assert (upgrade['folder'], upgrade['question_index']) == ('s1', 2)
+    assert store.claim_upgrade() is None  # Claimed by the first caller
+
+    # Interrupted (shutdown): handed back, not lost
+    store.release_upgrade('s1', 2)
+    assert store.claim_upgrade()['question_index'] == 2
+
+    # Done with the take it was queued for
+    store.remove_upgrade('s1', 2, 'abc')
+    assert store.claim_upgrade(claim_seconds=0) is None
+
+
+def test_unreleased_claim_expires(store):
+    store.add_upgrade('s1', 1, 'medium', 'abc')
+    assert store.claim_upgrade() is not None
+    assert store.claim_upgrade(claim_seconds=-1)['question_index'] == 1
+
+
+def test_upgrade_of_a_retake_is_not_removed_by_the_old_take(store):
+    store.add_upgrade('s1', 1, 'medium', 'old')
+    store.claim_upgrade()
+    store.add_upgrade('s1', 1, 'medium', 'new')  # Retake transcribed with a fallback again
+
+    store.remove_upgrade('s1', 1, 'old')
+    assert store.claim_upgrade()['sha256'] == 'new'
+
+
+def test_result_of_a_superseded_take_is_not_recorded(store):
+    store.enqueue_job('s1', 2)
+    generation = store.start_task('s1', 1)
+    assert store.supersede_task('s1', 1) == 'cancelling'
+
+    assert not store.update_task('s1', 1, 'success', 0.9, '', generation)
+    assert store.update_task('s1', 1, 'success', 0.9, '', store.task_generation('s1', 1))
+
+
+def test_schema_is_set_up_once_per_database(store, monkeypatch):
+    calls = []
+    prepare = store._prepare
+    monkeypatch.setattr(store, '_prepare', lambda conn: (calls.append(1), prepare(conn)))
+
+    store.add_upgrade('s1', 1, 'medium', 'abc')
+    store.claim_upgrade()
+    store.release_upgrade('s1', 1)
+    assert len(calls) == 1
+
+    # A deleted database is set up again
+    os.remove(store.db_path())
+    store.add_upgrade('s1', 1, 'medium', 'abc')
+    assert len(calls) == 2
+    assert store.claim_upgrade()['question_index'] == 1
@@ -0,0 +1,74 @@
+"""Live transcription bookkeeping (no ffmpeg needed: decoders are faked)"""
+
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import admission, live_transcription
+from app.services.audio import SAMPLE_RATE
+from app.services.long_clip import plan_windows
+
+
+class FakeDecoder:
+    def __init__(self, audio):
+        self._audio = audio
+        self.killed = False
+
+    def samples(self):
+        return len(self._audio)
+
+    def audio(self, start, end):
+        return self._audio[start:end]
+
+    def kill(self):
+        self.killed = True
+
+
+def _answer(audio=None):
+    answer = object.__new__(live_transcription.LiveAnswer)
+    answer.decoder = FakeDecoder(audio if audio is not None else np.zeros(0, np.float32))
+    answer.overlap = int(config.LONG_CLIP_OVERLAP_SECONDS * SAMPLE_RATE)
+    answer.committed = 0
+    answer.last_chunk = time.monotonic()
+    answer._window = None
+    return answer
+
+
+def test_idle_answers_are_discarded(monkeypatch):
+    monkeypatch.setattr(live_transcription, '_live', {})
+    idle, active = _answer(), _answer()
+    idle.last_chunk -= 300
+    live_transcription._live.update({("A", 1): idle, ("B", 1): active})
+
+    assert live_transcription.discard_idle(120) == [("A", 1)]
+    assert idle.decoder.killed and not active.decoder.killed
+    live_transcription.discard_all()
+    assert active.decoder.killed and not live_transcription._live
+
+
+def test_next_window_is_planned_on_a_bounded_slice():
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-1, 1, int(90 * SAMPLE_RATE)).astype(np.float32)
+    audio[int(15 * SAMPLE_RATE):int(15.5 * SAMPLE_RATE)] = 0  # A pause to cut at
+    answer = _answer(audio)
+    answer.committed = int(3 * SAMPLE_RATE)
+
+    full = plan_windows(audio[answer.committed:], config.LIVE_WINDOW_SECONDS, config.LONG_CLIP_OVERLAP_SECONDS)
+    assert answer._plan_next(len(audio)) == answer._absolute(full[0], len(audio))
+
+
+def test_upload_chunk_takes_an_upload_slot(uploads_base, monkeypatch):
+    monkeypatch.setattr(config, 'TOKEN_MAX_CONCURRENT_UPLOADS', 1)
+    assert admission.acquire_upload_slot("12345")
+    try:
+        resp = TestClient(app).post('/api/upload-chunk', data={
+            "token": "12345", "folder": "missing", "questionIndex": "1", "seq": "0"
+        }, files={"chunk": ("c.webm", b"x", "video/webm")})
+        assert resp.status_code == 429
+        assert resp.headers['Retry-After']
+    finally:
+        admission.release_upload_slot("12345")
@@ -0,0 +1,42 @@
+"""Answer playback: Range requests, conditional requests"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.storage.file_manager import ensure_session_folder, session_path
+
+FOLDER = "01_01_2026_10_00_MediaProbe"
+BODY = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def client(uploads_base):
+    ensure_session_folder(FOLDER)
+    with open(os.path.join(session_path(FOLDER), 'Q1.webm'), 'wb') as f:
+        f.write(BODY)
+    return TestClient(app)
+
+
+def test_range_request_returns_only_the_requested_bytes(client):
+    resp = client.get(f'/api/media/{FOLDER}/1', headers={'Range': 'bytes=100-199'})
+
+    assert resp.status_code == 206
+    assert resp.content == BODY[100:200]
+    assert resp.headers['content-range'] == f'bytes 100-199/{len(BODY)}'
+    assert resp.headers['accept-ranges'] == 'bytes'
+
+
+def test_full_body_and_revalidation(client):
+    resp = client.get(f'/api/media/{FOLDER}/1')
+    assert resp.status_code == 200
+    assert resp.content == BODY
+
+    again = client.get(f'/api/media/{FOLDER}/1', headers={'If-None-Match': resp.headers['etag']})
+    assert again.status_code == 304
+
+
+def test_missing_answer_is_404(client):
+    assert client.get(f'/api/media/{FOLDER}/2?rendition=video').status_code == 404
@@ -0,0 +1,55 @@
+"""Parsed meta.json cache: validators, bounds and listing bypass"""
+
+import json
+import os
+
+import pytest
+
+from app.core import config
+from app.storage import meta_cache
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setattr(meta_cache, '_entries', meta_cache.OrderedDict())
+    monkeypatch.setattr(meta_cache, '_bytes', 0)
+    monkeypatch.setattr(meta_cache, '_loading', {})
+    monkeypatch.setattr(config, 'META_CACHE_ENTRIES', 2)
+    paths = []
+    for i in range(4):
+        path = str(tmp_path / f"meta{i}.json")
+        with open(path, 'w') as f:
+            json.dump({"n": i}, f)
+        paths.append(path)
+    return paths
+
+
+def test_etag_depends_on_the_file_only(files):
+    _, etag, _ = meta_cache.load(files[0])
+    stat = os.stat(files[0])
+    assert etag == f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    meta_cache.invalidate(files[0])
+    assert meta_cache.load(files[0])[1] == etag  # Same file, same ETag (no per-process counter)
+
+
+def test_no_state_kept_for_uncached_files(files):
+    for path in files:
+        meta_cache.load(path)
+        meta_cache.invalidate(path)
+    assert not meta_cache._entries and not meta_cache._loading
+
+
+def test_listing_does_not_evict_hot_entries(files):
+    meta_cache.load(files[0])
+    meta_cache.load(files[1])
+    for path in files:
+        assert meta_cache.load(path, cache=False)[0]['n'] == files.index(path)
+    assert list(meta_cache._entries) == files[:2]
+
+
+def test_rewrite_is_picked_up(files):
+    meta_cache.load(files[0])
+    with open(files[0], 'w') as f:
+        json.dump({"n": 10}, f)
+    meta_cache.invalidate(files[0])
+    assert meta_cache.load(files[0])[0] == {"n": 10}
@@ -0,0 +1,27 @@
+"""retranscribe_archive: checkpoint entries only skip the take they were made from"""
+
+import json
+
+from app.storage.file_manager import ensure_session_folder, session_path, update_metadata
+from scripts import retranscribe_archive
+
+FOLDER = "01_01_2026_10_00_ArchiveProbe"
+
+
+def test_retaken_answer_is_not_skipped(uploads_base, tmp_path):
+    ensure_session_folder(FOLDER)
+    for q in (1, 2):
+        with open(f"{session_path(FOLDER)}/Q{q}.webm", 'wb') as f:
+            f.write(b'x')
+        update_metadata(FOLDER, q, checksum={"sha256": f"take-{q}", "size": 1})
+
+    checkpoint = tmp_path / 'checkpoint.jsonl'
+    with open(checkpoint, 'w') as f:
+        f.write(json.dumps({'folder': FOLDER, 'question': 1, 'sha256': 'take-1', 'status': 'success'}) + "\n")
+        f.write(json.dumps({'folder': FOLDER, 'question': 2, 'sha256': 'take-2', 'status': 'success'}) + "\n")
+        f.write('{"folder": "torn')
+    update_metadata(FOLDER, 2, checksum={"sha256": "retake-2", "size": 1})
+
+    done = retranscribe_archive.read_checkpoint(str(checkpoint))
+    work = retranscribe_archive.collect_work([FOLDER], 'tag', 'en', done)
+    assert [(folder, q, sha256) for folder, q, _, _, sha256 in work] == [(FOLDER, 2, "retake-2")]
@@ -0,0 +1,45 @@
+"""Long-clip mode decodes a short answer at most once"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core import config
+from app.services import transcription_manager
+from app.services.audio import SAMPLE_RATE
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    calls = []
+
+    def decode_audio(path):
+        calls.append(path)
+        return np.zeros(10 * SAMPLE_RATE, np.float32)
+
+    async def ensure_engine_loaded():
+        return True
+
+    monkeypatch.setattr(config, 'LONG_CLIP_SECONDS', 60.0)
+    monkeypatch.setattr(transcription_manager, 'ensure_engine_loaded', ensure_engine_loaded)
+    monkeypatch.setattr(transcription_manager, 'decode_audio', decode_audio)
+    return calls
+
+
+def _run(path):
+    return asyncio.run(transcription_manager._transcribe_long_clip_if_needed(path, "en", False, "small"))
+
+
+def test_short_clip_with_container_duration_is_not_decoded(decodes, monkeypatch):
+    monkeypatch.setattr(transcription_manager, 'probe_duration', lambda path: 10.0)
+    assert _run("Q1.webm") == (None, None)
+    assert decodes == []
+
+
+def test_clip_without_duration_is_decoded_once_and_handed_on(decodes, monkeypatch):
+    monkeypatch.setattr(transcription_manager, 'probe_duration', lambda path: None)
+    result, audio = _run("Q1.webm")
+    assert result is None
+    assert len(audio) == 10 * SAMPLE_RATE
+    assert decodes == ["Q1.webm"]
@@ -0,0 +1,63 @@
+"""upload-one: the video is streamed to disk and hashed while the body is parsed"""
+
+import hashlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.storage.file_manager import ensure_session_folder, session_path
+
+FOLDER = "01_01_2026_10_00_UploadProbe"
+
+
+@pytest.fixture
+def client(uploads_base, monkeypatch):
+    monkeypatch.setattr(config, 'UPLOAD_DISK_RESERVE_BYTES', 0)
+    ensure_session_folder(FOLDER)
+    return TestClient(app)
+
+
+def _upload(client, body, token="12345", folder=FOLDER):
+    return client.post(
+        '/api/upload-one',
+        data={"token": token, "folder": folder, "questionIndex": "1"},
+        files={"video": ("Q1.webm", body, "video/webm")}
+    )
+
+
+def test_upload_is_stored_and_identical_resend_is_unchanged(client, monkeypatch):
+    # Small writes: the body arrives in several pieces
+    monkeypatch.setattr('app.api.upload_one.UPLOAD_CHUNK_SIZE', 1000)
+    body = os.urandom(10_000)
+
+    first = _upload(client, body)
+    assert first.status_code == 200
+    assert first.json()['sha256'] == hashlib.sha256(body).hexdigest()
+    assert first.json()['size'] == len(body)
+    assert first.json()['unchanged'] is False
+    with open(os.path.join(session_path(FOLDER), 'Q1.webm'), 'rb') as f:
+        assert f.read() == body
+
+    again = _upload(client, body)
+    assert again.json()['unchanged'] is True
+    assert not os.path.exists(os.path.join(session_path(FOLDER), 'Q1.webm.part'))
+
+
+def test_file_is_never_spooled(client, monkeypatch):
+    def no_spooling(*args, **kwargs):
+        raise AssertionError("the upload was spooled to a temp file")
+
+    monkeypatch.setattr('tempfile.SpooledTemporaryFile', no_spooling)
+    monkeypatch.setattr('starlette.formparsers.SpooledTemporaryFile', no_spooling)
+    assert _upload(client, b'x' * 50_000).status_code == 200
+
+
+def test_rejections(client):
+    assert _upload(client, b'abc', token="nope").status_code == 401
+    assert _upload(client, b'abc', folder="missing").status_code == 404
+    assert not os.path.exists(os.path.join(session_path("missing"), 'Q1.webm.part'))
+    resp = client.post('/api/upload-one', data={"token": "12345", "folder": FOLDER, "questionIndex": "1"})
+    assert resp.status_code == 422
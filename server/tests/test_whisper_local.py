@@ -0,0 +1,47 @@
+"""openai-whisper engine: an answer file is decoded once, also when the language is detected"""
+
+import types
+
+import numpy as np
+
+from app.services import whisper_local_transcription
+
+
+class _Mel:
+    def to(self, device):
+        return self
+
+
+class _Model:
+    dims = types.SimpleNamespace(n_mels=80)
+    device = 'cpu'
+
+    def __init__(self):
+        self.transcribed = []
+
+    def detect_language(self, mel):
+        return None, {'en': 0.2, 'vi': 0.8}
+
+    def transcribe(self, audio, **kwargs):
+        self.transcribed.append((audio, kwargs['language']))
+        return {'text': ' xin chào ', 'segments': [], 'language': kwargs['language']}
+
+
+def test_path_is_decoded_once(monkeypatch):
+    loads = []
+
+    def load_audio(path):
+        loads.append(path)
+        return np.zeros(16000, np.float32)
+
+    fake = types.SimpleNamespace(load_audio=load_audio, pad_or_trim=lambda audio: audio,
+                                 log_mel_spectrogram=lambda audio, n_mels: _Mel())
+    monkeypatch.setattr(whisper_local_transcription, 'whisper', fake, raising=False)
+    model = _Model()
+
+    result = whisper_local_transcription._run_whisper(model, '/tmp/answer.mp3', None, 'small', False, None)
+
+    assert loads == ['/tmp/answer.mp3']
+    assert isinstance(model.transcribed[0][0], np.ndarray)
+    assert model.transcribed[0][1] == 'vi'
+    assert result['language'] == 'vi' and result['transcript'] == 'xin chào'